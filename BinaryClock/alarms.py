@@ -0,0 +1,266 @@
+# Datei: alarms.py
+"""
+Alarm-Engine für v16 / F.F Werte (ohne Tk).
+
+- Tägliche / einmalige v16 Alarme liegen in einem Timer-Rad mit 65536 Slots (ein Slot pro Tick).
+- Einmalige F.F Alarme (v32) liegen in einem Heap, sortiert nach Fälligkeit.
+
+poll() wird von der laufenden Uhr pro Update aufgerufen. Kosten: O(1) pro Tick
+(ein Slot + ein Heap-Peek) plus O(k) für die k Alarme, die feuern.
+
+Speichern (autosave) passiert nicht im Tick: gefeuerte Einmal-Alarme machen die Engine nur
+"dirty", frühestens SAVE_DELAY_S später schreibt ein Hintergrund-Thread eine Momentaufnahme -
+atomar (Temp-Datei + os.replace), ein Absturz hinterlässt nie eine halbe Datei.
+Ändert jemand die Datei von außen (`cli.py alarm ...`), lädt die laufende Uhr sie neu,
+solange sie selbst nichts Ungespeichertes hat.
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import core
+
+ALARM_FILENAME = "binClockAlarms.json"
+SAVE_DELAY_S = 5.0      # autosave frühestens so lange nach der ersten ungespeicherten Änderung
+RELOAD_CHECK_S = 5.0    # so oft wird die Datei auf Änderungen von außen geprüft
+
+
+def parse_alarm_value(text):
+    """
+    '0x8000'      -> ("v16", 0x8000)
+    '0002.4000'   -> ("ff", 0x00024000)
+    '0002A4F3'    -> ("ff", 0x0002A4F3)
+    """
+    text = text.strip()
+    if text.lower().startswith("0x"):
+        value = int(text[2:], 16)
+        if not 0 <= value < core.TOTAL_UNITS:
+            raise ValueError(f"v16 außerhalb 0x0000-0xFFFF: {text}")
+        return "v16", value
+    return "ff", int(text.replace(".", ""), 16)
+
+
+def format_alarm_value(kind, value):
+    """Gegenstück zu parse_alarm_value: 0x8000 bzw. 0002.4000."""
+    if kind == "v16": return f"0x{value:04X}"
+    return f"{value >> 16:04X}.{value & 0xFFFF:04X}"
+
+
+class AlarmEngine:
+    def __init__(self, filename=None, on_fire=None, autosave=True, save_delay=SAVE_DELAY_S,
+                 timer=time.monotonic):
+        # Standard: neben binClockSettings.json
+        if filename is None:
+            from settings_manager import get_application_path
+            filename = os.path.join(get_application_path(), ALARM_FILENAME)
+        self.filename = filename
+        self.on_fire = on_fire
+        self.autosave = autosave
+        self.save_delay = save_delay
+        self.timer = timer
+        self._reset()
+
+        self.last_v16 = None
+        self.last_v32 = None
+        self.dirty = False
+        self._dirty_since = None
+        self._writer = None          # laufender Speicher-Thread
+        self._mtime = None           # mtime der Datei nach dem letzten load / save
+        self._next_reload_check = 0.0
+
+    def _reset(self):
+        self.alarms = {}                                     # id -> Alarm-Dict
+        self.wheel = [None] * core.TOTAL_UNITS               # v16 -> Liste von IDs (lazy angelegt)
+        self.ff_heap = []                                    # (v32, id)
+        self.next_id = 0
+
+    # --- VERWALTUNG ---
+
+    def add(self, kind, value, repeat=False, label="", alarm_id=None):
+        if kind not in ("v16", "ff"):
+            raise ValueError(f"Unbekannter Alarm-Typ: {kind}")
+        if alarm_id is None:
+            alarm_id = self.next_id
+        self.next_id = max(self.next_id, alarm_id + 1)
+
+        alarm = {"id": alarm_id, "kind": kind, "value": value, "repeat": bool(repeat), "label": label}
+        self.alarms[alarm_id] = alarm
+
+        if kind == "v16":
+            slot = self.wheel[value]
+            if slot is None:
+                slot = self.wheel[value] = []
+            slot.append(alarm_id)
+        else:
+            heapq.heappush(self.ff_heap, (value, alarm_id))
+
+        self._mark_dirty()
+        return alarm_id
+
+    def add_spec(self, text, repeat=False, label=""):
+        kind, value = parse_alarm_value(text)
+        return self.add(kind, value, repeat=repeat, label=label)
+
+    def remove(self, alarm_id):
+        alarm = self.alarms.pop(alarm_id, None)
+        if alarm is None: return False
+        if alarm["kind"] == "v16":
+            slot = self.wheel[alarm["value"]]
+            slot.remove(alarm_id)
+            if not slot: self.wheel[alarm["value"]] = None
+        # F.F Einträge im Heap werden beim Poppen übersprungen (lazy delete)
+        self._mark_dirty()
+        return True
+
+    def __len__(self):
+        return len(self.alarms)
+
+    def sorted_alarms(self):
+        return sorted(self.alarms.values(), key=lambda a: a["id"])
+
+    def _mark_dirty(self):
+        if not self.dirty: self._dirty_since = self.timer()
+        self.dirty = True
+
+    # --- TICK ---
+
+    def poll(self, now_utc=None):
+        """Mit der aktuellen Zeit fortschreiten (Aufruf aus dem Update-Loop der Uhr)."""
+        if now_utc is None:
+            now_utc = datetime.now(timezone.utc)
+        if self.autosave: self.reload_if_changed()
+        # v16 (lokal) und F.F (UTC) ticken unabhängig voneinander
+        v32 = core.get_ff_value(now_utc)
+        v16 = core.get_v16(now_utc.astimezone().replace(tzinfo=None))
+        if v32 == self.last_v32 and v16 == self.last_v16:
+            if self.autosave: self.maybe_save()
+            return []
+        return self.advance(v16, v32)
+
+    def advance(self, v16, v32):
+        """Alle Alarme zwischen letztem und aktuellem Tick feuern. Gibt die gefeuerten Alarme zurück."""
+        fired = []
+
+        # 1. Timer-Rad (v16). Beim ersten Aufruf wird nichts nachgeholt.
+        if self.last_v16 is not None and v16 != self.last_v16:
+            steps = (v16 - self.last_v16) % core.TOTAL_UNITS
+            pos = self.last_v16
+            for _ in range(steps):
+                pos = (pos + 1) % core.TOTAL_UNITS
+                slot = self.wheel[pos]
+                if slot is not None:
+                    self._fire_slot(pos, slot, fired)
+        self.last_v16 = v16
+
+        # 2. Heap (F.F). Verpasste Alarme (z.B. Programm war aus) feuern einmal nach.
+        heap = self.ff_heap
+        while heap and heap[0][0] <= v32:
+            _, alarm_id = heapq.heappop(heap)
+            alarm = self.alarms.pop(alarm_id, None)
+            if alarm is None: continue
+            fired.append(alarm)
+            self._mark_dirty()
+        self.last_v32 = v32
+
+        for alarm in fired:
+            if self.on_fire: self.on_fire(alarm)
+        if self.autosave: self.maybe_save()
+        return fired
+
+    def _fire_slot(self, pos, slot, fired):
+        keep = []
+        for alarm_id in slot:
+            alarm = self.alarms[alarm_id]
+            fired.append(alarm)
+            if alarm["repeat"]:
+                keep.append(alarm_id)
+            else:
+                del self.alarms[alarm_id]
+                self._mark_dirty()
+        self.wheel[pos] = keep or None
+
+    # --- JSON ---
+
+    def load(self):
+        """Datei laden (ersetzt alle Alarme im Speicher)."""
+        self.wait()
+        if not os.path.exists(self.filename): return
+        try:
+            mtime = os.stat(self.filename).st_mtime_ns
+            with open(self.filename, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print("Alarm-JSON defekt.")
+            return
+        self._reset()
+        for a in data.get("alarms", []):
+            self.add(a["kind"], a["value"], a.get("repeat", False), a.get("label", ""), alarm_id=a.get("id"))
+        self.dirty = False
+        self._mtime = mtime
+
+    def reload_if_changed(self):
+        """Änderungen von außen (z.B. cli.py alarm) übernehmen - nur ohne eigene ungespeicherte Änderungen."""
+        now = self.timer()
+        if now < self._next_reload_check or self.dirty or self._writer: return False
+        self._next_reload_check = now + RELOAD_CHECK_S
+        try:
+            mtime = os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime: return False
+        self.load()
+        return True
+
+    def _snapshot(self):
+        return {"version": "0.1", "alarms": list(self.alarms.values())}
+
+    def _write(self, data):
+        """Atomar schreiben: Temp-Datei im selben Ordner, dann os.replace."""
+        tmp = self.filename + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # Mit indent nimmt json den Python-Encoder: langsamer, gibt aber den GIL regelmäßig
+            # frei - der C-Encoder würde den UI-Thread für die ganze Datei anhalten.
+            f.write(json.dumps(data, indent=1))
+        os.replace(tmp, self.filename)
+        self._mtime = os.stat(self.filename).st_mtime_ns
+
+    def _write_background(self, data):
+        try:
+            self._write(data)
+        except OSError as e:
+            print(f"Alarme speichern: {e}")
+        finally:
+            self._writer = None
+
+    def maybe_save(self):
+        """
+        Autosave aus dem Tick: nur wenn seit der ersten ungespeicherten Änderung save_delay vergangen
+        ist und kein Schreiben läuft. Im Tick kostet das nur die Momentaufnahme (eine Liste der Dicts,
+        die Dicts selbst werden nie verändert); JSON und Datei-I/O laufen im Hintergrund-Thread.
+        """
+        if not self.dirty or self._writer: return False
+        if self.timer() - self._dirty_since < self.save_delay: return False
+        data = self._snapshot()
+        self.dirty = False
+        self._writer = threading.Thread(target=self._write_background, args=(data,), name="alarm-writer",
+                                        daemon=True)
+        self._writer.start()
+        return True
+
+    def wait(self):
+        writer = self._writer
+        if writer: writer.join()
+
+    def save(self):
+        """Sofort (synchron) speichern, z.B. aus der Kommandozeile."""
+        self.wait()
+        self._write(self._snapshot())
+        self.dirty = False
+
+    def close(self):
+        """Beim Beenden: laufendes Schreiben abwarten, Ungespeichertes sichern."""
+        self.wait()
+        if self.dirty: self.save()
@@ -0,0 +1,447 @@
+# Datei: bench.py
+"""
+Benchmarks ohne Display.
+
+Aufruf (aus dem BinaryClock Ordner):
+    python bench.py                 -> alle Benchmarks
+    python bench.py importtime      -> nur einen
+    python bench.py ui --out a.json -> Ergebnis zusätzlich als Datei speichern
+    python bench.py ui --compare a.json
+                                    -> Änderungen gegenüber einem früheren Lauf, Exit 1 bei mehr Ops / Bytes
+
+Jeder Benchmark liefert ein Dict mit Metriken. Ein Benchmark mit "ok": False
+lässt das Script mit Exit-Code 1 enden (Guard für CI).
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Budget für "import core" (kumulativ, in Mikrosekunden)
+CORE_IMPORT_BUDGET_US = 50_000
+GUI_MODULES = ("tkinter", "_tkinter")
+
+
+def parse_importtime(stderr_text):
+    """Liest die Ausgabe von `python -X importtime` -> {modul: kumulative µs}."""
+    result = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"): continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3: continue
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            continue  # Kopfzeile
+        result[parts[2].strip()] = cumulative
+    return result
+
+
+def bench_importtime(module="core"):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=HERE, capture_output=True, text=True)
+    times = parse_importtime(proc.stderr)
+    gui = [m for m in times if m in GUI_MODULES]
+    total_us = times.get(module, -1)
+    return {
+        "module": module,
+        "import_us": total_us,
+        "budget_us": CORE_IMPORT_BUDGET_US,
+        "gui_imports": gui,
+        "ok": proc.returncode == 0 and not gui and 0 <= total_us <= CORE_IMPORT_BUDGET_US,
+    }
+
+
+def bench_convert(count=2_000_000):
+    """Durchsatz der Bulk-Konvertierung (Zeitstempel pro Sekunde, ein Kern)."""
+    import convert
+
+    step_ns = 1_318_359_375  # ~ ein Tick
+    np = convert.load_numpy()
+    if np is not None:
+        stamps = np.arange(count, dtype=np.int64) * step_ns + convert.EPOCH_NS
+    else:
+        count = min(count, 200_000)
+        stamps = [convert.EPOCH_NS + i * step_ns for i in range(count)]
+
+    t0 = time.perf_counter()
+    convert.bulk_convert(stamps)
+    elapsed = time.perf_counter() - t0
+    return {
+        "backend": "numpy" if np is not None else "python",
+        "count": count,
+        "seconds": round(elapsed, 4),
+        "stamps_per_s": int(count / elapsed) if elapsed else 0,
+    }
+
+
+def bench_alarms(count=100_000, seed=1):
+    """
+    100k Alarme (halb v16 täglich, halb F.F einmalig), ein ganzer Tag Ticks - mit autosave in
+    eine Temp-Datei. Die Zeit für den Speicher-Aufschub ist simuliert (ein Tick = 1.318 s),
+    geschrieben wird wie in der Uhr im Hintergrund-Thread.
+    """
+    import random
+    import shutil
+    import tempfile
+    import core
+    from alarms import AlarmEngine
+
+    rng = random.Random(seed)
+    now = [0.0]
+    directory = tempfile.mkdtemp()
+    engine = AlarmEngine(filename=os.path.join(directory, "alarms.json"), timer=lambda: now[0])
+    day0 = 10 * 65536  # F.F Wert zu Beginn des simulierten Tages
+
+    t0 = time.perf_counter()
+    for i in range(count):
+        if i % 2:
+            engine.add("v16", rng.randrange(65536), repeat=True)
+        else:
+            engine.add("ff", day0 + rng.randrange(65536))
+    add_s = time.perf_counter() - t0
+    engine.save()
+    saves = []
+    maybe_save = engine.maybe_save
+    engine.maybe_save = lambda: saves.append(1) if maybe_save() else False
+
+    engine.advance(0, day0)
+    fired = 0
+    worst_tick_us = 0.0
+    t0 = time.perf_counter()
+    for v16 in range(1, 65536):
+        now[0] = v16 * core.MS_PER_DAY / core.TOTAL_UNITS / 1000
+        t_tick = time.perf_counter()
+        fired += len(engine.advance(v16, day0 + v16))
+        worst_tick_us = max(worst_tick_us, (time.perf_counter() - t_tick) * 1e6)
+    tick_s = time.perf_counter() - t0
+    engine.close()
+    file_bytes = os.path.getsize(engine.filename)
+    shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "alarms": count,
+        "add_s": round(add_s, 4),
+        "ticks": 65535,
+        "fired": fired,
+        "saves": len(saves),
+        "file_bytes": file_bytes,
+        "us_per_tick": round(tick_s / 65535 * 1e6, 3),
+        "worst_tick_us": round(worst_tick_us, 1),
+    }
+
+
+def bench_daemon(clients=2000, ticks=20):
+    """Lasttest: viele lokale Subscriber am Unix Socket + ein Slot-Leser, eine Berechnung pro Tick."""
+    import asyncio
+    import tempfile
+    from daemon import ClockDaemon, SlotReader
+
+    async def run():
+        tmp = tempfile.mkdtemp()
+        daemon = ClockDaemon(os.path.join(tmp, "slot"), os.path.join(tmp, "sock"))
+        await daemon.start(backlog=clients)
+
+        received = [0] * clients
+
+        async def client(i):
+            reader, writer = await asyncio.open_unix_connection(daemon.socket_path)
+            while received[i] < ticks:
+                if not await reader.readline(): break
+                received[i] += 1
+            writer.close()
+
+        tasks = [asyncio.create_task(client(i)) for i in range(clients)]
+        while len(daemon.subscribers) < clients:
+            failed = [t for t in tasks if t.done() and t.exception()]
+            if failed: raise failed[0].exception()
+            await asyncio.sleep(0.01)
+
+        reader = SlotReader(daemon.slot_path)
+        fanout_s = 0.0
+        t0 = time.perf_counter()
+        for tick in range(ticks):
+            t_pub = time.perf_counter()
+            daemon.publish(tick, tick, tick)
+            fanout_s += time.perf_counter() - t_pub
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        total_s = time.perf_counter() - t0
+        slot_v16 = reader.read()[1]
+
+        t_read = time.perf_counter()
+        for _ in range(100_000): reader.read()
+        slot_read_ns = (time.perf_counter() - t_read) * 1e9 / 100_000
+        reader.close()
+        await daemon.close()
+        return {
+            "clients": clients,
+            "ticks": ticks,
+            "computations": daemon.computations,
+            "delivered": sum(received),
+            "dropped": daemon.dropped,
+            "fanout_us_per_tick": round(fanout_s / ticks * 1e6, 1),
+            "total_s": round(total_s, 3),
+            "slot_read_ns": round(slot_read_ns, 1),
+            "ok": sum(received) == clients * ticks and slot_v16 == ticks - 1,
+        }
+
+    return asyncio.run(run())
+
+
+def bench_web(client_counts=(10, 100, 1000), ticks=20):
+    """SSE/WebSocket Fan-out: CPU pro Tick in Abhängigkeit der Client-Anzahl."""
+    import asyncio
+    import base64
+    from settings_manager import SettingsManager
+    from web_server import TickServer
+
+    settings = SettingsManager.__new__(SettingsManager)
+    settings.data = settings.get_defaults()
+
+    async def run(clients):
+        server = TickServer(settings, port=0)
+        await server.start(backlog=clients)
+        received = [0] * clients
+
+        async def client(i):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            if i % 2:
+                key = base64.b64encode(os.urandom(16)).decode()
+                writer.write(f"GET /ws?diff=1 HTTP/1.1\r\nUpgrade: websocket\r\nSec-WebSocket-Key: {key}\r\n\r\n".encode())
+            else:
+                writer.write(b"GET /events?diff=1 HTTP/1.1\r\n\r\n")
+            await reader.readuntil(b"\r\n\r\n")
+            while received[i] < ticks:
+                if not await reader.read(65536): break
+                received[i] += 1
+            writer.close()
+
+        tasks = [asyncio.create_task(client(i)) for i in range(clients)]
+        while len(server.clients) < clients:
+            failed = [t for t in tasks if t.done() and t.exception()]
+            if failed: raise failed[0].exception()
+            await asyncio.sleep(0.01)
+
+        fanout_cpu = 0.0
+        cpu0 = time.process_time()
+        for tick in range(ticks):
+            c = time.process_time()
+            server.publish(tick, tick)
+            fanout_cpu += time.process_time() - c
+            # Clients lesen lassen, bevor der nächste Tick kommt
+            while min(received) < tick + 1 and not all(t.done() for t in tasks):
+                await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        total_cpu = time.process_time() - cpu0
+        await server.close()
+        return {
+            "clients": clients,
+            "fanout_cpu_ms_per_tick": round(fanout_cpu / ticks * 1e3, 3),
+            "total_cpu_ms_per_tick": round(total_cpu / ticks * 1e3, 3),
+            "computations": server.computations,
+            "delivered": sum(received),
+        }
+
+    rows = [asyncio.run(run(n)) for n in client_counts]
+    return {"rows": rows, "ok": all(r["delivered"] == r["clients"] * ticks for r in rows)}
+
+
+def bench_term():
+    """Terminal-Renderer über einen ganzen Tag: Bytes pro Tick, CPU pro Stunde (hochgerechnet)."""
+    from settings_manager import SettingsManager
+    from term_render import TerminalRenderer
+
+    settings = SettingsManager.__new__(SettingsManager)
+    renderer = TerminalRenderer(settings.get_defaults())
+    first = len(renderer.frame(0))
+
+    cpu0 = time.process_time()
+    for v16 in range(1, 65536):
+        renderer.frame(v16)
+    cpu_s = time.process_time() - cpu0
+    diff_bytes = renderer.bytes_written - first
+    ticks_per_hour = 65536 / 24
+    return {
+        "full_frame_bytes": first,
+        "bytes_per_tick": round(diff_bytes / 65535, 1),
+        "us_per_tick": round(cpu_s / 65535 * 1e6, 2),
+        "cpu_s_per_hour": round(cpu_s / 65535 * ticks_per_hour, 4),
+    }
+
+
+def bench_depth(rounds=200):
+    """
+    Kompilieren + Zeichnen für 8 / 16 / 24 / 32 Bit - sollte linear in den Nibbles sein.
+    Gezeichnet wird über den echten Pfad der F.F Uhr (FFClockDisplay.render_clock mit PlanItems)
+    in eine FakeCanvas, die Werte kommen aus value_for_depth über einen Tag verteilt.
+    """
+    import core
+    import depth_engine
+    import bench_ui
+    from settings_manager import SettingsManager
+
+    settings = SettingsManager.__new__(SettingsManager)
+    settings.data = settings.get_defaults()
+    grid_design, _, palette = core.resolve_profile(settings.data)
+    results = {}
+    for bits in (8, 16, 24, 32):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            plan = depth_engine.compile_depth_plan(grid_design, palette, bits)
+        compile_us = (time.perf_counter() - t0) / rounds * 1e6
+
+        display = bench_ui.make_ff_display(settings, bench_ui.FakeClock())
+        display.get_render_plan = lambda: plan
+        display.render_clock(0)  # Items anlegen
+        display.canvas.ops.clear()
+        values = [depth_engine.value_for_depth((i * 0x9E3779B1) % core.US_PER_DAY, bits) for i in range(rounds * 10)]
+        t0 = time.perf_counter()
+        for value in values:
+            display.render_clock(value)
+        render_us = (time.perf_counter() - t0) / len(values) * 1e6
+        results[str(bits)] = {"rects": len(plan.rects), "compile_us": round(compile_us, 1),
+                              "render_us": round(render_us, 2),
+                              "ops_per_frame": round(sum(display.canvas.ops.values()) / len(values), 2)}
+
+    # Linear: Kosten pro Nibble bei 32 Bit höchstens doppelt so hoch wie bei 8 Bit
+    per_nibble = [results[str(b)]["render_us"] / (b // 4) for b in (8, 32)]
+    results["ok"] = per_nibble[1] <= 2 * per_nibble[0]
+    return results
+
+
+def bench_export(frames=2048, budget_s=300):
+    """PNG-Export (Kacheln + zlib) in einem Prozess, hochgerechnet auf alle 65536 Frames."""
+    import tempfile
+    from exporter import FrameExporter, compile_export_plan
+    from settings_manager import SettingsManager
+
+    settings = SettingsManager.__new__(SettingsManager)
+    exporter = FrameExporter(compile_export_plan(settings.get_defaults()), "png", jobs=1)
+    with tempfile.TemporaryDirectory() as out_dir:
+        t0 = time.perf_counter()
+        exporter.export_files(out_dir, 0, frames)
+        elapsed = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir))
+    day_s = elapsed / frames * 65536
+    return {
+        "frames_per_s": round(frames / elapsed),
+        "bytes_per_frame": size // frames,
+        "full_day_s_single_process": round(day_s, 1),
+        "ok": day_s < budget_s,
+    }
+
+
+def bench_led(width=64, height=64, frames=5000, min_fps=1000):
+    """NumPy Framebuffer: Frames pro Sekunde auf einem 64x64 Panel (ohne Ausgabe)."""
+    import led_render
+    from settings_manager import SettingsManager
+
+    if led_render.np is None:
+        return {"skipped": "NumPy fehlt"}
+    settings = SettingsManager.__new__(SettingsManager)
+    renderer = led_render.LedRenderer.for_panel(settings.get_defaults(), width, height)
+    t0 = time.perf_counter()
+    for value in range(frames):
+        renderer.render(value * 13 & 0xFFFF)
+    fps = frames / (time.perf_counter() - t0)
+    return {"panel": f"{width}x{height}", "fps": round(fps), "ok": fps >= min_fps}
+
+
+def bench_palette(rounds=2000):
+    """Farb-Engine: µs pro Bulk-Operation auf einer 16er Palette, mit NumPy und ohne."""
+    import palette_engine
+    from settings_manager import SettingsManager
+
+    colors = SettingsManager.__new__(SettingsManager).get_defaults()["library"]["palettes"][0]["colors"]
+    ops = {
+        "parse+hover": lambda: palette_engine.Palette.from_hex(colors).hover,
+        "gradient": lambda: palette_engine.Palette.from_hex(colors).gradient().hex(),
+        "ramps": lambda: palette_engine.Palette.from_hex(colors).nibble_ramps().hex(),
+        "hue_shift": lambda: palette_engine.Palette.from_hex(colors).hue_shift(30).hex(),
+        "contrast": lambda: palette_engine.Palette.from_hex(colors).fix_contrast().hex(),
+    }
+    result = {}
+    numpy = palette_engine.np
+    for mode in (("numpy", "python") if numpy is not None else ("python",)):
+        palette_engine.np = numpy if mode == "numpy" else None
+        try:
+            for name, op in ops.items():
+                t0 = time.perf_counter()
+                for _ in range(rounds):
+                    op()
+                result.setdefault(name, {})[f"{mode}_us"] = round((time.perf_counter() - t0) / rounds * 1e6, 1)
+        finally:
+            palette_engine.np = numpy
+    return result
+
+
+def bench_ui():
+    """Headless UI-Szenarien (Fake-Canvas, Fake-Zeit, echte Defaults), siehe bench_ui.py."""
+    import bench_ui
+    return bench_ui.run_suite()
+
+
+BENCHMARKS = {
+    "importtime": bench_importtime,
+    "convert": bench_convert,
+    "alarms": bench_alarms,
+    "daemon": bench_daemon,
+    "web": bench_web,
+    "term": bench_term,
+    "depth": bench_depth,
+    "export": bench_export,
+    "led": bench_led,
+    "palette": bench_palette,
+    "ui": bench_ui,
+}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    out_path = compare_path = None
+    for option in ("--out", "--compare"):
+        if option in argv:
+            i = argv.index(option)
+            if i + 1 >= len(argv):
+                print(f"{option} braucht einen Dateinamen")
+                return 2
+            if option == "--out": out_path = argv[i + 1]
+            else: compare_path = argv[i + 1]
+            del argv[i:i + 2]
+
+    names = argv or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unbekannter Benchmark: {name} (verfügbar: {', '.join(BENCHMARKS)})")
+            return 2
+        results[name] = BENCHMARKS[name]()
+    print(json.dumps(results, indent=4))
+
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+    ok = all(r.get("ok", True) for r in results.values())
+    if compare_path:
+        import bench_ui
+        with open(compare_path, encoding="utf-8") as f:
+            old = json.load(f)
+        diff, worse = {}, {}
+        for name, result in results.items():
+            if name not in old: continue
+            if name == "ui":
+                diff[name] = bench_ui.compare(old[name], result)
+                worse.update(bench_ui.regressions(old[name], result))
+            else:
+                diff[name] = bench_ui.compare({name: old[name]}, {name: result}).get(name, {})
+        print(json.dumps({"changed": diff, "regressions": worse}, indent=4))
+        ok = ok and not worse
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,594 @@
+# Datei: bench_ui.py
+"""
+Deterministische UI-Benchmarks ohne Display.
+
+Die echten UI-Klassen werden ohne Tk-Fenster erzeugt (cls.__new__ + Attribute) und zeichnen
+in eine FakeCanvas, die jede Operation zählt. Die Zeit kommt aus einer FakeClock, die Daten
+aus den echten Settings-Defaults. Dadurch sind Ops/Frame und geschriebene Bytes zwischen
+Commits exakt vergleichbar; nur µs/Frame schwankt mit der Maschine.
+
+    python bench.py ui                          -> alle Szenarien
+    python bench.py ui --out a.json             -> Ergebnis speichern
+    python bench.py ui --compare a.json         -> gegen einen früheren Lauf vergleichen
+"""
+import contextlib
+import io
+import os
+import tempfile
+import time
+from collections import Counter
+
+import core
+from history import History
+
+CANVAS_SIZE = (900, 480)
+
+
+# --- FAKES ---
+
+class FakeCanvas:
+    """Zählt Canvas-Operationen und hält die Items (für find_all / Item-Anzahl)."""
+
+    def __init__(self, width=CANVAS_SIZE[0], height=CANVAS_SIZE[1]):
+        self.width = width
+        self.height = height
+        self.ops = Counter()
+        self.items = {}
+        self.next_id = 1
+
+    def _create(self, kind, coords, options):
+        self.ops["create_" + kind] += 1
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = [kind, coords, options]
+        return item
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_image(self, *coords, **options):
+        return self._create("image", coords, options)
+
+    def delete(self, *tags):
+        self.ops["delete"] += 1
+        if "all" in tags:
+            self.items.clear()
+            return
+        for tag in tags:
+            if isinstance(tag, int):
+                self.items.pop(tag, None)
+            else:
+                for item in [i for i, v in self.items.items() if v[2].get("tags") == tag]:
+                    del self.items[item]
+
+    def itemconfigure(self, item, **options):
+        self.ops["itemconfigure"] += 1
+        if item in self.items: self.items[item][2].update(options)
+
+    itemconfig = itemconfigure
+
+    def coords(self, item, *coords):
+        self.ops["coords"] += 1
+        if coords and item in self.items: self.items[item][1] = coords
+        return self.items.get(item, [None, ()])[1]
+
+    def tag_raise(self, *args):
+        self.ops["tag_raise"] += 1
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def cget(self, name):
+        return {"width": self.width, "height": self.height}.get(name, "")
+
+    def config(self, **options):
+        self.ops["config"] += 1
+
+    configure = config
+
+
+class FakeWidget:
+    """Label / Button: config() wird nur gezählt."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def config(self, **options):
+        self.calls += 1
+
+    configure = config
+
+    def set_active(self, active):
+        self.calls += 1
+
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeEvent:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class FakeClock:
+    """Feste Startzeit, wird manuell weitergedreht. after() zählt nur die Wartezeiten."""
+
+    def __init__(self, day_ms=0, ff_us=0):
+        self.day_ms = day_ms
+        self.ff_us = ff_us
+        self.scheduled = 0
+        self.scheduled_ms = 0
+
+    def get_day_ms(self):
+        return self.day_ms
+
+    def get_ff_value(self):
+        return (self.ff_us * core.TOTAL_UNITS) // core.US_PER_DAY
+
+    def after(self, delay, callback=None, *args):
+        self.scheduled += 1
+        self.scheduled_ms += delay
+        return self.scheduled
+
+
+class FakeScheduler:
+    """after() / after_cancel() mit echter Warteschlange - run_pending() spielt einen Frame ab."""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+        self.frames = 0
+        self.last_delay = 0
+
+    def after(self, delay, callback=None, *args):
+        self.last_delay = delay
+        self.next_id += 1
+        self.pending[self.next_id] = (callback, args)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_pending(self):
+        pending, self.pending = self.pending, {}
+        for callback, args in pending.values():
+            if callback: callback(*args)
+        self.frames += 1
+
+
+def fake_image(png):
+    """Statt tk.PhotoImage (Sprite-Modus, siehe ui_plan_view.SpriteItems): nur die Größe merken."""
+    return len(png)
+
+
+def fake_settings(directory=None):
+    from settings_manager import SettingsManager
+    settings = SettingsManager.__new__(SettingsManager)
+    settings.filename = os.path.join(directory or tempfile.gettempdir(), "bench_settings.json")
+    settings.data = settings.get_defaults()
+    return settings
+
+
+def varied_settings():
+    """
+    Defaults, aber jedes Profil mit eigenem Design / Layout / Palette (in den Defaults zeigen alle
+    Profile auf Slot 0). Varianten von Slot 0: gespiegelt, Layout-Spiegelung gekippt, Palette rotiert.
+    """
+    settings = fake_settings()
+    lib = settings.data["library"]
+    design = core.list_to_grid(lib["nibbleGrids"][0]["cells"])
+    placements = lib["layoutGrids"][0]["placements"]
+    colors = lib["palettes"][0]["colors"]
+    for i, profile in enumerate(settings.data["profiles"]):
+        lib["nibbleGrids"][i]["cells"] = core.grid_to_list(core.transform_grid(design, i & 1, i & 2))
+        lib["layoutGrids"][i]["placements"] = [
+            dict(p, mirror={"x": p["mirror"]["x"] != bool(i & 4), "y": p["mirror"]["y"]}) for p in placements]
+        lib["palettes"][i]["colors"] = colors[i:] + colors[:i]
+        profile.update(nibbleGridId=i, layoutId=i, paletteId=i)
+    return settings
+
+
+def headless(cls, **attributes):
+    """UI-Objekt ohne Tk-Widget (kein __init__), Attribute von Hand gesetzt."""
+    obj = cls.__new__(cls)
+    obj.__dict__.update(attributes)
+    return obj
+
+
+def make_clock_display(settings, clock, canvas=None):
+    from ui_clock_display import ClockDisplay
+    display = headless(ClockDisplay, settings_manager=settings, running=True, alarm_engine=None, stats=None,
+                       budget=None, image_factory=fake_image, _plan=None, _plan_key=None,
+                       _mode_plan=(None, None, None, None), _items=None, _transition=None, last_morph=None,
+                       canvas=canvas or FakeCanvas(), debug_label=FakeWidget())
+    display.get_day_ms = clock.get_day_ms
+    display.after = clock.after
+    return display
+
+
+def make_ff_display(settings, clock, canvas=None):
+    from ui_ff_clock import FFClockDisplay
+    display = headless(FFClockDisplay, settings_manager=settings, running=True, alarm_engine=None, stats=None,
+                       budget=None, image_factory=fake_image, coherent=False, _plan=None, _plan_key=None,
+                       _mode_plan=(None, None, None, None), _items=None, canvas=canvas or FakeCanvas(),
+                       debug_label=FakeWidget())
+    display.get_ff_value = clock.get_ff_value
+    display.after = clock.after
+    return display
+
+
+def make_nibble_editor(settings, canvas=None, scheduler=None):
+    from ui_nibble_editor import NibbleEditor, GROUP_LIMITS
+    editor = headless(NibbleEditor, settings_manager=settings, current_group_id=3, drag_mode=None,
+                      last_drag_cell=None, bridge_gaps=FakeVar(True), fill_corners=FakeVar(True),
+                      canvas=canvas or FakeCanvas(), info_label=FakeWidget(),
+                      group_buttons={gid: FakeWidget() for gid in range(4)},
+                      grid_data=[[None] * 4 for _ in range(4)],
+                      group_counts={gid: 0 for gid in GROUP_LIMITS}, dirty_cells=set(), _frame_pending=None,
+                      items={}, item_fill={}, button_text={}, preview=None)
+    scheduler = scheduler or FakeScheduler()
+    editor.after = scheduler.after
+    editor.after_cancel = scheduler.after_cancel
+    editor.after_idle = editor.after
+    editor.history = History(editor.pack_grid, editor.unpack_grid)
+    editor.redraw_canvas()
+    return editor
+
+
+# --- MESSEN ---
+
+def _result(frames, seconds, canvases, extra=None):
+    ops = Counter()
+    for cv in canvases:
+        ops.update(cv.ops)
+    total = sum(ops.values())
+    result = {
+        "frames": frames,
+        "ops_per_frame": round(total / max(frames, 1), 3),
+        "us_per_frame": round(seconds / max(frames, 1) * 1e6, 2),
+        "ops": dict(sorted(ops.items())),
+    }
+    if extra: result.update(extra)
+    return result
+
+
+def bench_v16_sweep(step=1):
+    """Ganzer Tag: ein update_loop pro v16 Tick (Wert 0x0000 bis 0xFFFF)."""
+    settings = fake_settings()
+    clock = FakeClock()
+    display = make_clock_display(settings, clock)
+    frames = 0
+    t0 = time.perf_counter()
+    for v16 in range(0, core.TOTAL_UNITS, step):
+        # Erste Millisekunde des Ticks (wie nach einem pünktlichen Smart Sleep)
+        clock.day_ms = -(-v16 * core.MS_PER_DAY // core.TOTAL_UNITS)
+        display.update_loop()
+        frames += 1
+    elapsed = time.perf_counter() - t0
+    return _result(frames, elapsed, [display.canvas],
+                   {"items_after": len(display.canvas.items), "mean_delay_ms": round(clock.scheduled_ms / frames, 3)})
+
+
+def bench_ff_sweep(frames=8192):
+    """F.F: 50 ms Schritte wie der echte Loop, mitten über eine Tagesgrenze (oberer Block ändert sich)."""
+    settings = fake_settings()
+    clock = FakeClock(ff_us=400 * core.US_PER_DAY - frames * 25_000)
+    display = make_ff_display(settings, clock)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        clock.ff_us += 50_000
+        display.update_loop()
+    elapsed = time.perf_counter() - t0
+    return _result(frames, elapsed, [display.canvas], {"items_after": len(display.canvas.items)})
+
+
+def bench_profile_switch(rounds=64):
+    """
+    Profil-Hotkeys 0-F reihum, jedes Mal force_redraw. Der Übergang (ui_plan_view.morph) läuft
+    danach über seine Frames (FakeScheduler), erst dann kommt der nächste Wechsel.
+    """
+    settings = varied_settings()
+    clock = FakeClock(day_ms=12 * 3_600_000)
+    display = make_clock_display(settings, clock)
+    scheduler = FakeScheduler()
+    display.after = scheduler.after
+    display.force_redraw()
+    display.canvas.ops.clear()
+    frames = 0
+    worst = 0
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for profile_id in range(16):
+            settings.data["active_profileId"] = (profile_id + 1) % 16
+            display.force_redraw()
+            while scheduler.pending:
+                scheduler.run_pending()
+            frames += 1
+            if display.last_morph: worst = max(worst, display.last_morph["max_ops_per_frame"])
+    elapsed = time.perf_counter() - t0
+    return _result(frames, elapsed, [display.canvas],
+                   {"items_after": len(display.canvas.items), "morph_frames": scheduler.frames,
+                    "max_ops_per_morph_frame": worst})
+
+
+def bench_nibble_drag(strokes=200, moves_per_cell=4, events_per_frame=2):
+    """
+    Malen per Drag: Schlangenlinie über alle 16 Zellen, mehrere Motion-Events pro Zelle.
+    Alle events_per_frame Events läuft ein Frame (Maus mit ~120 Hz gegen 60 Hz Anzeige).
+    """
+    from ui_nibble_editor import CELL_SIZE, GAP_SIZE, CANVAS_SIZE as EDITOR_SIZE
+    settings = fake_settings()
+    scheduler = FakeScheduler()
+    editor = make_nibble_editor(settings, FakeCanvas(EDITOR_SIZE, EDITOR_SIZE), scheduler)
+    editor.canvas.ops.clear()
+    offset = (EDITOR_SIZE - (4 * CELL_SIZE + 3 * GAP_SIZE)) // 2
+
+    path = []
+    for r in range(4):
+        cols = range(4) if r % 2 == 0 else range(3, -1, -1)
+        for c in cols:
+            for k in range(moves_per_cell):
+                x = offset + c * (CELL_SIZE + GAP_SIZE) + k * CELL_SIZE // moves_per_cell
+                y = offset + r * (CELL_SIZE + GAP_SIZE) + CELL_SIZE // 2
+                path.append(FakeEvent(x, y))
+
+    events = 0
+    t0 = time.perf_counter()
+    for stroke in range(strokes):
+        editor.current_group_id = stroke % 4
+        editor.on_mouse_down(path[0])
+        for i, event in enumerate(path[1:], 1):
+            editor.on_mouse_drag(event)
+            if i % events_per_frame == 0: scheduler.run_pending()
+        editor.on_mouse_up(path[-1])
+        events += len(path) + 1
+    elapsed = time.perf_counter() - t0
+    return _result(events, elapsed, [editor.canvas], {"unit": "event", "paint_frames": scheduler.frames})
+
+
+def bench_overload(calm_s=30, busy_s=90, recover_s=300, lag_ms=1500, op_us=300):
+    """
+    Frame-Budget unter Last (frame_budget.py): die Uhr läuft calm_s ruhig, dann busy_s lang mit
+    lag_ms Verspätung pro Frame (blockierter Event-Loop), danach wieder ruhig. Die Zeit ist
+    simuliert: jede Canvas-Operation kostet op_us. Gemessen: Modus-Wechsel, übersprungene Werte
+    und Ops pro Frame je Modus.
+    """
+    from frame_budget import FrameBudget
+    settings = fake_settings()
+    clock = FakeClock()
+    display = make_clock_display(settings, clock)
+    now = [0.0]
+    display.budget = budget = FrameBudget("clock", timer=lambda: now[0])
+    canvas = display.canvas
+
+    render = display.render_clock
+
+    def timed_render(v16):
+        before = sum(canvas.ops.values())
+        changed = render(v16)
+        now[0] += (sum(canvas.ops.values()) - before) * op_us / 1e6
+        return changed
+
+    display.render_clock = timed_render
+    ops_by_mode, frames_by_mode = Counter(), Counter()
+    frames = 0
+    t0 = time.perf_counter()
+    while now[0] < calm_s + busy_s + recover_s:
+        lag = lag_ms if calm_s <= now[0] < calm_s + busy_s else 0
+        clock.day_ms = int(now[0] * 1000) % core.MS_PER_DAY
+        mode = budget.mode
+        before = sum(canvas.ops.values())
+        display.update_loop()
+        ops_by_mode[mode] += sum(canvas.ops.values()) - before
+        frames_by_mode[mode] += 1
+        frames += 1
+        now[0] += (core.ms_until_next_tick(clock.day_ms) + lag) / 1000
+    elapsed = time.perf_counter() - t0
+    return _result(frames, elapsed, [canvas], {
+        "final_mode": budget.mode,
+        "switches": dict(budget.switches),
+        "values_skipped": budget.skipped,
+        "mode_log": [f"{t:.0f}s {a}->{b}" for t, a, b, _ in budget.log],
+        "ops_per_frame_by_mode": {m: round(ops_by_mode[m] / frames_by_mode[m], 2) for m in frames_by_mode},
+    })
+
+
+def bench_minigrid_redraw(rounds=50):
+    """Profil-Tab: alle vier MiniGridSelector komplett neu zeichnen (4 x 16 Canvas)."""
+    from ui_mini_grid import MiniGridSelector
+    settings = fake_settings()
+    grids = []
+    for grid_type in ("nibble", "palette", "layout", "profile"):
+        grids.append(headless(MiniGridSelector, settings_manager=settings, grid_type=grid_type,
+                              on_click_callback=None, color_theme="#FFFFFF", active_slot=-1,
+                              canvases=[FakeCanvas(40, 40) for _ in range(16)]))
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for grid in grids:
+            grid.redraw_all_slots()
+    elapsed = time.perf_counter() - t0
+    return _result(rounds, elapsed, [cv for g in grids for cv in g.canvases], {"unit": "full redraw"})
+
+
+def bench_settings_io(rounds=50):
+    """save_settings / load_settings mit den echten Defaults in ein Temp-Verzeichnis."""
+    with tempfile.TemporaryDirectory() as directory:
+        settings = fake_settings(directory)
+        written = 0
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            settings.save_settings()
+            written += os.path.getsize(settings.filename)
+        save_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            settings.load_settings()
+        load_s = time.perf_counter() - t0
+    return {
+        "rounds": rounds,
+        "bytes_per_save": written // rounds,
+        "save_us": round(save_s / rounds * 1e6, 1),
+        "load_us": round(load_s / rounds * 1e6, 1),
+    }
+
+
+def make_overlay_launcher(settings, count):
+    """OverlayLauncher mit `count` Overlays ohne Tk: alle auf Profil 0, Zonen UTC, +00:30, +01:00, ..."""
+    import timezones
+    import ui_overlay
+    root = FakeScheduler()
+    launcher = headless(ui_overlay.OverlayLauncher, root=root, settings=settings,
+                        plans=ui_overlay.PlanCache(settings), scheduler=ui_overlay.TickScheduler(root), overlays=[])
+    for i in range(count):
+        overlay = headless(ui_overlay.OverlayWindow, launcher=launcher, profile_id=0,
+                           schedule=timezones.OffsetSchedule(i * 1800), canvas=FakeCanvas(),
+                           plan_key=None, items=None, hex_text=None, value=None, position=(0, 0))
+        overlay.geometry = lambda spec: None
+        overlay.build()
+        launcher.overlays.append(overlay)
+        launcher.scheduler.add(overlay)
+    return launcher
+
+
+# Ein Overlay als eigener Prozess (wie vor ui_overlay.py): RSS nach Settings + Plan + Items
+_PROCESS_PROBE = ("import contextlib, io, bench_ui, soak\n"
+                  "with contextlib.redirect_stdout(io.StringIO()):\n"
+                  "    bench_ui.make_overlay_launcher(bench_ui.fake_settings(), 1)\n"
+                  "print(soak.rss_kb())\n")
+
+
+def _process_rss_kb():
+    import subprocess
+    import sys
+    try:
+        out = subprocess.run([sys.executable, "-c", _PROCESS_PROBE], capture_output=True, text=True, timeout=60,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+        return int(out.split()[-1])
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+        return None
+
+
+def bench_overlays(counts=(1, 10), span_s=3600):
+    """
+    Overlay-Launcher (ui_overlay.py): 1 gegen 10 Overlays in EINEM Prozess (geteilter PlanCache
+    und TickScheduler), simulierte Stunde. Gemessen pro Anzahl: Python-Speicher von Launcher +
+    Overlays (tracemalloc), Scheduler-Durchläufe und CPU pro Stunde.
+
+    Zum Vergleich das RSS eines frischen Prozesses mit einem Overlay (process_rss_kb): so viel
+    kostete früher jedes weitere Overlay. memory_ratio = (1 Prozess mit 10 Overlays) / (1 Prozess
+    mit 1 Overlay) - ohne den Tk-Interpreter, der pro Prozess noch dazukäme (ohne Display nicht messbar).
+    wakeups_ratio: geteilter Scheduler gegen 10 bei getrennten Prozessen. Das Zeichnen selbst
+    (cpu_ratio) wächst mit der Anzahl der Uhren.
+    """
+    import tracemalloc
+    import timezones
+    import ui_overlay  # vorab importieren: der Import soll nicht in python_kb landen
+
+    real_now = timezones.utc_ms_now
+    now = [1_792_411_200_000]
+    timezones.utc_ms_now = lambda: now[0]
+    result = {}
+    try:
+        for count in counts:
+            settings = fake_settings()
+            tracemalloc.start()
+            launcher = make_overlay_launcher(settings, count)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            root = launcher.root
+            canvases = [o.canvas for o in launcher.overlays]
+            for cv in canvases: cv.ops.clear()
+            end = now[0] + span_s * 1000
+            t0 = time.perf_counter()
+            launcher.start()
+            while now[0] < end:
+                now[0] += root.last_delay
+                root.run_pending()
+            elapsed = time.perf_counter() - t0
+            launcher.scheduler.stop()
+
+            run = _result(root.frames, elapsed, canvases)
+            result[f"python_kb_{count}"] = round(memory / 1024, 1)
+            result[f"plans_compiled_{count}"] = len(launcher.plans.plans)
+            result[f"wakeups_per_hour_{count}"] = round(root.frames * 3600 / span_s)
+            result[f"cpu_ms_per_hour_{count}"] = round(elapsed * 3600 / span_s * 1000, 1)
+            result.update(frames=run["frames"], ops_per_frame=run["ops_per_frame"], ops=run["ops"])
+    finally:
+        timezones.utc_ms_now = real_now
+
+    lo, hi = counts[0], counts[-1]
+    per_overlay_kb = (result[f"python_kb_{hi}"] - result[f"python_kb_{lo}"]) / (hi - lo)
+    process_kb = _process_rss_kb()
+    result["per_overlay_kb"] = round(per_overlay_kb, 1)
+    result["process_rss_kb"] = process_kb
+    if process_kb:
+        result["memory_ratio"] = round((process_kb + (hi - lo) * per_overlay_kb) / process_kb, 3)
+    result["wakeups_ratio"] = round(result[f"wakeups_per_hour_{hi}"] / result[f"wakeups_per_hour_{lo}"], 2)
+    result["cpu_ratio"] = round(result[f"cpu_ms_per_hour_{hi}"] / result[f"cpu_ms_per_hour_{lo}"], 2)
+    result["unit"] = f"scheduler loop, {hi} overlays"
+    return result
+
+
+SCENARIOS = {
+    "v16_sweep": bench_v16_sweep,
+    "ff_sweep": bench_ff_sweep,
+    "profile_switch": bench_profile_switch,
+    "overload": bench_overload,
+    "nibble_drag": bench_nibble_drag,
+    "minigrid_redraw": bench_minigrid_redraw,
+    "settings_io": bench_settings_io,
+    "overlays": bench_overlays,
+}
+
+def run_suite(names=None):
+    results = {}
+    # SettingsManager meldet sich per print() - im Benchmark nicht
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in names or SCENARIOS:
+            results[name] = SCENARIOS[name]()
+    return results
+
+
+def compare(old, new):
+    """{szenario: {metrik: [alt, neu]}} für alle Metriken, die sich geändert haben."""
+    diff = {}
+    for name, metrics in new.items():
+        before = old.get(name, {})
+        changed = {key: [before.get(key), value] for key, value in metrics.items()
+                   if not isinstance(value, dict) and before.get(key) != value}
+        if changed: diff[name] = changed
+    return diff
+
+
+def regressions(old, new, tolerance=0.0):
+    """Szenarien, deren stabile Metriken schlechter geworden sind (mehr Ops / Bytes)."""
+    worse = {}
+    for name, metrics in new.items():
+        for key in ("ops_per_frame", "bytes_per_save"):
+            before = old.get(name, {}).get(key)
+            after = metrics.get(key)
+            if before is not None and after is not None and after > before * (1 + tolerance):
+                worse.setdefault(name, {})[key] = [before, after]
+    return worse
@@ -0,0 +1,402 @@
+# Datei: cli.py
+"""
+Kommandozeile der Binary Clock (ohne Tk).
+
+    python cli.py stamp [--format ff|v16] [--utc-offset SEK] [--jobs N] < log.txt > out.txt
+    python cli.py daemon [--slot PFAD] [--socket PFAD]
+    python cli.py serve [--host HOST] [--port PORT]
+    python cli.py term [--profile ID] [--ff]
+    python cli.py led TARGET [--size 64x64] [--profile ID] [--ff] [--depth 8..32]
+    python cli.py svg OUT [--value HEX | --start HEX --count N] [--ff | --ff-coherent]
+    python cli.py export OUT [--format png|svg|raw|sprite] [--start N] [--count N] [--jobs N]
+    python cli.py compile ROOT [--out DIR] [--pattern GLOB] [--jobs N] > report.jsonl
+    python cli.py alarm list | add WERT [--repeat] [--label TEXT] | rm ID [ID ...]
+"""
+import argparse
+import contextlib
+import re
+import sys
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+
+import convert
+
+# Führender Zeitstempel: ISO-8601 oder Epoch-Zahl (s, ms, µs oder ns)
+ISO_PATTERN = re.compile(
+    rb"\s*(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d{1,9})?)?(?:Z|[+-]\d{2}:?\d{2})?)"
+)
+EPOCH_PATTERN = re.compile(rb"\s*(\d{9,19})(?:\.(\d{1,9}))?(?!\d)")
+
+BATCH_LINES = 20_000
+WRITE_BUFFER = 1 << 20
+
+
+# --- PARSEN ---
+
+def _iso_to_ns(text, default_offset_s):
+    text = text.replace(",", ".")
+    # fromisoformat kennt nur 6 Nachkommastellen
+    frac_match = re.search(r"\.(\d+)", text)
+    extra_ns = 0
+    if frac_match and len(frac_match.group(1)) > 6:
+        digits = frac_match.group(1)
+        extra_ns = int(digits[6:9].ljust(3, "0"))
+        text = text[:frac_match.start(1) + 6] + text[frac_match.end(1):]
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is None:
+        # Naive Zeit -> in der angegebenen Zone interpretieren
+        offset_ns = default_offset_s * 1_000_000_000
+        dt = dt.replace(tzinfo=timezone.utc)
+    else:
+        offset_ns = 0
+    delta = dt - convert.UNIX_EPOCH
+    us = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return us * 1000 + extra_ns - offset_ns
+
+
+def _epoch_to_ns(whole, frac):
+    digits = len(whole)
+    value = int(whole)
+    if digits >= 18: return value                  # ns
+    if digits >= 15: scale = 1_000                  # µs
+    elif digits >= 12: scale = 1_000_000            # ms
+    else: scale = 1_000_000_000                     # s
+    ns = value * scale
+    if frac:
+        ns += int(frac.decode().ljust(9, "0")[:9]) * scale // 1_000_000_000
+    return ns
+
+
+def parse_leading_timestamp(line, default_offset_s=0):
+    """Unix-ns des Zeitstempels am Zeilenanfang, oder None."""
+    m = ISO_PATTERN.match(line)
+    if m:
+        try:
+            return _iso_to_ns(m.group(1).decode("ascii"), default_offset_s)
+        except ValueError:
+            return None
+    m = EPOCH_PATTERN.match(line)
+    if m:
+        return _epoch_to_ns(m.group(1), m.group(2))
+    return None
+
+
+# --- PIPELINE ---
+
+def read_batches(stream, batch_lines=BATCH_LINES):
+    """Generator: Listen von Zeilen (bytes), konstanter Speicher."""
+    while True:
+        batch = list(islice(stream, batch_lines))
+        if not batch: return
+        yield batch
+
+
+def stamp_batch(batch, fmt="ff", utc_offset_s=0):
+    """Ein Block Zeilen -> ein bytes-Objekt mit vorangestelltem Stempel (läuft auch im Worker)."""
+    out = []
+    for line in batch:
+        ns = parse_leading_timestamp(line, utc_offset_s)
+        if ns is None:
+            out.append(line)
+        elif fmt == "v16":
+            out.append(b"0x%04X " % convert.ns_to_v16(ns, utc_offset_s) + line)
+        else:
+            out.append(b"F.F:%08X " % (convert.ns_to_ff(ns) & 0xFFFFFFFF) + line)
+    return b"".join(out)
+
+
+def _stamp_job(args):
+    return stamp_batch(*args)
+
+
+def stamp_stream(stream, fmt="ff", utc_offset_s=0, jobs=1, batch_lines=BATCH_LINES):
+    """Generator der gestempelten Blöcke - Reihenfolge bleibt erhalten."""
+    batches = read_batches(stream, batch_lines)
+    if jobs <= 1:
+        for batch in batches:
+            yield stamp_batch(batch, fmt, utc_offset_s)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Gleitendes Fenster: höchstens 2 * jobs Blöcke unterwegs -> konstanter Speicher
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(_stamp_job, (batch, fmt, utc_offset_s)))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def cmd_stamp(args):
+    stdin = sys.stdin.buffer
+    stdout = open(sys.stdout.fileno(), "wb", buffering=WRITE_BUFFER, closefd=False)
+    try:
+        for chunk in stamp_stream(stdin, args.format, args.utc_offset, args.jobs, args.batch_lines):
+            stdout.write(chunk)
+    except BrokenPipeError:
+        return 0
+    finally:
+        try:
+            stdout.flush()
+        except BrokenPipeError:
+            pass
+    return 0
+
+
+def cmd_daemon(args):
+    import asyncio
+    from daemon import ClockDaemon, DEFAULT_SLOT_PATH, DEFAULT_SOCKET_PATH
+
+    # None = Standardpfad, '' = aus
+    slot = DEFAULT_SLOT_PATH if args.slot is None else args.slot
+    socket_path = DEFAULT_SOCKET_PATH if args.socket is None else args.socket
+    daemon = ClockDaemon(slot_path=slot or None, socket_path=socket_path or None)
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_serve(args):
+    import asyncio
+    from settings_manager import SettingsManager
+    from web_server import TickServer
+
+    server = TickServer(SettingsManager(), host=args.host, port=args.port)
+    print(f"Dashboard: http://{args.host}:{args.port}/")
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_term(args):
+    from settings_manager import SettingsManager
+    from term_render import TerminalRenderer
+
+    data = SettingsManager().data
+    profile = data["profiles"][args.profile] if args.profile is not None else None
+    stats = TerminalRenderer(data, profile).run(use_ff=args.ff)
+    print(f"Ticks: {stats['ticks']}  Bytes/Tick: {stats['bytes_per_tick']}  "
+          f"CPU/Stunde: {stats['cpu_s_per_hour']} s", file=sys.stderr)
+    return 0
+
+
+def cmd_export(args):
+    import time
+    from settings_manager import SettingsManager
+    from exporter import FrameExporter, compile_export_plan
+
+    # SettingsManager meldet sich per print() - stdout gehört bei "raw -" dem Frame-Stream
+    with contextlib.redirect_stdout(sys.stderr):
+        data = SettingsManager().data
+    profile = data["profiles"][args.profile] if args.profile is not None else None
+    exporter = FrameExporter(compile_export_plan(data, profile), args.format, args.jobs)
+    count = args.count if args.count is not None else (256 if args.format == "sprite" else 65536 - args.start)
+
+    t0 = time.perf_counter()
+    if args.format in ("png", "svg"):
+        exporter.export_files(args.out, args.start, count)
+    elif args.format == "raw":
+        # "-" = stdout, z.B. | ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r 30 -i - clock.mp4
+        print(f"raw rgb24 {exporter.width}x{exporter.height}", file=sys.stderr)
+        out = open(sys.stdout.fileno(), "wb", buffering=WRITE_BUFFER, closefd=False) if args.out == "-" \
+            else open(args.out, "wb")
+        try:
+            exporter.export_stream(out, args.start, count)
+        except BrokenPipeError:
+            return 0
+        finally:
+            try:
+                out.close()
+            except BrokenPipeError:
+                pass
+    else:
+        with open(args.out, "wb") as out:
+            exporter.export_sprite(out, args.start, count, args.columns)
+    elapsed = time.perf_counter() - t0
+    print(f"{count} Frames in {elapsed:.1f} s ({count / max(elapsed, 1e-9):.0f} Frames/s)", file=sys.stderr)
+    return 0
+
+
+def cmd_led(args):
+    import led_render
+    from settings_manager import SettingsManager
+
+    width, height = (int(n) for n in args.size.lower().split("x"))
+    with contextlib.redirect_stdout(sys.stderr):
+        data = SettingsManager().data
+    profile = data["profiles"][args.profile] if args.profile is not None else None
+    if args.depth:
+        renderer = led_render.LedRenderer.for_depth(data, width, height, args.depth, profile)
+    else:
+        renderer = led_render.LedRenderer.for_panel(data, width, height, profile)
+    print(f"LED {width}x{height} rgb24, {renderer.bits} Bit -> {args.target}", file=sys.stderr)
+    led_render.run(renderer, led_render.open_sink(args.target, width, height), use_ff=args.ff, depth=args.depth)
+    return 0
+
+
+def cmd_svg(args):
+    from settings_manager import SettingsManager
+    from svg_export import SvgProfile
+
+    data = SettingsManager().data
+    profile = data["profiles"][args.profile] if args.profile is not None else None
+    mode = "ff_coherent" if args.ff_coherent else "ff" if args.ff else "v16"
+    svg = SvgProfile(data, profile, mode)
+    with open(args.out, "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+        if args.value is not None:
+            out.write(svg.single(args.value))
+            return 0
+        count = args.count if args.count is not None else (1 << 16) - args.start
+        frames = svg.write_range(out, range(args.start, args.start + count))
+    print(f"{frames} Frames -> {args.out} (Anzeige: {args.out}#f_{args.start:0{svg.bits // 4}X})", file=sys.stderr)
+    return 0
+
+
+def cmd_compile(args):
+    import json
+    import time
+    from settings_check import compile_tree
+
+    t0 = time.perf_counter()
+    files = invalid = 0
+    out = sys.stdout
+    for report in compile_tree(args.root, args.out, args.jobs, args.pattern, args.batch_files):
+        out.write(json.dumps(report, ensure_ascii=False) + "\n")
+        files += 1
+        if not report["ok"]: invalid += 1
+    out.flush()
+    elapsed = time.perf_counter() - t0
+    print(f"{files} Dateien, {invalid} ungültig, {elapsed:.2f} s ({files / max(elapsed, 1e-9):.0f} Dateien/s)",
+          file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def cmd_alarm(args):
+    from alarms import AlarmEngine, format_alarm_value
+
+    # Die laufende Uhr lädt die Datei neu, sobald sie sich ändert (alarms.RELOAD_CHECK_S)
+    engine = AlarmEngine(args.file or None, autosave=False)
+    engine.load()
+    if args.action == "add":
+        try:
+            alarm_id = engine.add_spec(args.value, repeat=args.repeat, label=args.label)
+        except ValueError as e:
+            print(f"Ungültiger Wert: {e}", file=sys.stderr)
+            return 2
+        engine.save()
+        print(alarm_id)
+    elif args.action == "rm":
+        missing = [alarm_id for alarm_id in args.ids if not engine.remove(alarm_id)]
+        if len(missing) < len(args.ids): engine.save()
+        if missing:
+            print(f"Nicht gefunden: {', '.join(map(str, missing))}", file=sys.stderr)
+            return 1
+    else:
+        for alarm in engine.sorted_alarms():
+            repeat = "täglich" if alarm["repeat"] else "einmal"
+            print(f"{alarm['id']:>6}  {alarm['kind']:<3}  {format_alarm_value(alarm['kind'], alarm['value']):<10}  "
+                  f"{repeat:<7}  {alarm['label']}")
+    return 0
+
+
+# --- ARGUMENTE ---
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="binaryclock", description="Binary Clock Kommandozeile")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_stamp = sub.add_parser("stamp", help="Log-Zeilen (stdin) mit v16 / F.F Stempel versehen")
+    p_stamp.add_argument("--format", choices=["ff", "v16"], default="ff")
+    p_stamp.add_argument("--utc-offset", type=int, default=0,
+                         help="Offset in Sekunden für naive Zeitstempel und v16 (Standard: UTC)")
+    p_stamp.add_argument("--jobs", type=int, default=1, help="Anzahl Worker-Prozesse")
+    p_stamp.add_argument("--batch-lines", type=int, default=BATCH_LINES)
+    p_stamp.set_defaults(func=cmd_stamp)
+
+    # daemon (asyncio, mmap) erst in cmd_daemon importieren - der Parser bleibt leicht
+    p_daemon = sub.add_parser("daemon", help="Headless: v16 / F.F pro Tick über Shared Memory und Socket verteilen")
+    p_daemon.add_argument("--slot", default=None, help="Memory-mapped Datei (Standard: /dev/shm bzw. Temp-Ordner, '' = aus)")
+    p_daemon.add_argument("--socket", default=None, help="Unix Socket (Standard: im Temp-Ordner, '' = aus)")
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    p_serve = sub.add_parser("serve", help="Ticks per WebSocket / SSE an Browser-Dashboards streamen")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_term = sub.add_parser("term", help="Uhr im Terminal (ANSI, nur geänderte Zellen)")
+    p_term.add_argument("--profile", type=int, default=None, help="Profil-ID (Standard: aktives Profil)")
+    p_term.add_argument("--ff", action="store_true", help="untere 16 Bit des F.F Werts statt lokaler v16")
+    p_term.set_defaults(func=cmd_term)
+
+    p_led = sub.add_parser("led", help="LED-Panel Framebuffer (RGB24) in Datei (mmap), FIFO / pty oder stdout")
+    p_led.add_argument("target", help="Datei (memory-mapped), FIFO / Gerät oder '-' für stdout")
+    p_led.add_argument("--size", default="64x64", help="Panel-Größe BxH")
+    p_led.add_argument("--profile", type=int, default=None, help="Profil-ID (Standard: aktives Profil)")
+    p_led.add_argument("--ff", action="store_true", help="untere 16 Bit des F.F Werts statt lokaler v16 "
+                                                        "(mit --depth: untere N Bit, 32 = ganzer F.F Wert)")
+    p_led.add_argument("--depth", type=int, choices=(8, 12, 16, 20, 24, 28, 32), default=None,
+                       help="Generiertes Layout mit N Bit, Tagesanteil mit N Bit Auflösung (depth_engine)")
+    p_led.set_defaults(func=cmd_led)
+
+    p_svg = sub.add_parser("svg", help="Profil als SVG (ein Wert oder ein ganzer Bereich mit <symbol>/<use>)")
+    p_svg.add_argument("out", help="Ziel-Datei (.svg)")
+    p_svg.add_argument("--profile", type=int, default=None, help="Profil-ID (Standard: aktives Profil)")
+    p_svg.add_argument("--value", type=lambda s: int(s, 0), default=None, help="Nur diesen Wert (z.B. 0x8000)")
+    p_svg.add_argument("--start", type=lambda s: int(s, 0), default=0)
+    p_svg.add_argument("--count", type=int, default=None, help="Anzahl Frames (Standard: bis 0xFFFF)")
+    p_svg.add_argument("--ff", action="store_true", help="32 Bit F.F Wert (zwei Blöcke wie die F.F Uhr)")
+    p_svg.add_argument("--ff-coherent", action="store_true", help="32 Bit F.F als ein generiertes Layout")
+    p_svg.set_defaults(func=cmd_svg)
+
+    p_export = sub.add_parser("export", help="Frames offline rendern (PNG / SVG / RGB24 Stream / Sprite Sheet)")
+    p_export.add_argument("out", help="Ordner (png/svg), Datei (sprite) oder Datei/'-' (raw)")
+    p_export.add_argument("--format", choices=["png", "svg", "raw", "sprite"], default="png")
+    p_export.add_argument("--profile", type=int, default=None, help="Profil-ID (Standard: aktives Profil)")
+    p_export.add_argument("--start", type=lambda s: int(s, 0), default=0, help="Erster Wert (z.B. 0x8000)")
+    p_export.add_argument("--count", type=int, default=None, help="Anzahl Frames (Standard: Rest des Tages)")
+    p_export.add_argument("--columns", type=int, default=16, help="Frames pro Zeile im Sprite Sheet")
+    p_export.add_argument("--jobs", type=int, default=None, help="Worker-Prozesse (Standard: alle CPUs)")
+    p_export.set_defaults(func=cmd_export)
+
+    p_compile = sub.add_parser("compile", help="Settings-Dateien eines Ordners prüfen und Render-Pläne vorkompilieren")
+    p_compile.add_argument("root", help="Ordner, wird rekursiv durchsucht")
+    p_compile.add_argument("--out", default=None, help="Ziel-Ordner für *.plans.json (ohne: nur prüfen)")
+    p_compile.add_argument("--pattern", default="*.json", help="Dateinamen-Muster (Standard: *.json)")
+    p_compile.add_argument("--jobs", type=int, default=None, help="Worker-Prozesse (Standard: alle CPUs)")
+    p_compile.add_argument("--batch-files", type=int, default=32, help="Dateien pro Worker-Auftrag")
+    p_compile.set_defaults(func=cmd_compile)
+
+    p_alarm = sub.add_parser("alarm", help="Alarme anzeigen, anlegen und löschen")
+    p_alarm.add_argument("--file", default=None, help="Alarm-Datei (Standard: binClockAlarms.json neben den Settings)")
+    alarm_sub = p_alarm.add_subparsers(dest="action", required=True)
+    alarm_sub.add_parser("list", help="Alle Alarme")
+    p_alarm_add = alarm_sub.add_parser("add", help="Alarm anlegen (gibt die ID aus)")
+    p_alarm_add.add_argument("value", help="v16 als 0x8000 oder F.F als 0002.4000")
+    p_alarm_add.add_argument("--repeat", action="store_true", help="v16: täglich wiederholen")
+    p_alarm_add.add_argument("--label", default="")
+    p_alarm_rm = alarm_sub.add_parser("rm", help="Alarme löschen")
+    p_alarm_rm.add_argument("ids", type=int, nargs="+")
+    p_alarm.set_defaults(func=cmd_alarm)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
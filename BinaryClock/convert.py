@@ -0,0 +1,297 @@
+# Datei: convert.py
+"""
+Bulk-Konvertierung: Epoch-Nanosekunden <-> v16 / F.F (v32).
+
+Arbeitet auf NumPy Arrays in einem vektorisierten Durchlauf. Ohne NumPy wird auf
+reines Python (array.array) zurückgefallen. NumPy wird erst beim ersten Bulk-Aufruf
+geladen (load_numpy), die skalaren Funktionen (cli.py stamp) kommen ohne aus.
+Die Rundung entspricht bit-genau den UI-Klassen:
+  - v16: Zeit wird wie in ClockDisplay.get_day_ms auf Millisekunden abgeschnitten
+  - F.F: Zeit wird wie in FFClockDisplay.get_ff_value (datetime) auf Mikrosekunden abgeschnitten
+
+Die Umkehrung (Wert -> [start, end) Intervall) liefert genau die Zeitstempel,
+die wieder auf denselben Wert abgebildet werden.
+"""
+import operator
+import re
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from core import EPOCH_DATE, MS_PER_DAY, US_PER_DAY, TOTAL_UNITS
+
+np = None  # NumPy ist optional, siehe load_numpy()
+_numpy_checked = False
+
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# EPOCH_DATE als Unix-Mikrosekunden (exakt, ohne Float)
+_UNIX_EPOCH_DAYS = (EPOCH_DATE.date().toordinal() - 719163)
+EPOCH_US = _UNIX_EPOCH_DAYS * US_PER_DAY
+EPOCH_NS = EPOCH_US * 1000
+
+
+def load_numpy():
+    """NumPy beim ersten Aufruf importieren (setzt das Modul-Attribut np). None = nicht installiert."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np
+
+
+def _as_int64(values):
+    """NumPy Array (int64) aus Array, Buffer oder Liste - ohne Kopie, wenn möglich."""
+    if isinstance(values, np.ndarray):
+        return values.astype(np.int64, copy=False)
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        return np.frombuffer(values, dtype=np.int64)
+    if isinstance(values, array):
+        return np.frombuffer(values, dtype=np.int64) if values.itemsize == 8 else np.asarray(values, dtype=np.int64)
+    return np.asarray(values, dtype=np.int64)
+
+
+def _as_list(values):
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        return memoryview(values).cast("q")
+    return values
+
+
+# --- SKALAR (Referenz) ---
+
+def ns_to_v16(ns, utc_offset_s=0):
+    ms = (ns // 1_000_000 + utc_offset_s * 1000) % MS_PER_DAY
+    return (ms * TOTAL_UNITS) // MS_PER_DAY
+
+
+def ns_to_ff(ns):
+    days, rest = divmod(ns // 1000 - EPOCH_US, US_PER_DAY)
+    return days * TOTAL_UNITS + (rest * TOTAL_UNITS) // US_PER_DAY
+
+
+# --- BULK ---
+
+def _whole_seconds(offset):
+    """Ein Offset als int: 3600.0 -> 3600, 5400.5 -> ValueError (mit und ohne NumPy gleich)."""
+    try:
+        return operator.index(offset)
+    except TypeError:
+        if float(offset).is_integer(): return int(offset)
+        raise ValueError(f"UTC-Offset muss ganze Sekunden haben: {offset!r}") from None
+
+
+def bulk_v16(epoch_ns, utc_offset_s=0):
+    """
+    v16 (lokale Tageszeit) für viele Zeitstempel.
+    utc_offset_s: Offset in ganzen Sekunden (Skalar oder Array gleicher Länge), sonst ValueError.
+    """
+    scalar = isinstance(utc_offset_s, (int, float)) or getattr(utc_offset_s, "ndim", None) == 0
+    if load_numpy() is None:
+        if scalar:
+            off = _whole_seconds(utc_offset_s)
+            return array("H", (ns_to_v16(ns, off) for ns in _as_list(epoch_ns)))
+        offsets = [_whole_seconds(o) for o in _as_list(utc_offset_s)]
+        return array("H", (ns_to_v16(ns, o) for ns, o in zip(_as_list(epoch_ns), offsets)))
+
+    if scalar:
+        offsets = _whole_seconds(utc_offset_s)
+    else:
+        offsets = np.asarray(utc_offset_s)
+        if offsets.dtype.kind == "f":
+            if not np.all(np.mod(offsets, 1) == 0):
+                raise ValueError("UTC-Offset muss ganze Sekunden haben")
+            offsets = offsets.astype(np.int64)
+    ms = _as_int64(epoch_ns) // 1_000_000
+    ms += np.asarray(offsets, dtype=np.int64) * 1000
+    np.remainder(ms, MS_PER_DAY, out=ms)
+    ms *= TOTAL_UNITS
+    ms //= MS_PER_DAY
+    return ms.astype(np.uint16)
+
+
+def bulk_ff(epoch_ns):
+    """F.F v32 (UTC, seit EPOCH_DATE) für viele Zeitstempel. Ergebnis int64 (kann negativ sein)."""
+    if load_numpy() is None:
+        return array("q", (ns_to_ff(ns) for ns in _as_list(epoch_ns)))
+
+    # Aufteilen in Tage + Rest, damit (rest * 65536) nie int64 überläuft
+    us = _as_int64(epoch_ns) // 1000
+    us -= EPOCH_US
+    days, rest = np.divmod(us, US_PER_DAY)
+    rest *= TOTAL_UNITS
+    rest //= US_PER_DAY
+    days *= TOTAL_UNITS
+    days += rest
+    return days
+
+
+def bulk_convert(epoch_ns, utc_offset_s=0):
+    """Beides in einem Aufruf: (v16, v32)."""
+    if load_numpy() is not None:
+        epoch_ns = _as_int64(epoch_ns)
+    return bulk_v16(epoch_ns, utc_offset_s), bulk_ff(epoch_ns)
+
+
+# --- INVERS: v16 / F.F -> [start, end) Intervall ---
+
+def _ceil_div(a, b):
+    return -((-a) // b)
+
+
+def ff_to_interval_ns(v32):
+    """
+    F.F v32 -> (start_ns, end_ns) in Unix-Nanosekunden (UTC), halboffen [start, end).
+    Exakt die Zeitstempel, für die bulk_ff() diesen Wert liefert.
+    """
+    if load_numpy() is None:
+        if isinstance(v32, int):
+            return _ff_interval_scalar(v32)
+        pairs = [_ff_interval_scalar(v) for v in _as_list(v32)]
+        return array("q", (p[0] for p in pairs)), array("q", (p[1] for p in pairs))
+
+    v = _as_int64(v32)
+    days, units = np.divmod(v, TOTAL_UNITS)
+    base = days * US_PER_DAY + EPOCH_US
+    start = base + _ceil_div(units * US_PER_DAY, TOTAL_UNITS)
+    end = base + _ceil_div((units + 1) * US_PER_DAY, TOTAL_UNITS)
+    return start * 1000, end * 1000
+
+
+def _ff_interval_scalar(v32):
+    days, units = divmod(v32, TOTAL_UNITS)
+    base = days * US_PER_DAY + EPOCH_US
+    start = base + _ceil_div(units * US_PER_DAY, TOTAL_UNITS)
+    end = base + _ceil_div((units + 1) * US_PER_DAY, TOTAL_UNITS)
+    return start * 1000, end * 1000
+
+
+def day_start_ns(day, utc_offset_s=0):
+    """Unix-Nanosekunden der lokalen Mitternacht von `day` (datetime.date) bei gegebenem UTC-Offset."""
+    days = day.toordinal() - 719163
+    return (days * 86400 - utc_offset_s) * 1_000_000_000
+
+
+def v16_to_interval_ns(v16, day_ns):
+    """
+    v16 + Tagesbeginn (Unix-ns der lokalen Mitternacht, Skalar oder Array) -> (start_ns, end_ns).
+    Rundung wie ClockDisplay: Millisekunden-Raster.
+    """
+    if load_numpy() is None:
+        if isinstance(v16, int):
+            return _v16_interval_scalar(v16, day_ns)
+        if isinstance(day_ns, int):
+            pairs = [_v16_interval_scalar(v, day_ns) for v in _as_list(v16)]
+        else:
+            pairs = [_v16_interval_scalar(v, d) for v, d in zip(_as_list(v16), day_ns)]
+        return array("q", (p[0] for p in pairs)), array("q", (p[1] for p in pairs))
+
+    v = np.asarray(v16, dtype=np.int64)
+    base = np.asarray(day_ns, dtype=np.int64)
+    start = base + _ceil_div(v * MS_PER_DAY, TOTAL_UNITS) * 1_000_000
+    end = base + _ceil_div((v + 1) * MS_PER_DAY, TOTAL_UNITS) * 1_000_000
+    return start, end
+
+
+def _v16_interval_scalar(v16, day_ns):
+    start = day_ns + _ceil_div(v16 * MS_PER_DAY, TOTAL_UNITS) * 1_000_000
+    end = day_ns + _ceil_div((v16 + 1) * MS_PER_DAY, TOTAL_UNITS) * 1_000_000
+    return start, end
+
+
+def ns_to_datetimes(ns_values):
+    """Unix-ns -> UTC Datetimes. Mit NumPy als datetime64[ns] Array, sonst Liste von datetime."""
+    if load_numpy() is not None:
+        return _as_int64(ns_values).view("datetime64[ns]")
+    if isinstance(ns_values, int):
+        return UNIX_EPOCH + timedelta(microseconds=ns_values // 1000)
+    return [UNIX_EPOCH + timedelta(microseconds=n // 1000) for n in _as_list(ns_values)]
+
+
+def ff_to_datetimes(v32):
+    start, end = ff_to_interval_ns(v32)
+    return ns_to_datetimes(start), ns_to_datetimes(end)
+
+
+def match_ff(v32_sorted, epoch_ns):
+    """
+    Join-Helfer: Für jeden Zeitstempel der Index in `v32_sorted` (aufsteigend sortiert),
+    dessen F.F Intervall ihn enthält, sonst -1. Vektorisiert über searchsorted.
+    """
+    stamps = bulk_ff(epoch_ns)
+    if load_numpy() is None:
+        import bisect
+        keys = list(v32_sorted)
+        out = array("q")
+        for v in stamps:
+            i = bisect.bisect_left(keys, v)
+            out.append(i if i < len(keys) and keys[i] == v else -1)
+        return out
+
+    keys = _as_int64(v32_sorted)
+    idx = np.searchsorted(keys, stamps)
+    idx_clipped = np.minimum(idx, max(len(keys) - 1, 0))
+    hit = (idx < len(keys)) & (keys[idx_clipped] == stamps) if len(keys) else np.zeros(len(stamps), bool)
+    return np.where(hit, idx, -1)
+
+
+# --- STREAMING PARSER ---
+# Erkennt "F.F: 0002A4F3", "F.F 0002.4000" und "0x8000"
+STAMP_PATTERN = re.compile(
+    rb"F\.F:?\s*(?P<ff>[0-9A-Fa-f]{4}\.?[0-9A-Fa-f]{4})(?![0-9A-Fa-f])"
+    rb"|0x(?P<v16>[0-9A-Fa-f]{4})(?![0-9A-Fa-f])"
+)
+CHUNK_SIZE = 1 << 20
+
+
+def parse_hex_stamp(text):
+    """'0002.4000', '0002A4F3' oder '0x8000' -> int."""
+    text = text.strip()
+    if text.lower().startswith("0x"):
+        return int(text[2:], 16)
+    return int(text.replace(".", ""), 16)
+
+
+def iter_stamp_chunks(stream, chunk_size=CHUNK_SIZE):
+    """
+    Liest einen Binär-Stream blockweise (konstanter Speicher) und liefert pro Block
+    (line_numbers, kinds, values) - kinds: 0 = F.F, 1 = v16.
+    Die Regex läuft über den ganzen Block, nicht Zeile für Zeile.
+    """
+    rest = b""
+    line_no = 0
+    while True:
+        block = stream.read(chunk_size)
+        if not block:
+            if rest: yield _scan_block(rest, line_no)
+            return
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            rest = block
+            continue
+        body, rest = block[:cut], block[cut:]
+        result = _scan_block(body, line_no)
+        line_no += body.count(b"\n")
+        yield result
+
+
+def _scan_block(body, first_line):
+    lines, kinds, values = array("q"), array("b"), array("q")
+    pos, line = 0, first_line
+    for m in STAMP_PATTERN.finditer(body):
+        line += body.count(b"\n", pos, m.start())
+        pos = m.start()
+        ff = m.group("ff")
+        lines.append(line)
+        if ff is not None:
+            kinds.append(0)
+            values.append(int(ff.replace(b".", b""), 16))
+        else:
+            kinds.append(1)
+            values.append(int(m.group("v16"), 16))
+    if load_numpy() is not None:
+        return np.frombuffer(lines, np.int64), np.frombuffer(kinds, np.int8), np.frombuffer(values, np.int64)
+    return lines, kinds, values
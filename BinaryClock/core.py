@@ -0,0 +1,147 @@
+# Datei: core.py
+"""
+Tk-freier Kern der Binary Clock.
+
+Enthält die Zeit-Mathematik (v16 / F.F), die Grid-Transformationen und das
+Lesen der Settings-Daten. Hier darf NIE tkinter importiert werden, damit CLI-Tools,
+Daemons und Benchmarks den Kern in Millisekunden laden können.
+"""
+from datetime import datetime, timezone
+
+# --- ZEIT KONSTANTEN ---
+MS_PER_DAY = 86_400_000
+US_PER_DAY = 86_400_000_000
+TOTAL_UNITS = 65536
+MS_PER_TICK = MS_PER_DAY / TOTAL_UNITS
+
+# Epoch: 27.01.2026 UTC
+EPOCH_DATE = datetime(2026, 1, 27, 0, 0, 0, tzinfo=timezone.utc)
+
+# --- SETTINGS MODELL ---
+# Wie viele Zellen darf eine Bit-Gruppe im 4x4 Nibble belegen?
+GROUP_LIMITS = {0: 1, 1: 2, 2: 4, 3: 8}
+DEFAULT_COLOR = "#333333"
+BG_COLOR = "#202020"
+ERROR_COLOR = "#FF0000"
+
+
+# --- ZEIT ---
+
+def get_day_ms(now=None):
+    """Millisekunden seit lokaler Mitternacht."""
+    if now is None:
+        now = datetime.now()
+    return (now.hour * 3600000) + (now.minute * 60000) + (now.second * 1000) + (now.microsecond // 1000)
+
+
+def v16_from_day_ms(ms_now):
+    # Reine Integer-Rechnung, identisch zu int((ms * 65536) / 86_400_000)
+    return (ms_now * TOTAL_UNITS) // MS_PER_DAY
+
+
+def get_v16(now=None):
+    return v16_from_day_ms(get_day_ms(now))
+
+
+def ms_until_next_tick(ms_now, minimum=10):
+    """Smart Sleep: Wartezeit bis zur nächsten v16-Grenze (mindestens `minimum` ms)."""
+    v16 = v16_from_day_ms(ms_now)
+    next_tick_ms = int((v16 + 1) * MS_PER_TICK)
+    delay = next_tick_ms - ms_now
+    if delay < minimum: delay = minimum
+    return delay
+
+
+def get_ff_us(now=None):
+    """Mikrosekunden seit EPOCH_DATE (UTC)."""
+    if now is None:
+        now = datetime.now(timezone.utc)
+    delta = now - EPOCH_DATE
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def get_ff_value(now=None):
+    """
+    Berechnet den F.F Wert rein in UTC.
+    Exakt in Integer (Mikrosekunden seit EPOCH_DATE), keine Float-Rundung.
+    """
+    return (get_ff_us(now) * TOTAL_UNITS) // US_PER_DAY
+
+
+def us_until_next_ff_tick(now=None, minimum=1000):
+    """
+    Smart Sleep für F.F: Wartezeit in µs bis der F.F Wert weiterzählt (mindestens `minimum` µs).
+    Die F.F Grenzen liegen in UTC ab EPOCH_DATE - nicht auf den lokalen v16-Grenzen
+    (ms_until_next_tick), die um den Bruchteil des Zeitzonen-Offsets verschoben sind.
+    """
+    delta_us = get_ff_us(now)
+    ff = (delta_us * TOTAL_UNITS) // US_PER_DAY
+    next_us = -(-(ff + 1) * US_PER_DAY // TOTAL_UNITS)
+    return max(next_us - delta_us, minimum)
+
+
+# --- GRID TRANSFORMATIONEN ---
+
+def list_to_grid(flat_list):
+    new_grid = [[None for _ in range(4)] for _ in range(4)]
+    for i, val in enumerate(flat_list):
+        r = i // 4
+        c = i % 4
+        if val != -1: new_grid[r][c] = val
+    return new_grid
+
+
+def grid_to_list(grid):
+    flat_list = []
+    for row in grid:
+        for val in row:
+            flat_list.append(-1 if val is None else val)
+    return flat_list
+
+
+def transform_grid(original_grid, mx, my):
+    """Gespiegelte Kopie des 4x4 Grids (Original bleibt unverändert)."""
+    new_grid = [row[:] for row in original_grid]
+    if mx:
+        for r in range(4): new_grid[r] = new_grid[r][::-1]
+    if my:
+        new_grid = new_grid[::-1]
+    return new_grid
+
+
+def get_layout_bounds(placements):
+    if not placements: return 0, 0, 0, 0
+    xs = [p["position"]["x"] for p in placements]
+    ys = [p["position"]["y"] for p in placements]
+    return min(xs), max(xs), min(ys), max(ys)
+
+
+# --- SETTINGS LESEN ---
+
+def get_active_profile(data):
+    active_id = data.get("active_profileId", 0)
+    # Sicherheitscheck, falls ID out of range
+    if active_id >= len(data["profiles"]): active_id = 0
+    return data["profiles"][active_id]
+
+
+def resolve_profile(data, profile=None, pad_palette=True):
+    """
+    Löst ein Profil in (grid_design, placements, palette_colors) auf.
+    Ohne `profile` wird das aktive Profil genommen. Wirft KeyError/IndexError bei kaputten Daten.
+    Eine Palette mit weniger als 16 Farben wird durch 16x DEFAULT_COLOR ersetzt (wie ClockDisplay);
+    pad_palette=False gibt sie unverändert zurück (wie FFClockDisplay: fehlende Bits in ERROR_COLOR).
+    """
+    if profile is None:
+        profile = get_active_profile(data)
+
+    nibble_id = profile.get("nibbleGridId", 0)
+    layout_id = profile.get("layoutId", 0)
+    palette_id = profile.get("paletteId", 0)
+
+    design_cells = data["library"]["nibbleGrids"][nibble_id]["cells"]
+    placements = data["library"]["layoutGrids"][layout_id].get("placements", [])
+    palette_colors = data["library"]["palettes"][palette_id].get("colors", [DEFAULT_COLOR] * 16)
+    if pad_palette and len(palette_colors) < 16: palette_colors = [DEFAULT_COLOR] * 16
+
+    return list_to_grid(design_cells), placements, palette_colors
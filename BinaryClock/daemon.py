@@ -0,0 +1,220 @@
+# Datei: daemon.py
+"""
+Headless Modus (ohne Tk): berechnet v16 / F.F einmal pro Tick-Grenze und verteilt den Wert.
+
+1. Shared-Memory Slot (memory-mapped Datei). Leser pollen per SlotReader.read(), das ist nur
+   ein Speicherzugriff - kein Syscall. Schutz über einen Seqlock-Zähler (ungerade = wird geschrieben).
+2. Unix Domain Socket (asyncio). Jeder Subscriber bekommt pro Tick eine Zeile "XXXX XXXXXXXX\\n".
+   Die Zeile wird einmal gebaut und an alle Writer verteilt.
+"""
+import asyncio
+import mmap
+import os
+import socket
+import stat
+import struct
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import convert
+import core
+
+# Layout: seq, v16, v32, tick_ns (jeweils 8 Byte, little endian)
+SLOT_FORMAT = "<QQqq"
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+DEFAULT_SLOT_PATH = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                                 "binclock.slot")
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "binclock.sock")
+
+# Langsame Subscriber, deren Sendepuffer darüber liegt, werden getrennt
+MAX_CLIENT_BUFFER = 64 * 1024
+
+# SlotReader.read: so oft versuchen, solange der Writer gerade schreibt (danach TimeoutError)
+READ_RETRIES = 1000
+READ_SPINS = 100            # die ersten Versuche nur mit sleep(0), danach READ_BACKOFF_S
+READ_BACKOFF_S = 50e-6
+
+
+# --- SHARED MEMORY SLOT ---
+
+class SlotWriter:
+    def __init__(self, path=DEFAULT_SLOT_PATH):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, SLOT_SIZE)
+            self.map = mmap.mmap(fd, SLOT_SIZE)
+        finally:
+            os.close(fd)
+        self.seq = struct.unpack_from("<Q", self.map, 0)[0] & ~1
+
+    def publish(self, v16, v32, tick_ns):
+        self.seq += 1
+        struct.pack_into("<Q", self.map, 0, self.seq)                  # ungerade: wird geschrieben
+        struct.pack_into("<Qqq", self.map, 8, v16, v32, tick_ns)
+        self.seq += 1
+        struct.pack_into("<Q", self.map, 0, self.seq)                  # gerade: fertig
+
+    def close(self):
+        self.map.close()
+
+
+class SlotReader:
+    def __init__(self, path=DEFAULT_SLOT_PATH):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), SLOT_SIZE, access=mmap.ACCESS_READ)
+
+    def read(self):
+        """
+        (seq, v16, v32, tick_ns). seq ändert sich genau dann, wenn ein neuer Wert da ist.
+        Schreibt der Writer gerade (seq ungerade) oder kam ein Schreiben dazwischen: kurz abgeben
+        und neu lesen. Bleibt seq ungerade (Writer mitten im Schreiben abgestürzt): TimeoutError.
+        """
+        for attempt in range(READ_RETRIES):
+            seq, v16, v32, tick_ns = struct.unpack_from(SLOT_FORMAT, self.map, 0)
+            if not seq & 1 and struct.unpack_from("<Q", self.map, 0)[0] == seq:
+                return seq, v16, v32, tick_ns
+            time.sleep(0 if attempt < READ_SPINS else READ_BACKOFF_S)
+        raise TimeoutError("Slot wird nicht fertig geschrieben (Daemon abgestürzt?)")
+
+    def close(self):
+        self.map.close()
+
+
+# --- TICK ---
+
+def compute_tick(now_utc=None):
+    """(v16, v32, tick_ns, Sekunden bis zur nächsten Tick-Grenze) - v16 lokal, F.F in UTC."""
+    if now_utc is None:
+        now_utc = datetime.now(timezone.utc)
+    local = now_utc.astimezone().replace(tzinfo=None)
+
+    ms_now = core.get_day_ms(local)
+    v16 = core.v16_from_day_ms(ms_now)
+    v32 = core.get_ff_value(now_utc)
+
+    ff_wait_s = core.us_until_next_ff_tick(now_utc, minimum=1) / 1e6
+    v16_wait_s = core.ms_until_next_tick(ms_now, minimum=1) / 1000
+    tick_ns = (convert.EPOCH_US + core.get_ff_us(now_utc)) * 1000
+    return v16, v32, tick_ns, min(v16_wait_s, ff_wait_s)
+
+
+class ClockDaemon:
+    def __init__(self, slot_path=DEFAULT_SLOT_PATH, socket_path=DEFAULT_SOCKET_PATH):
+        self.slot_path = slot_path
+        self.socket_path = socket_path
+        self.slot = None
+        self.server = None
+        self.subscribers = set()
+        self.handlers = set()
+
+        self.last = None          # (v16, v32)
+        self.payload = b""
+        self.computations = 0
+        self.dropped = 0
+
+    # --- SUBSCRIBER ---
+
+    async def _on_connect(self, reader, writer):
+        self.handlers.add(asyncio.current_task())
+        self.subscribers.add(writer)
+        if self.payload: writer.write(self.payload)
+        try:
+            # Subscriber senden nichts - wir warten nur auf EOF. Kommen doch Daten, wird nichts
+            # gepuffert: ein Byte lesen und die Verbindung schließen.
+            await reader.read(1)
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def publish(self, v16, v32, tick_ns):
+        """Einmal berechnen, einmal serialisieren, an alle verteilen."""
+        self.computations += 1
+        if self.slot: self.slot.publish(v16, v32, tick_ns)
+
+        self.payload = b"%04X %08X\n" % (v16, v32 & 0xFFFFFFFF)
+        payload = self.payload
+        for writer in tuple(self.subscribers):
+            transport = writer.transport
+            if transport.is_closing(): continue
+            if transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self.dropped += 1
+                self.subscribers.discard(writer)
+                transport.abort()
+                continue
+            transport.write(payload)
+
+    # --- LOOP ---
+
+    async def start(self, backlog=1024):
+        if self.slot_path:
+            self.slot = SlotWriter(self.slot_path)
+        if self.socket_path:
+            self._remove_stale_socket()
+            self.server = await asyncio.start_unix_server(self._on_connect, path=self.socket_path,
+                                                           backlog=backlog)
+
+    def _remove_stale_socket(self):
+        """Alten Socket nur löschen, wenn dort niemand mehr lauscht (und es wirklich ein Socket ist)."""
+        try:
+            mode = os.stat(self.socket_path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError(f"{self.socket_path} existiert und ist kein Socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"Auf {self.socket_path} läuft schon ein Daemon")
+        finally:
+            probe.close()
+
+    async def run(self, now_func=None):
+        await self.start()
+        try:
+            while True:
+                now_utc = now_func() if now_func else None
+                v16, v32, tick_ns, wait_s = compute_tick(now_utc)
+                if (v16, v32) != self.last:
+                    self.last = (v16, v32)
+                    self.publish(v16, v32, tick_ns)
+                # Bis zur nächsten Grenze schlafen (+1 ms, damit wir sicher dahinter landen)
+                await asyncio.sleep(max(wait_s, 0) + 0.001)
+        finally:
+            await self.close()
+
+    async def close(self):
+        for writer in tuple(self.subscribers):
+            writer.close()
+        self.subscribers.clear()
+        # Handler enden, sobald ihr Reader EOF sieht
+        if self.handlers:
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            if os.path.exists(self.socket_path): os.unlink(self.socket_path)
+            self.server = None
+        if self.slot:
+            self.slot.close()
+            self.slot = None
+
+
+async def subscribe(socket_path=DEFAULT_SOCKET_PATH):
+    """Async Generator für Clients: liefert (v16, v32) pro Tick."""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line: return
+            v16_hex, v32_hex = line.split()
+            yield int(v16_hex, 16), int(v32_hex, 16)
+    finally:
+        writer.close()
@@ -0,0 +1,116 @@
+# Datei: depth_engine.py
+"""
+Generische N-Nibble Engine (8 / 16 / 24 / 32 Bit, ohne Tk).
+
+Erzeugt für eine Bit-Tiefe das Layout (Placements inkl. Spiegelungen) und das
+Paletten-Mapping und kompiliert den Render-Plan für alle Nibbles in einem Durchgang:
+jede Spiegel-Variante des Nibble-Designs wird nur einmal kompiliert, jedes Nibble ist
+danach nur noch eine Verschiebung dieser Vorlage.
+
+Genutzt von der F.F Uhr (32 Bit, Hotkey F6 bzw. Klick auf das Info-Label) und von
+`cli.py led --depth N` (Tagesanteil mit N Bit, value_for_depth).
+"""
+from datetime import datetime
+
+import core
+import render_plan
+from render_plan import Rect, RenderPlan, CLOCK_GEOMETRY
+
+SUPPORTED_DEPTHS = (8, 12, 16, 20, 24, 28, 32)
+
+
+def check_depth(bits):
+    if bits not in SUPPORTED_DEPTHS:
+        raise ValueError(f"Bit-Tiefe {bits} nicht unterstützt ({', '.join(map(str, SUPPORTED_DEPTHS))})")
+    return bits // 4
+
+
+def generate_layout(nibbles):
+    """
+    Placements für `nibbles` Nibbles: MSB oben links, zwei Reihen (ab 3 Nibbles).
+    Rechte Hälfte horizontal gespiegelt, untere Reihe vertikal - wie das Standard-Layout 0.
+    """
+    rows = 1 if nibbles <= 2 else 2
+    cols = -(-nibbles // rows)
+    placements = []
+    for i in range(nibbles):
+        row, col = divmod(i, cols)
+        placements.append({
+            "nibbleId": nibbles - 1 - i,
+            "position": {"x": col, "y": row},
+            "mirror": {"x": col >= cols / 2, "y": rows > 1 and row == rows - 1}
+        })
+    return placements
+
+
+def generate_palette(palette16, nibbles):
+    """16 Farben (4 Nibbles) -> eine Farbe pro Bit. Nibble n nutzt die Farben von Nibble n % 4."""
+    colors = []
+    for n in range(nibbles):
+        base = (n % 4) * 4
+        colors.extend(palette16[base:base + 4])
+    return colors
+
+
+def compile_depth_plan(grid_design, palette16, bits, geometry=CLOCK_GEOMETRY, ox=0, oy=0, placements=None,
+                       bridges=True, corners=True):
+    nibbles = check_depth(bits)
+    if placements is None:
+        placements = generate_layout(nibbles)
+    colors = generate_palette(palette16, nibbles)
+
+    # 1. Vorlagen: pro Spiegel-Variante ein Nibble bei (0, 0), Bit = Gruppe (0-3)
+    templates = {}
+    for p in placements:
+        mirror = p.get("mirror", {})
+        variant = (mirror.get("x", False), mirror.get("y", False))
+        if variant not in templates:
+            grid = core.transform_grid(grid_design, *variant) if any(variant) else grid_design
+            templates[variant] = render_plan.compile_nibble(0, 0, grid, 0, palette16, geometry,
+                                                            bridges=bridges, corners=corners)
+
+    # 2. Alle Nibbles = verschobene Vorlage
+    min_x, _, min_y, _ = core.get_layout_bounds(placements)
+    step = 4 * geometry.cell + 3 * geometry.gap + geometry.nibble_gap
+    rects = []
+    for p in placements:
+        mirror = p.get("mirror", {})
+        template = templates[(mirror.get("x", False), mirror.get("y", False))]
+        nibble_id = p["nibbleId"]
+        if not 0 <= nibble_id < nibbles: continue
+        dx = ox + (p["position"]["x"] - min_x) * step
+        dy = oy + (p["position"]["y"] - min_y) * step
+        base = nibble_id * 4
+        for t in template:
+            bit = base + t.bit
+            rects.append(Rect(bit, t.role, t.x1 + dx, t.y1 + dy, t.x2 + dx, t.y2 + dy, colors[bit]))
+    return RenderPlan(rects, bits)
+
+
+def compile_profile_depth_plan(data, bits, canvas_w=None, canvas_h=None, profile=None, geometry=CLOCK_GEOMETRY):
+    """Design + Palette des Profils, Layout generiert; optional auf der Canvas zentriert."""
+    grid_design, _, palette = core.resolve_profile(data, profile)
+    plan = compile_depth_plan(grid_design, palette, bits, geometry)
+    if canvas_w is None: return plan
+    _, _, w, h = plan.bounds()
+    return compile_depth_plan(grid_design, palette, bits, geometry,
+                              ox=max((canvas_w - w) // 2, 10), oy=max((canvas_h - h) // 2, 10))
+
+
+def value_for_depth(day_us, bits):
+    """Tagesanteil mit `bits` Bit Auflösung (aus Mikrosekunden seit Mitternacht)."""
+    return (day_us << bits) // core.US_PER_DAY
+
+
+def get_day_us(now=None):
+    """Mikrosekunden seit lokaler Mitternacht (wie core.get_day_ms)."""
+    if now is None:
+        now = datetime.now()
+    return ((now.hour * 60 + now.minute) * 60 + now.second) * 1_000_000 + now.microsecond
+
+
+def us_until_next_depth_tick(day_us, bits, minimum=1000):
+    """Wartezeit in µs bis value_for_depth weiterzählt (mindestens `minimum` µs)."""
+    value = value_for_depth(day_us, bits)
+    next_us = -((-(value + 1) * core.US_PER_DAY) >> bits)  # aufgerundet
+    return max(next_us - day_us, minimum)
@@ -0,0 +1,270 @@
+# Datei: exporter.py
+"""
+Headless Frame-Export (ohne Tk, ohne PIL).
+
+Pro Nibble werden die 16 möglichen Zustände einmal als Kachel gerastert. Ein Frame wird
+danach nur noch aus 4 (bzw. bits / 4) Kacheln zusammengesetzt - Zeilen-Kopien statt
+Rechtecke zeichnen. Der Wertebereich wird auf einen Prozess-Pool verteilt.
+
+    PNG    -> eine Datei pro Frame (indizierte Farben, 1 Byte pro Pixel)
+    SVG    -> eine Datei pro Frame
+    raw    -> RGB24 Frames hintereinander (z.B. für ffmpeg -f rawvideo -pix_fmt rgb24)
+    sprite -> EIN PNG mit allen Frames im Raster
+"""
+import os
+import struct
+import zlib
+from collections import deque
+
+import core
+import render_plan
+
+EXPORT_GEOMETRY = render_plan.Geometry(20, 4, 30)
+PADDING = 10
+PNG_LEVEL = 1  # zlib-Stufe: 1 ist bei flächigen Bildern kaum größer, aber viel schneller
+CHUNK_FRAMES = 256
+RAW_CHUNK_BYTES = 4 << 20  # raw: Blockgröße in Bytes begrenzen (ein Frame hat schnell > 100 KB)
+FORMATS = ("png", "svg", "raw", "sprite")
+
+
+def hex_to_rgb(color):
+    color = color.lstrip("#")
+    if len(color) == 3: color = "".join(c * 2 for c in color)
+    try:
+        return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+    except ValueError:
+        return hex_to_rgb(core.ERROR_COLOR)
+
+
+# --- PNG ---
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(width, height, rows, palette=None, level=PNG_LEVEL):
+    """
+    rows: Bilddaten MIT Filter-Byte (0) vor jeder Zeile.
+    Mit `palette` ([(r, g, b), ...]) indiziert (1 Byte/Pixel), sonst RGB.
+    """
+    color_type = 3 if palette else 2
+    out = [b"\x89PNG\r\n\x1a\n",
+           _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))]
+    if palette:
+        out.append(_png_chunk(b"PLTE", b"".join(bytes(c) for c in palette)))
+    out.append(_png_chunk(b"IDAT", zlib.compress(bytes(rows), level)))
+    out.append(_png_chunk(b"IEND", b""))
+    return b"".join(out)
+
+
+# --- KACHELN ---
+
+class FrameComposer:
+    """
+    Setzt Frames aus vorgerasterten Nibble-Kacheln zusammen.
+    rgb=False: indizierte Pixel mit PNG-Filter-Byte pro Zeile, rgb=True: nackte RGB24 Zeilen.
+    """
+
+    def __init__(self, plan, padding=PADDING, bg=core.BG_COLOR, rgb=False):
+        self.plan = plan
+        _, _, max_x, max_y = plan.bounds()
+        self.width = max_x + 2 * padding
+        self.height = max_y + 2 * padding
+        self.rgb = rgb
+
+        # Farbtabelle: Index 0 = Hintergrund
+        colors = [bg]
+        for rect in plan.rects:
+            if rect.color not in colors: colors.append(rect.color)
+        if len(colors) > 256 and not rgb:
+            raise ValueError("Mehr als 256 Farben - nur rgb=True möglich")
+        self.palette = [hex_to_rgb(c) for c in colors]
+        index = {c: i for i, c in enumerate(colors)}
+        pixel = [bytes(c) for c in self.palette] if rgb else [bytes((i,)) for i in range(len(colors))]
+
+        bpp = 3 if rgb else 1
+        prefix = 0 if rgb else 1
+        self.stride = self.width * bpp + prefix
+        self.blank = bytearray(self.stride * self.height)
+        bg_row = b"\x00" * prefix + pixel[0] * self.width
+        for y in range(self.height):
+            self.blank[y * self.stride:(y + 1) * self.stride] = bg_row
+
+        # Pro Nibble: Bounding Box + 16 Kacheln (Liste von Zeilen-Bytes)
+        self.nibbles = []
+        self.boxes = []  # (Nibble, x, y, Breite, Höhe) in Plan-Koordinaten, parallel zu self.nibbles
+        for n in range(plan.bits // 4):
+            rects = [r for r in plan.rects if r.bit // 4 == n]
+            if not rects: continue
+            x1 = min(r.x1 for r in rects) + padding
+            y1 = min(r.y1 for r in rects) + padding
+            x2 = max(r.x2 for r in rects) + padding
+            y2 = max(r.y2 for r in rects) + padding
+            w = x2 - x1
+            tiles = []
+            for state in range(16):
+                tile = [bytearray(pixel[0] * w) for _ in range(y2 - y1)]
+                # Zeichenreihenfolge wie im Plan (Zellen, Brücken, Ecken)
+                for r in rects:
+                    if not (state >> (r.bit % 4)) & 1: continue
+                    run = pixel[index[r.color]] * (r.x2 - r.x1)
+                    for y in range(r.y1 + padding - y1, r.y2 + padding - y1):
+                        tile[y][(r.x1 + padding - x1) * bpp:(r.x2 + padding - x1) * bpp] = run
+                tiles.append([bytes(row) for row in tile])
+            offset = y1 * self.stride + prefix + x1 * bpp
+            self.nibbles.append((n * 4, offset, w * bpp, tiles))
+            self.boxes.append((n, x1 - padding, y1 - padding, w, y2 - y1))
+
+    def frame(self, value):
+        buf = bytearray(self.blank)
+        stride = self.stride
+        for shift, offset, row_len, tiles in self.nibbles:
+            pos = offset
+            for row in tiles[(value >> shift) & 0xF]:
+                buf[pos:pos + row_len] = row
+                pos += stride
+        return buf
+
+    def tile_png(self, index, state, level=PNG_LEVEL):
+        """Eine Nibble-Kachel (Index in self.nibbles, Zustand 0..15) als eigenes PNG."""
+        if self.rgb: raise ValueError("tile_png() braucht rgb=False")
+        _, _, w, h = self.boxes[index][1:]
+        rows = b"".join(b"\x00" + row for row in self.nibbles[index][3][state])
+        return encode_png(w, h, rows, self.palette, level)
+
+    def png(self, value, level=PNG_LEVEL):
+        if self.rgb: raise ValueError("png() braucht rgb=False")
+        return encode_png(self.width, self.height, self.frame(value), self.palette, level)
+
+
+class SvgComposer:
+    """Dasselbe für SVG: pro Nibble und Zustand ein fertiges Text-Fragment."""
+
+    def __init__(self, plan, padding=PADDING, bg=core.BG_COLOR):
+        _, _, max_x, max_y = plan.bounds()
+        self.width = max_x + 2 * padding
+        self.height = max_y + 2 * padding
+        self.head = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}">'
+                     f'<rect width="100%" height="100%" fill="{bg}"/>'
+                     f'<g transform="translate({padding},{padding})" shape-rendering="crispEdges">')
+        self.tail = "</g></svg>\n"
+        self.nibbles = []
+        for n in range(plan.bits // 4):
+            rects = [r for r in plan.rects if r.bit // 4 == n]
+            fragments = []
+            for state in range(16):
+                fragments.append("".join(
+                    f'<rect x="{r.x1}" y="{r.y1}" width="{r.x2 - r.x1}" height="{r.y2 - r.y1}" fill="{r.color}"/>'
+                    for r in rects if (state >> (r.bit % 4)) & 1))
+            self.nibbles.append((n * 4, fragments))
+
+    def frame(self, value):
+        parts = [self.head]
+        for shift, fragments in self.nibbles:
+            parts.append(fragments[(value >> shift) & 0xF])
+        parts.append(self.tail)
+        return "".join(parts).encode()
+
+
+# --- WORKER ---
+
+_composer = None
+
+
+def _init_worker(plan, fmt):
+    global _composer
+    _composer = SvgComposer(plan) if fmt == "svg" else FrameComposer(plan, rgb=(fmt == "raw"))
+
+
+def frame_path(out_dir, value, fmt):
+    return os.path.join(out_dir, f"frame_{value:04X}.{fmt}")
+
+
+def _export_chunk(args):
+    """Ein zusammenhängender Wertebereich. png/svg: Dateien schreiben, raw/sprite: Bytes zurückgeben."""
+    fmt, out_dir, values, columns = args
+    c = _composer
+    if fmt in ("png", "svg"):
+        for v in values:
+            with open(frame_path(out_dir, v, fmt), "wb") as f:
+                f.write(c.png(v) if fmt == "png" else c.frame(v))
+        return len(values)
+    if fmt == "raw":
+        return b"".join(c.frame(v) for v in values)
+
+    # sprite: eine Raster-Zeile nebeneinanderliegender Frames (Filter-Byte nur einmal pro Zeile)
+    frames = [c.frame(v) for v in values]
+    stride = c.stride
+    pad = b"\x00" * (c.width * (columns - len(frames)))
+    rows = []
+    for y in range(c.height):
+        rows.append(b"\x00")
+        rows.extend(f[y * stride + 1:(y + 1) * stride] for f in frames)
+        rows.append(pad)
+    return b"".join(rows)
+
+
+def _chunks(start, count, size):
+    for first in range(start, start + count, size):
+        yield range(first, min(first + size, start + count))
+
+
+class FrameExporter:
+    def __init__(self, plan, fmt="png", jobs=None, chunk_frames=CHUNK_FRAMES):
+        if fmt not in FORMATS: raise ValueError(f"Unbekanntes Format: {fmt}")
+        self.plan = plan
+        self.fmt = fmt
+        self.jobs = jobs or os.cpu_count() or 1
+        self.chunk_frames = chunk_frames
+        probe = SvgComposer(plan) if fmt == "svg" else FrameComposer(plan, rgb=(fmt == "raw"))
+        self.width, self.height = probe.width, probe.height
+        self.palette = getattr(probe, "palette", None)
+
+    def _map(self, tasks):
+        """Ergebnisse in Reihenfolge; mit jobs=1 ohne Pool."""
+        if self.jobs <= 1:
+            _init_worker(self.plan, self.fmt)
+            for t in tasks:
+                yield _export_chunk(t)
+            return
+        from multiprocessing import Pool
+        # Gleitendes Fenster wie cli.stamp_stream: höchstens 2 * jobs Blöcke unterwegs. imap würde
+        # bei einem langsamen Abnehmer (raw in eine Pipe) alle fertigen Blöcke im Speicher sammeln.
+        with Pool(self.jobs, initializer=_init_worker, initargs=(self.plan, self.fmt)) as pool:
+            pending = deque()
+            for t in tasks:
+                pending.append(pool.apply_async(_export_chunk, (t,)))
+                if len(pending) >= 2 * self.jobs:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+
+    def export_files(self, out_dir, start=0, count=None):
+        """png / svg: eine Datei pro Wert. Rückgabe: Anzahl Frames."""
+        if count is None: count = (1 << self.plan.bits) - start
+        os.makedirs(out_dir, exist_ok=True)
+        tasks = ((self.fmt, out_dir, r, 0) for r in _chunks(start, count, self.chunk_frames))
+        return sum(self._map(tasks))
+
+    def export_stream(self, out, start=0, count=None):
+        """raw: RGB24 Frames der Reihe nach nach `out` (Datei, Pipe zu einem Encoder)."""
+        if count is None: count = (1 << self.plan.bits) - start
+        # Speicher im Elternprozess: höchstens 2 * jobs Blöcke zu je ~RAW_CHUNK_BYTES
+        size = max(1, min(self.chunk_frames, RAW_CHUNK_BYTES // (self.width * self.height * 3)))
+        written = 0
+        for data in self._map(("raw", None, r, 0) for r in _chunks(start, count, size)):
+            out.write(data)
+            written += len(data)
+        return written
+
+    def export_sprite(self, out, start=0, count=256, columns=16, level=PNG_LEVEL):
+        """sprite: `count` Frames, `columns` pro Zeile, als ein indiziertes PNG."""
+        strips = list(self._map(("sprite", None, r, columns) for r in _chunks(start, count, columns)))
+        sheet_w = self.width * columns
+        sheet_h = self.height * len(strips)
+        out.write(encode_png(sheet_w, sheet_h, b"".join(strips), self.palette, level))
+        return sheet_w, sheet_h
+
+
+def compile_export_plan(data, profile=None, geometry=EXPORT_GEOMETRY):
+    return render_plan.compile_compact_plan(data, geometry, profile)
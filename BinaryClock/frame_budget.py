@@ -0,0 +1,154 @@
+# Datei: frame_budget.py
+"""
+Frame-Budget der Uhren (ohne Tk): misst Event-Loop-Verspätung und Render-Dauer und stuft
+die Darstellung bei anhaltender Last herunter.
+
+Pro Frame (Aufrufe aus update_loop, wie metrics.RenderStats):
+    fired()           - after() hat gefeuert: Verspätung gegen den geplanten Zeitpunkt
+    rendered(value)   - Render fertig: Dauer, übersprungene Zwischenwerte, Modus-Entscheidung
+    scheduled(delay)  - nächster after() geplant
+
+Ein später Frame zeichnet immer nur den AKTUELLEN Wert (Zwischenwerte fallen weg und werden
+gezählt). Liegen Verspätung oder Render-Dauer (gleitende Mittel) länger als DEGRADE_S über dem
+Budget, geht es eine Stufe in MODES nach unten; erst nach RECOVER_S ohne Druck wieder eine
+Stufe nach oben (Hysterese, kein Flattern). Einzelne lange Hänger (Suspend, Debugger, modaler
+Dialog) sagen nichts über die Last: Verspätungen über STALL_MS werden verworfen, alle anderen
+auf LAG_CLAMP Mal max_lag_ms begrenzt, bevor sie ins gleitende Mittel gehen.
+
+Das Budget ist optional (display.budget = None: aus), main.py schaltet es mit F5 ein.
+
+    full        - Zellen, Brücken, Ecken
+    no_corners  - ohne Ecken
+    cells       - nur Zellen
+    sprite      - ein Bild pro Nibble (ui_plan_view.SpriteItems), max. 1 Canvas-Op pro Nibble
+"""
+import time
+from collections import Counter, deque
+
+MODES = ("full", "no_corners", "cells", "sprite")
+# Rollen, die ein Modus zeichnet (None = alle; sprite rastert den vollen Plan)
+MODE_ROLES = {"no_corners": ("cell", "bridge"), "cells": ("cell",)}
+
+RENDER_BUDGET_MS = 8.0      # eigene Render-Zeit pro Frame
+MAX_LAG_MS = 100.0          # Verspätung der after()-Callbacks
+DEGRADE_S = 5.0             # so lange Druck -> eine Stufe runter
+RECOVER_S = 60.0            # so lange ruhig -> eine Stufe rauf
+ALPHA = 0.2                 # Glättung der gleitenden Mittel
+MIN_FRAMES = 3              # Entscheidungen erst nach ein paar Frames im Zustand
+LAG_CLAMP = 3               # Verspätung pro Frame höchstens LAG_CLAMP * max_lag_ms
+STALL_MS = 5000.0           # längere Verspätung = Hänger, zählt nicht
+
+
+class FrameBudget:
+    def __init__(self, display, budget_ms=RENDER_BUDGET_MS, max_lag_ms=MAX_LAG_MS,
+                 degrade_s=DEGRADE_S, recover_s=RECOVER_S, timer=time.perf_counter):
+        self.display = display
+        self.budget_ms = budget_ms
+        self.max_lag_ms = max_lag_ms
+        self.degrade_s = degrade_s
+        self.recover_s = recover_s
+        self.timer = timer
+
+        self.level = 0
+        self.lag_ms = 0.0           # gleitende Mittel
+        self.render_ms = 0.0
+        self.frames = 0
+        self.skipped = 0            # übersprungene Zwischenwerte
+        self.stalls = 0             # verworfene Hänger (> STALL_MS)
+        self.switches = Counter()   # "degrade" / "recover"
+        self.log = deque(maxlen=20)  # (Zeit, von, nach, Grund)
+
+        self._due = None
+        self._t0 = 0.0
+        self._value = None
+        self._state = None          # "pressure" / "calm"
+        self._since = 0.0
+        self._state_frames = 0
+
+    @property
+    def mode(self):
+        return MODES[self.level]
+
+    # --- Aufrufe aus dem Update-Loop ---
+
+    def fired(self):
+        now = self.timer()
+        if self._due is not None:
+            lag = max((now - self._due) * 1000, 0.0)
+            if lag > STALL_MS:
+                self.stalls += 1
+            else:
+                self.lag_ms += ALPHA * (min(lag, LAG_CLAMP * self.max_lag_ms) - self.lag_ms)
+            self._due = None
+        self._t0 = now
+
+    def rendered(self, value, bits=16):
+        """Frame fertig. Rückgabe: True, wenn sich der Modus geändert hat (gilt ab dem nächsten Frame)."""
+        now = self.timer()
+        self.render_ms += ALPHA * ((now - self._t0) * 1000 - self.render_ms)
+        self.frames += 1
+        if self._value is not None:
+            step = (value - self._value) % (1 << bits)
+            if step > 1: self.skipped += step - 1
+        self._value = value
+
+        pressure = self.lag_ms > self.max_lag_ms or self.render_ms > self.budget_ms
+        state = "pressure" if pressure else "calm"
+        if state != self._state:
+            self._state, self._since, self._state_frames = state, now, 0
+        self._state_frames += 1
+        if self._state_frames < MIN_FRAMES: return False
+
+        held = now - self._since
+        if pressure and held >= self.degrade_s and self.level < len(MODES) - 1:
+            reason = f"lag {self.lag_ms:.0f} ms" if self.lag_ms > self.max_lag_ms else f"render {self.render_ms:.1f} ms"
+            return self._switch(self.level + 1, "degrade", reason, now)
+        if not pressure and held >= self.recover_s and self.level > 0:
+            return self._switch(self.level - 1, "recover", "calm", now)
+        return False
+
+    def scheduled(self, delay_ms):
+        self._due = self.timer() + delay_ms / 1000
+
+    def _switch(self, level, direction, reason, now):
+        self.log.append((round(now, 3), self.mode, MODES[level], reason))
+        self.level = level
+        self.switches[direction] += 1
+        # Neuer Modus muss sich erst beweisen: Zustand neu starten
+        self._since, self._state_frames = now, 0
+        return True
+
+    # --- Ausgabe ---
+
+    def summary(self):
+        return f"mode {self.mode} | lag {self.lag_ms:.0f} ms | render {self.render_ms:.1f} ms | skipped {self.skipped}"
+
+    def exposition(self):
+        labels = f'display="{self.display}"'
+        lines = [f"binclock_render_level{{{labels}}} {self.level}"]
+        lines += [f'binclock_render_mode{{{labels},mode="{m}"}} {int(m == self.mode)}' for m in MODES]
+        lines += [f'binclock_mode_switches_total{{{labels},direction="{d}"}} {self.switches[d]}'
+                  for d in ("degrade", "recover")]
+        lines.append(f"binclock_values_skipped_total{{{labels}}} {self.skipped}")
+        lines.append(f"binclock_stalls_total{{{labels}}} {self.stalls}")
+        lines.append(f"binclock_lag_avg_ms{{{labels}}} {self.lag_ms:.6g}")
+        lines.append(f"binclock_render_avg_ms{{{labels}}} {self.render_ms:.6g}")
+        return lines
+
+
+HEADER = [
+    "# HELP binclock_render_level Current degradation level (0 = full).",
+    "# TYPE binclock_render_level gauge",
+    "# HELP binclock_render_mode Current render mode (1 = active).",
+    "# TYPE binclock_render_mode gauge",
+    "# HELP binclock_mode_switches_total Automatic render mode switches.",
+    "# TYPE binclock_mode_switches_total counter",
+    "# HELP binclock_values_skipped_total Intermediate values dropped because a frame came late.",
+    "# TYPE binclock_values_skipped_total counter",
+    "# HELP binclock_stalls_total Single after() delays above STALL_MS, ignored by the budget.",
+    "# TYPE binclock_stalls_total counter",
+    "# HELP binclock_lag_avg_ms Smoothed after() lateness.",
+    "# TYPE binclock_lag_avg_ms gauge",
+    "# HELP binclock_render_avg_ms Smoothed render duration.",
+    "# TYPE binclock_render_avg_ms gauge",
+]
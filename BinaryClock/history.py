@@ -0,0 +1,108 @@
+# Datei: history.py
+"""
+Undo/Redo für die Editoren (ohne Tk).
+
+Gespeichert werden nur Deltas, keine Kopien von grid_data:
+  - Nibble- und Layout-Editor packen ihr 4x4 Raster in einen int (3 bzw. 5 Bit pro Zelle),
+    das Delta ist vorher ^ nachher - ein kleiner int, Undo und Redo sind dasselbe XOR.
+  - Der Palette-Editor speichert (Index, alt, neu) für die geänderten Farben.
+
+Ein Eintrag entsteht zwischen begin() und end(). Ein Drag (Maus runter bis Maus hoch) ist
+damit EIN Eintrag, egal wie viele Zellen er berührt. Undo/Redo sind O(1) (Stack-Operationen
+plus ein Patch des festen 16er-Zustands). Der Speicher ist über `budget` (Bytes) begrenzt -
+ist er voll, fallen die ältesten Einträge weg.
+"""
+import sys
+from collections import deque
+
+HISTORY_BUDGET = 256 * 1024
+
+
+def xor_diff(before, after):
+    return (before ^ after) or None
+
+
+def xor_patch(state, delta, undo):
+    return state ^ delta
+
+
+def pairs_diff(before, after):
+    """Tupel-Zustände: nur die geänderten Positionen als (Index, alt, neu)."""
+    return tuple((i, a, b) for i, (a, b) in enumerate(zip(before, after)) if a != b) or None
+
+
+def pairs_patch(state, delta, undo):
+    state = list(state)
+    for i, old, new in delta:
+        state[i] = old if undo else new
+    return tuple(state)
+
+
+def delta_size(delta):
+    """Ungefährer Speicher eines Deltas (Werte in den Paaren teilen sich die Strings mit dem Editor)."""
+    size = sys.getsizeof(delta) + 8  # + Slot in deque/list
+    if isinstance(delta, tuple):
+        size += sum(sys.getsizeof(pair) for pair in delta)
+    return size
+
+
+class History:
+    def __init__(self, get_state, set_state, diff=xor_diff, patch=xor_patch, budget=HISTORY_BUDGET):
+        self.get_state = get_state
+        self.set_state = set_state
+        self.diff = diff
+        self.patch = patch
+        self.budget = budget
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.bytes = 0
+        self._before = None
+
+    def __len__(self):
+        return len(self.undo_stack)
+
+    def begin(self):
+        """Zustand vor einer Änderung merken. Verschachtelt/doppelt: der erste zählt."""
+        if self._before is None:
+            self._before = self.get_state()
+
+    def end(self):
+        """Änderung abschließen. Ohne echten Unterschied entsteht kein Eintrag."""
+        if self._before is None: return False
+        before, self._before = self._before, None
+        delta = self.diff(before, self.get_state())
+        if delta is None: return False
+
+        for old in self.redo_stack:
+            self.bytes -= delta_size(old)
+        self.redo_stack.clear()
+        self.undo_stack.append(delta)
+        self.bytes += delta_size(delta)
+        while self.bytes > self.budget and len(self.undo_stack) > 1:
+            self.bytes -= delta_size(self.undo_stack.popleft())
+        return True
+
+    def undo(self):
+        self.end()
+        if not self.undo_stack: return False
+        delta = self.undo_stack.pop()
+        self.set_state(self.patch(self.get_state(), delta, True))
+        self.redo_stack.append(delta)
+        return True
+
+    def redo(self):
+        self.end()
+        if not self.redo_stack: return False
+        delta = self.redo_stack.pop()
+        self.set_state(self.patch(self.get_state(), delta, False))
+        self.undo_stack.append(delta)
+        return True
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.bytes = 0
+        self._before = None
+
+    def summary(self):
+        return f"undo {len(self.undo_stack)} / redo {len(self.redo_stack)} ({self.bytes // 1024} KB)"
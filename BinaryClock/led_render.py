@@ -0,0 +1,174 @@
+# Datei: led_render.py
+"""
+NumPy Framebuffer-Renderer für LED-Matrix Panels (ohne Tk).
+
+Der Plan wird einmal in pro-Bit Masken (bits x Pixel) gerastert. Pro Tick ist ein Frame nur
+noch: Gewichte der gesetzten Bits · Masken (ein Skalarprodukt -> Farb-Index pro Pixel) und
+eine Palette-Tabelle (take) in ein fertiges uint8 RGB Array. Ausgabe in eine memory-mapped
+Datei (Panel-Treiber liest mit) oder in eine Pipe / ein pty.
+"""
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import core
+import depth_engine
+import render_plan
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ist optional (nur dieser Renderer braucht es)
+    np = None
+
+
+MIN_FRAME_MS = 20  # run(depth=...): höchstens 50 Frames/s
+
+
+def hex_to_rgb(color_hex):
+    color_hex = color_hex.lstrip("#")
+    try:
+        return tuple(int(color_hex[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return 255, 0, 0
+
+
+def fit_geometry(data, width, height, profile=None, compile_plan=None):
+    """
+    Größte ganzzahlige Geometrie, mit der das Layout auf width x height passt.
+    compile_plan(geometry) -> Plan, Standard: Layout des Profils (render_plan.compile_compact_plan).
+    """
+    if compile_plan is None:
+        compile_plan = lambda geometry: render_plan.compile_compact_plan(data, geometry, profile)
+    for cell in range(min(width, height) // 4, 0, -1):
+        gap = max(cell // 5, 1) if cell > 1 else 0
+        geometry = render_plan.Geometry(cell, gap, max(cell, gap + 1))
+        _, _, w, h = compile_plan(geometry).bounds()
+        if w <= width and h <= height:
+            return geometry
+    raise ValueError(f"Panel {width}x{height} ist zu klein für das Layout")
+
+
+class LedRenderer:
+    def __init__(self, plan, width, height, bg=core.BG_COLOR):
+        if np is None:
+            raise RuntimeError("LedRenderer braucht NumPy")
+        self.width = width
+        self.height = height
+        self.bits = plan.bits
+
+        # Zentrieren
+        _, _, plan_w, plan_h = plan.bounds()
+        ox = max((width - plan_w) // 2, 0)
+        oy = max((height - plan_h) // 2, 0)
+
+        # Besitzer pro Pixel (-1 = Hintergrund). Spätere Rechtecke liegen oben, wie auf der Canvas
+        owner = np.full((height, width), -1, dtype=np.int16)
+        colors = [bg] * self.bits
+        for rect in plan.rects:
+            owner[max(rect.y1 + oy, 0):min(rect.y2 + oy, height), max(rect.x1 + ox, 0):min(rect.x2 + ox, width)] = rect.bit
+            colors[rect.bit] = rect.color
+
+        # Masken: bits x Pixel, exklusiv (jedes Pixel gehört höchstens einem Bit)
+        self.masks = (owner.reshape(1, -1) == np.arange(self.bits, dtype=np.int16).reshape(-1, 1)).astype(np.uint8)
+        # Farb-Tabelle: Index 0 = Hintergrund, Index b + 1 = Farbe von Bit b
+        self.lut = np.array([hex_to_rgb(bg)] + [hex_to_rgb(c) for c in colors], dtype=np.uint8)
+        self.weights = np.arange(1, self.bits + 1, dtype=np.uint8 if self.bits < 255 else np.uint16)
+        self.shifts = np.arange(self.bits, dtype=np.uint64)
+        self.frame_buf = np.zeros((height, width, 3), dtype=np.uint8)
+
+    @classmethod
+    def for_panel(cls, data, width, height, profile=None, bit_offset=0):
+        plan = render_plan.compile_compact_plan(data, fit_geometry(data, width, height, profile), profile, bit_offset)
+        return cls(plan, width, height)
+
+    @classmethod
+    def for_depth(cls, data, width, height, bits, profile=None):
+        """Generiertes Layout mit `bits` Bit (depth_engine), Design + Palette des Profils."""
+        def compile_plan(geometry):
+            return depth_engine.compile_profile_depth_plan(data, bits, profile=profile, geometry=geometry)
+
+        return cls(compile_plan(fit_geometry(data, width, height, profile, compile_plan)), width, height)
+
+    def index_map(self, value):
+        """Farb-Index pro Pixel (0 = aus) - ein Skalarprodukt über alle Bits."""
+        on = ((np.uint64(value) >> self.shifts) & np.uint64(1)).astype(self.weights.dtype)
+        return (on * self.weights) @ self.masks
+
+    def render(self, value, out=None):
+        """Frame als uint8 Array (height, width, 3). Mit `out` ohne neue Allokation."""
+        out = self.frame_buf if out is None else out
+        np.take(self.lut, self.index_map(value), axis=0, out=out.reshape(-1, 3))
+        return out
+
+
+class MmapSink:
+    """Frame-Puffer als memory-mapped Datei (roh RGB, Zeile für Zeile)."""
+
+    def __init__(self, path, width, height):
+        size = width * height * 3
+        with open(path, "ab") as f:
+            if f.tell() < size: f.truncate(size)
+        self.frame = np.memmap(path, dtype=np.uint8, mode="r+", shape=(height, width, 3))
+
+    def write(self, renderer, value):
+        renderer.render(value, out=self.frame)
+
+    def close(self):
+        self.frame.flush()
+        del self.frame
+
+
+class PipeSink:
+    """Frames nacheinander in eine Pipe / FIFO / pty (z.B. Panel-Treiber oder ffmpeg rawvideo)."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, renderer, value):
+        self.stream.write(renderer.render(value).data)
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+def open_sink(target, width, height):
+    """'-' = stdout, existierende FIFO / Gerät = Pipe, sonst memory-mapped Datei."""
+    if target == "-":
+        return PipeSink(sys.stdout.buffer)
+    if os.path.exists(target) and not os.path.isfile(target):
+        return PipeSink(open(target, "wb", buffering=0))
+    return MmapSink(target, width, height)
+
+
+def run(renderer, sink, use_ff=False, depth=None, min_frame_ms=MIN_FRAME_MS):
+    """
+    Live-Schleife: pro Tick ein Frame, dazwischen schlafen.
+    depth: Tagesanteil mit so vielen Bit (depth_engine.value_for_depth) statt v16 - ab 24 Bit
+    zählt der Wert schneller, als ein Panel sinnvoll zeigt, daher höchstens ein Frame pro min_frame_ms.
+    """
+    last = None
+    try:
+        while True:
+            if use_ff:
+                # F.F zählt auf eigenen (UTC) Grenzen, siehe core.us_until_next_ff_tick
+                now = datetime.now(timezone.utc)
+                value = core.get_ff_value(now) & ((1 << renderer.bits) - 1)
+                delay_s = core.us_until_next_ff_tick(now) / 1e6
+            elif depth:
+                day_us = depth_engine.get_day_us()
+                value = depth_engine.value_for_depth(day_us, depth)
+                delay_s = depth_engine.us_until_next_depth_tick(day_us, depth, min_frame_ms * 1000) / 1e6
+            else:
+                ms_now = core.get_day_ms()
+                value = core.v16_from_day_ms(ms_now)
+                delay_s = core.ms_until_next_tick(ms_now, minimum=1) / 1000
+            if value != last:
+                sink.write(renderer, value)
+                last = value
+            time.sleep(delay_s)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        sink.close()
@@ -1,4 +1,5 @@
 # Datei: main.py
+import os
 import tkinter as tk
 
 from ui_palette_editor import PaletteEditor
@@ -8,6 +9,10 @@ from ui_clock_display import ClockDisplay
 from ui_layout_editor import LayoutEditor
 from ui_profile_editor import ProfileEditor
 from ui_ff_clock import FFClockDisplay
+from alarms import AlarmEngine, ALARM_FILENAME
+import metrics
+import tracing
+from frame_budget import FrameBudget
 from ui_shared import FlatButton, BG_COLOR, BG_OFF_COLOR, BG_BUTTON_COLOR
 
 
@@ -55,11 +60,32 @@ class MainApp:
         # Die neue FF View
         self.ff_view = FFClockDisplay(self.content_area, self.settings)
 
+        # Alarme (liegen neben binClockSettings.json, feuern über den Update-Loop der Uhren)
+        alarm_file = os.path.join(os.path.dirname(self.settings.filename), ALARM_FILENAME)
+        self.alarm_engine = AlarmEngine(alarm_file, on_fire=self.on_alarm)
+        self.alarm_engine.load()
+        self.clock_view.alarm_engine = self.alarm_engine
+        self.ff_view.alarm_engine = self.alarm_engine
+
         # Standard-Ansicht
         self.show_clock()
 
+        # Render-Metriken (F3): aus = keine Messung. Ziel per BINCLOCK_METRICS ("host:port" oder Datei)
+        self.metrics_target = metrics.parse_target(os.environ.get("BINCLOCK_METRICS", ""),
+                                                   os.path.dirname(self.settings.filename))
+        self.metrics_server = None
+        self._metrics_after = None
+
         # Hotkeys
         self.root.bind("<Key>", self.handle_keypress)
+        self.root.bind("<F3>", self.toggle_metrics)
+        self.root.bind("<F4>", self.toggle_trace)
+        self.root.bind("<F5>", self.toggle_budget)
+        # F.F Uhr: gestapelte 16-Bit Blöcke <-> ein generiertes 32-Bit Layout (auch Klick auf das Info-Label)
+        self.root.bind("<F6>", self.ff_view.toggle_coherent)
+        self.root.bind("<Control-z>", lambda e: self.undo_redo("undo"))
+        self.root.bind("<Control-y>", lambda e: self.undo_redo("redo"))
+        self.root.bind("<Control-Z>", lambda e: self.undo_redo("redo"))  # Ctrl+Shift+Z
 
     def handle_keypress(self, event):
         """
@@ -87,6 +113,67 @@ class MainApp:
         if new_profile_id is not None and 0 <= new_profile_id <= 15:
             self.activate_profile_via_hotkey(new_profile_id)
 
+    def undo_redo(self, action):
+        """Ctrl+Z / Ctrl+Y an den sichtbaren Editor weitergeben (siehe history.py)."""
+        for view in (self.editor_view, self.palette_view, self.layout_view):
+            if view.winfo_ismapped():
+                getattr(view, action)()
+
+    def toggle_metrics(self, event=None):
+        views = (self.clock_view, self.ff_view)
+        if self.clock_view.stats is None:
+            self.clock_view.stats = metrics.RenderStats("clock")
+            self.ff_view.stats = metrics.RenderStats("ff")
+            if self.metrics_target[0] == "http":
+                if self.metrics_server is None:
+                    _, host, port = self.metrics_target
+                    self.metrics_server = metrics.serve(self.metrics_exposition, host, port)
+                    print(f"Metrics: http://{host}:{port}/metrics")
+            else:
+                print(f"Metrics: {self.metrics_target[1]}")
+                self.write_metrics()
+        else:
+            for view in views: view.stats = None
+            if self._metrics_after: self.root.after_cancel(self._metrics_after)
+            self._metrics_after = None
+
+    def metrics_exposition(self):
+        return metrics.exposition((self.clock_view.stats, self.ff_view.stats),
+                                  (self.clock_view.budget, self.ff_view.budget))
+
+    def write_metrics(self):
+        """Datei-Export alle 5 Sekunden, solange die Messung läuft."""
+        self._metrics_after = None
+        if self.clock_view.stats is None: return
+        try:
+            metrics.write_file(self.metrics_target[1], self.metrics_exposition())
+        except OSError as e:
+            print(f"Metrics: {e}")
+        self._metrics_after = self.root.after(5000, self.write_metrics)
+
+    def toggle_budget(self, event=None):
+        """Frame-Budget an / aus (siehe frame_budget.py). Aus = immer volle Darstellung."""
+        if self.clock_view.budget is None:
+            self.clock_view.budget = FrameBudget("clock")
+            self.ff_view.budget = FrameBudget("ff")
+            print("Frame-Budget: an")
+        else:
+            self.clock_view.budget = self.ff_view.budget = None
+            print("Frame-Budget: aus")
+
+    def toggle_trace(self, event=None):
+        """Chrome-Trace starten / beenden (siehe tracing.py)."""
+        tracer = tracing.TRACER
+        if tracer.active:
+            print(f"Trace: {tracer.stop()} Events")
+        else:
+            path = os.path.join(os.path.dirname(self.settings.filename), tracing.TRACE_FILENAME)
+            print(f"Trace: {tracer.start(path)}")
+
+    def on_alarm(self, alarm):
+        print(f"Alarm: {alarm['kind']} {alarm['value']:X} {alarm['label']}")
+        self.root.bell()
+
     def activate_profile_via_hotkey(self, slot_id):
         print(f"Hotkey: Switch to Profile {slot_id}")
 
@@ -101,6 +188,8 @@ class MainApp:
         # Aber visuell Sinn macht es nur, wenn wir die Clock sehen.
         if self.clock_view.winfo_ismapped():
             self.clock_view.force_redraw()
+            if self.clock_view._transition:
+                print(f"Morph: {self.clock_view._transition.summary()}")
 
         # 3. Falls das Dashboard offen ist, muss der Rahmen springen
         if self.profile_view.winfo_ismapped():
@@ -156,7 +245,21 @@ class MainApp:
         self.layout_view.pack_forget()
         self.profile_view.pack_forget()
 
+# Tab-Wechsel und Profil-Hotkeys im Trace
+TRACED_METHODS = ("activate_profile_via_hotkey", "show_editor", "show_palette", "show_layout",
+                  "show_profiles", "show_clock", "show_ff_clock")
+
 if __name__ == "__main__":
+    # Wrapper vor dem Erzeugen der Widgets einsetzen; BINCLOCK_TRACE=pfad.json startet sofort
+    tracing.TRACER.install()
+    tracing.TRACER.install_class(MainApp, TRACED_METHODS, "main")
+    if os.environ.get("BINCLOCK_TRACE"):
+        tracing.TRACER.start(os.environ["BINCLOCK_TRACE"])
+
     root = tk.Tk()
     app = MainApp(root)
-    root.mainloop()
\ No newline at end of file
+    try:
+        root.mainloop()
+    finally:
+        app.alarm_engine.close()
+        tracing.TRACER.stop()
\ No newline at end of file
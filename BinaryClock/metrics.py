@@ -0,0 +1,201 @@
+# Datei: metrics.py
+"""
+Render-Instrumentierung der Uhren (ohne Tk).
+
+Eine RenderStats-Instanz pro Anzeige misst pro Frame:
+  - Verspätung: tatsächlicher vs. geplanter after()-Zeitpunkt (Tk / Last)
+  - Render-Dauer (eigene Kosten)
+  - erzeugte / geänderte Canvas-Items und die Gesamtzahl Items
+
+Die Histogramme werden im Prometheus Text-Format ausgegeben - als Datei (node_exporter
+textfile) oder über einen kleinen HTTP-Endpunkt. Exportiert werden kumulative Zähler seit
+dem Einschalten (Fenster bildet der Scraper mit rate()); nur die Quantile für debug_label
+kommen aus einem rollierenden Fenster (letzte WINDOW Frames).
+Ausgeschaltet ist die Anzeige-Seite nur ein `if self.stats:`.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import frame_budget
+
+WINDOW = 600
+METRICS_FILENAME = "binClockMetrics.prom"
+LATENESS_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+RENDER_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50)
+ITEM_BUCKETS = (0, 1, 4, 8, 16, 32, 64, 128, 256)
+
+
+class RollingHistogram:
+    """
+    Histogramm über die letzten `window` Werte (Zählung pro Bucket wird mitgeführt) für quantile(),
+    dazu die kumulativen Zähler für exposition() - die fallen nie (Prometheus histogram).
+    """
+
+    def __init__(self, buckets, window=WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)      # letzter Bucket = +Inf
+        self.samples = deque()
+        self.window = window
+        self.total = 0.0
+        self.cumulative = [0] * (len(buckets) + 1)
+        self.cumulative_total = 0.0
+
+    def observe(self, value):
+        i = 0
+        for bound in self.buckets:
+            if value <= bound: break
+            i += 1
+        self.samples.append((i, value))
+        self.counts[i] += 1
+        self.total += value
+        self.cumulative[i] += 1
+        self.cumulative_total += value
+        if len(self.samples) > self.window:
+            old_i, old_value = self.samples.popleft()
+            self.counts[old_i] -= 1
+            self.total -= old_value
+
+    def quantile(self, q):
+        """Obergrenze des Buckets, in dem das Quantil liegt (wie histogram_quantile, grob)."""
+        n = len(self.samples)
+        if not n: return 0.0
+        rank = q * n
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= rank: return bound
+        return float("inf")
+
+    def exposition(self, name, labels):
+        lines = []
+        running = 0
+        counts = list(self.cumulative)
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+        running += counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {running}')
+        lines.append(f"{name}_sum{{{labels}}} {self.cumulative_total:.6g}")
+        lines.append(f"{name}_count{{{labels}}} {running}")
+        return lines
+
+
+class RenderStats:
+    def __init__(self, display, window=WINDOW):
+        self.display = display
+        self.lateness_ms = RollingHistogram(LATENESS_BUCKETS_MS, window)
+        self.render_ms = RollingHistogram(RENDER_BUCKETS_MS, window)
+        self.items_changed = RollingHistogram(ITEM_BUCKETS, window)
+        self.canvas_items = 0
+        self.frames = 0
+        self._due = None
+        self._t0 = 0.0
+
+    # --- Aufrufe aus dem Update-Loop ---
+
+    def fired(self):
+        now = time.perf_counter()
+        if self._due is not None:
+            self.lateness_ms.observe(max((now - self._due) * 1000, 0.0))
+            self._due = None
+        self._t0 = now
+
+    def rendered(self, items_changed, canvas_items):
+        self.render_ms.observe((time.perf_counter() - self._t0) * 1000)
+        self.items_changed.observe(items_changed)
+        self.canvas_items = canvas_items
+        self.frames += 1
+
+    def scheduled(self, delay_ms):
+        self._due = time.perf_counter() + delay_ms / 1000
+
+    # --- Ausgabe ---
+
+    def summary(self):
+        """Kurzform für debug_label."""
+        return (f"late p50 {self.lateness_ms.quantile(0.5):g} / p99 {self.lateness_ms.quantile(0.99):g} ms | "
+                f"render p99 {self.render_ms.quantile(0.99):g} ms | "
+                f"items {self.items_changed.quantile(0.5):g}/{self.canvas_items}")
+
+    def exposition(self):
+        labels = f'display="{self.display}"'
+        lines = []
+        lines += self.lateness_ms.exposition("binclock_tick_lateness_ms", labels)
+        lines += self.render_ms.exposition("binclock_render_duration_ms", labels)
+        lines += self.items_changed.exposition("binclock_items_changed", labels)
+        lines.append(f"binclock_canvas_items{{{labels}}} {self.canvas_items}")
+        lines.append(f"binclock_frames_total{{{labels}}} {self.frames}")
+        return lines
+
+
+HEADER = [
+    "# HELP binclock_tick_lateness_ms Actual minus scheduled after() fire time (since instrumentation was turned on).",
+    "# TYPE binclock_tick_lateness_ms histogram",
+    "# HELP binclock_render_duration_ms Time spent in one update (since instrumentation was turned on).",
+    "# TYPE binclock_render_duration_ms histogram",
+    "# HELP binclock_items_changed Canvas items created or changed per frame (since instrumentation was turned on).",
+    "# TYPE binclock_items_changed histogram",
+    "# HELP binclock_canvas_items Canvas items after the last frame.",
+    "# TYPE binclock_canvas_items gauge",
+    "# HELP binclock_frames_total Frames rendered while instrumentation was on.",
+    "# TYPE binclock_frames_total counter",
+]
+
+
+def exposition(stats_list, budgets=()):
+    """Alle Anzeigen als Prometheus Text-Format (budgets: frame_budget.FrameBudget, Render-Modi)."""
+    lines = list(HEADER)
+    for stats in stats_list:
+        if stats: lines += stats.exposition()
+    budgets = [b for b in budgets if b]
+    if budgets:
+        lines += frame_budget.HEADER
+        for budget in budgets:
+            lines += budget.exposition()
+    return "\n".join(lines) + "\n"
+
+
+# --- EXPORT ---
+
+def write_file(path, text):
+    """Atomar schreiben (textfile-Collector darf nie eine halbe Datei sehen)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def serve(source, host="127.0.0.1", port=9464):
+    """
+    GET /metrics in einem Daemon-Thread. `source()` liefert den Text.
+    Rückgabe: der Server (server.shutdown() zum Beenden).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = source().encode()
+            self.send_response(200 if self.path.startswith("/metrics") else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_target(text, default_dir):
+    """'127.0.0.1:9464' / ':9464' -> ('http', host, port), sonst ('file', Pfad)."""
+    if not text:
+        return "file", os.path.join(default_dir, METRICS_FILENAME)
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit():
+        return "http", host or "127.0.0.1", int(port)
+    return "file", text
@@ -0,0 +1,178 @@
+# Datei: palette_engine.py
+"""
+Farb-Engine für Paletten (ohne Tk).
+
+Eine Palette sind 16 Farben (Index = Bit, siehe render_plan.compile_nibble), hier als
+gepacktes RGB Array (16 x 3). Alle Operationen arbeiten auf dem ganzen Array auf einmal und
+liefern eine NEUE Palette: Verlauf über die 16 Bits, Helligkeits-Rampen pro Nibble,
+Farbton-Verschiebung und Kontrast-Korrektur gegen den Hintergrund.
+
+Abgeleitete Farben (Hover / Helligkeit) werden pro Palette nur einmal berechnet (variant).
+
+NumPy ist optional: ohne NumPy rechnen dieselben Operationen Farbe für Farbe (16 Stück),
+mit gleichem Ergebnis. hue_shift rechnet immer Farbe für Farbe (colorsys).
+"""
+import colorsys
+
+import core
+
+try:
+    import numpy as np
+except ImportError:  # NumPy ist optional
+    np = None
+
+SIZE = 16
+HOVER_FACTOR = 1.2  # wie FlatButton
+
+
+def parse_hex(color_hex, default=core.DEFAULT_COLOR):
+    """'#RRGGBB' -> (r, g, b). Unlesbare Farben werden zu `default`."""
+    for text in (color_hex, default):
+        try:
+            text = text.lstrip("#")
+            if len(text) == 6:
+                return int(text[0:2], 16), int(text[2:4], 16), int(text[4:6], 16)
+        except (AttributeError, ValueError):
+            pass
+    return 0x33, 0x33, 0x33
+
+
+def _luminance(rgb):
+    """Relative Luminanz nach WCAG 2 (rgb: Array ... x 3 in 0..255)."""
+    c = rgb / 255.0
+    c = np.where(c <= 0.03928, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return c @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def _luminance_py(rgb):
+    c = [v / 255.0 for v in rgb]
+    c = [v / 12.92 if v <= 0.03928 else ((v + 0.055) / 1.055) ** 2.4 for v in c]
+    return 0.2126 * c[0] + 0.7152 * c[1] + 0.0722 * c[2]
+
+
+def contrast_ratio(l1, l2):
+    hi, lo = (l1, l2) if l1 >= l2 else (l2, l1)
+    return (hi + 0.05) / (lo + 0.05)
+
+
+class Palette:
+    def __init__(self, rgb):
+        # NumPy: int16 Array (16, 3); sonst Liste von (r, g, b)
+        self.rgb = rgb
+        self._hex = None
+        self._variants = {}
+
+    @classmethod
+    def from_hex(cls, colors):
+        colors = list(colors)[:SIZE] + [core.DEFAULT_COLOR] * (SIZE - len(colors))
+        rgb = [parse_hex(c) for c in colors]
+        return cls(np.array(rgb, dtype=np.int16) if np is not None else rgb)
+
+    def _new(self, rgb):
+        """Neue Palette aus Gleitkomma-/Int-Werten (gerundet, auf 0..255 begrenzt)."""
+        if np is not None:
+            return Palette(np.clip(np.rint(rgb), 0, 255).astype(np.int16))
+        return Palette([tuple(min(255, max(0, int(round(v)))) for v in c) for c in rgb])
+
+    def _rows(self):
+        return self.rgb.tolist() if np is not None else self.rgb
+
+    # --- AUSGABE ---
+
+    def hex(self):
+        """Farben als '#RRGGBB' (einmal berechnet)."""
+        if self._hex is None:
+            self._hex = ["#%02X%02X%02X" % tuple(c) for c in self._rows()]
+        return self._hex
+
+    def variant(self, factor):
+        """Helligkeits-Variante wie FlatButton.adjust_color_lightness (min(255, int(c * factor))), gecacht."""
+        result = self._variants.get(factor)
+        if result is None:
+            if np is not None:
+                rows = np.minimum(255, (self.rgb * factor).astype(np.int16)).tolist()
+            else:
+                rows = [tuple(min(255, int(v * factor)) for v in c) for c in self.rgb]
+            result = self._variants[factor] = ["#%02x%02x%02x" % tuple(c) for c in rows]
+        return result
+
+    @property
+    def hover(self):
+        return self.variant(HOVER_FACTOR)
+
+    # --- BULK OPERATIONEN (liefern eine neue Palette) ---
+
+    def gradient(self, start=None, end=None, indices=range(SIZE)):
+        """Linearer Verlauf über `indices` (Standard: Bit 0 .. Bit 15, Endfarben aus der Palette)."""
+        indices = list(indices)
+        rows = self._rows()
+        a = parse_hex(start) if start else rows[indices[0]]
+        b = parse_hex(end) if end else rows[indices[-1]]
+        n = max(len(indices) - 1, 1)
+        if np is not None:
+            rgb = self.rgb.astype(np.float64)
+            k = np.arange(len(indices))[:, None]
+            rgb[indices] = np.array(a) + (np.array(b) - np.array(a)) * k / n
+            return self._new(rgb)
+        rgb = [list(c) for c in rows]
+        for k, i in enumerate(indices):
+            rgb[i] = [x + (y - x) * k / n for x, y in zip(a, b)]
+        return self._new(rgb)
+
+    def nibble_ramps(self, nibbles=range(4), low=0.35):
+        """Pro Nibble: Gruppe 3 bleibt, Gruppe 0..2 werden zur Basis hin dunkler (low .. 1)."""
+        factors = [low + (1 - low) * gid / 3 for gid in range(4)]
+        if np is not None:
+            rgb = self.rgb.astype(np.float64).reshape(4, 4, 3)
+            nibbles = list(nibbles)
+            base = rgb[nibbles, 3:4, :]                      # (n, 1, 3)
+            rgb[nibbles] = base * np.array(factors)[None, :, None]
+            return self._new(rgb.reshape(SIZE, 3))
+        rgb = [list(c) for c in self.rgb]
+        for n in nibbles:
+            base = rgb[n * 4 + 3]
+            for gid in range(4):
+                rgb[n * 4 + gid] = [v * factors[gid] for v in base]
+        return self._new(rgb)
+
+    def hue_shift(self, degrees, indices=range(SIZE)):
+        """
+        Farbton um `degrees` drehen (Helligkeit und Sättigung bleiben).
+        Immer über colorsys, auch mit NumPy: bei 16 Farben ist das schneller als vektorisiert.
+        """
+        shift = (degrees / 360.0) % 1.0
+        rgb = [list(c) for c in self._rows()]
+        for i in indices:
+            h, s, v = colorsys.rgb_to_hsv(*(x / 255.0 for x in rgb[i]))
+            if s: rgb[i] = [x * 255 for x in colorsys.hsv_to_rgb((h + shift) % 1.0, s, v)]
+        return self._new(rgb)
+
+    def fix_contrast(self, bg=core.BG_COLOR, min_ratio=3.0, steps=20):
+        """
+        Farben mit zu wenig Kontrast zum Hintergrund (WCAG Verhältnis < min_ratio) so wenig wie
+        möglich Richtung Weiß (dunkler Hintergrund) bzw. Schwarz mischen, bis es reicht.
+        """
+        bg_rgb = parse_hex(bg)
+        if np is not None:
+            bg_lum = _luminance(np.array(bg_rgb, dtype=np.float64))
+            target = np.full(3, 255.0 if bg_lum < 0.5 else 0.0)
+            k = np.arange(steps + 1)[:, None, None]                     # (steps+1, 1, 1)
+            candidates = self.rgb + (target - self.rgb) * k / steps     # (steps+1, 16, 3)
+            lum = _luminance(np.rint(candidates))
+            ratio = (np.maximum(lum, bg_lum) + 0.05) / (np.minimum(lum, bg_lum) + 0.05)
+            ok = ratio >= min_ratio
+            first = np.where(ok.any(axis=0), ok.argmax(axis=0), steps)  # kleinster Schritt, der reicht
+            return self._new(candidates[first, np.arange(SIZE)])
+        bg_lum = _luminance_py(bg_rgb)
+        target = 255.0 if bg_lum < 0.5 else 0.0
+        rgb = []
+        for c in self.rgb:
+            for k in range(steps + 1):
+                cand = [v + (target - v) * k / steps for v in c]
+                if contrast_ratio(_luminance_py([round(v) for v in cand]), bg_lum) >= min_ratio: break
+            rgb.append(cand)
+        return self._new(rgb)
+
+    def changed(self, other):
+        """Indizes, deren Farbe sich gegenüber `other` unterscheidet."""
+        return [i for i, (a, b) in enumerate(zip(self.hex(), other.hex())) if a != b]
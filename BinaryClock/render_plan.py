@@ -0,0 +1,285 @@
+# Datei: render_plan.py
+"""
+Kompilierte Render-Pläne (ohne Tk).
+
+Ein Plan ist die Liste ALLER Rechtecke, die eine Uhr zeichnen könnte (Zellen, Brücken, Ecken),
+jedes mit dem absoluten Bit, an dem es hängt. Für einen Wert sind genau die Rechtecke sichtbar,
+deren Bit gesetzt ist. Dadurch ist der Unterschied zwischen zwei Werten nur noch "welche Bits
+haben sich geändert" (old ^ new) - statt alles neu zu zeichnen.
+
+Die Geometrie entspricht ClockDisplay.render_clock bzw. FFClockDisplay.render_clock.
+"""
+from collections import namedtuple
+
+import core
+
+Geometry = namedtuple("Geometry", "cell gap nibble_gap")
+CLOCK_GEOMETRY = Geometry(20, 4, 30)
+
+# Ein Rechteck im Plan
+Rect = namedtuple("Rect", "bit role x1 y1 x2 y2 color")
+
+
+class RenderPlan:
+    def __init__(self, rects, bits):
+        self.rects = rects
+        self.bits = bits
+        # Bit -> Indizes der Rechtecke, die an diesem Bit hängen
+        self.by_bit = [[] for _ in range(bits)]
+        for i, rect in enumerate(rects):
+            self.by_bit[rect.bit].append(i)
+
+    def visible(self, value):
+        """Rechtecke (in Zeichenreihenfolge), die für `value` sichtbar sind."""
+        return [r for r in self.rects if (value >> r.bit) & 1]
+
+    def changed_bits(self, old_value, new_value):
+        diff = old_value ^ new_value
+        return [b for b in range(self.bits) if (diff >> b) & 1]
+
+    def bounds(self):
+        if not self.rects: return 0, 0, 0, 0
+        return (min(r.x1 for r in self.rects), min(r.y1 for r in self.rects),
+                max(r.x2 for r in self.rects), max(r.y2 for r in self.rects))
+
+    def to_json(self):
+        return {"bits": self.bits,
+                "rects": [[r.bit, r.role, r.x1, r.y1, r.x2, r.y2, r.color] for r in self.rects]}
+
+
+# --- KOMPILIEREN ---
+
+def compile_nibble(ox, oy, grid, nibble_id, palette, geometry=CLOCK_GEOMETRY, bit_offset=0,
+                   palette_nibble=None, bridges=True, corners=True):
+    """
+    Ein 4x4 Nibble -> Rechtecke. Bit = bit_offset + nibble_id * 4 + gid,
+    Farbe = palette[palette_nibble * 4 + gid] (palette_nibble Standard: nibble_id).
+    """
+    cell, gap = geometry.cell, geometry.gap
+    if palette_nibble is None: palette_nibble = nibble_id
+
+    def get_color(gid):
+        try:
+            return palette[palette_nibble * 4 + gid]
+        except (IndexError, TypeError):
+            return core.ERROR_COLOR
+
+    def bit_of(gid):
+        return bit_offset + nibble_id * 4 + gid
+
+    rects = []
+    # 1. Basis Zellen
+    for r in range(4):
+        for c in range(4):
+            gid = grid[r][c]
+            if gid is None or gid == -1: continue
+            x1 = ox + c * (cell + gap)
+            y1 = oy + r * (cell + gap)
+            rects.append(Rect(bit_of(gid), "cell", x1, y1, x1 + cell, y1 + cell, get_color(gid)))
+
+    # 2. Brücken
+    if bridges:
+        for r in range(4):
+            for c in range(4):
+                gid = grid[r][c]
+                if gid is None or gid == -1: continue
+                x1 = ox + c * (cell + gap)
+                y1 = oy + r * (cell + gap)
+                if c < 3 and grid[r][c + 1] == gid:
+                    rects.append(Rect(bit_of(gid), "bridge", x1 + cell - 1, y1, x1 + cell + gap + 1, y1 + cell,
+                                      get_color(gid)))
+                if r < 3 and grid[r + 1][c] == gid:
+                    rects.append(Rect(bit_of(gid), "bridge", x1, y1 + cell - 1, x1 + cell, y1 + cell + gap + 1,
+                                      get_color(gid)))
+
+    # 3. Ecken
+    if corners:
+        for r in range(3):
+            for c in range(3):
+                g1 = grid[r][c]
+                if g1 is not None and g1 != -1 and g1 == grid[r][c + 1] == grid[r + 1][c] == grid[r + 1][c + 1]:
+                    cx1 = ox + c * (cell + gap) + cell - 1
+                    cy1 = oy + r * (cell + gap) + cell - 1
+                    rects.append(Rect(bit_of(g1), "corner", cx1, cy1, cx1 + gap + 2, cy1 + gap + 2, get_color(g1)))
+    return rects
+
+
+def compile_block(px, py, grid_design, placements, palette, geometry=CLOCK_GEOMETRY, bit_offset=0,
+                  grid_offset=(0, 0), palette_nibble=None, bridges=True, corners=True):
+    """Alle Placements eines Layouts ab Pixel (px, py)."""
+    nibble_px = 4 * geometry.cell + 3 * geometry.gap
+    step = nibble_px + geometry.nibble_gap
+    rects = []
+    mirror_cache = {}
+    for p in placements:
+        mirror = p.get("mirror", {})
+        mx, my = mirror.get("x", False), mirror.get("y", False)
+        # Jede Spiegel-Variante nur einmal transformieren
+        grid = mirror_cache.get((mx, my))
+        if grid is None:
+            grid = mirror_cache[(mx, my)] = core.transform_grid(grid_design, mx, my) if (mx or my) else grid_design
+
+        x = px + (p["position"]["x"] - grid_offset[0]) * step
+        y = py + (p["position"]["y"] - grid_offset[1]) * step
+        rects.extend(compile_nibble(x, y, grid, p["nibbleId"], palette, geometry, bit_offset,
+                                    palette_nibble, bridges, corners))
+    return rects
+
+
+def clock_origin(canvas_w, canvas_h, geometry=CLOCK_GEOMETRY):
+    """Startpunkt wie in ClockDisplay.render_clock (4x4 Nibble-Raster zentriert)."""
+    nibble_px = 4 * geometry.cell + 3 * geometry.gap
+    layout_w = 4 * nibble_px + 3 * geometry.nibble_gap
+    start_x = (canvas_w - layout_w) // 2
+    start_y = (canvas_h - layout_w) // 2
+    if start_x < 0: start_x = 10
+    if start_y < 0: start_y = 10
+    return start_x, start_y
+
+
+def compile_clock_plan(data, canvas_w, canvas_h, profile=None, geometry=CLOCK_GEOMETRY):
+    """16-Bit Plan des (aktiven) Profils, positioniert wie ClockDisplay."""
+    grid_design, placements, palette = core.resolve_profile(data, profile)
+    start_x, start_y = clock_origin(canvas_w, canvas_h, geometry)
+    return RenderPlan(compile_block(start_x, start_y, grid_design, placements, palette, geometry), 16)
+
+
+def compile_ff_plan(data, canvas_w, canvas_h, profile=None, geometry=CLOCK_GEOMETRY):
+    """32-Bit Plan wie FFClockDisplay: oben die Tage (Palette von Nibble 0), unten die Zeit."""
+    # Kurze Paletten wie bisher in der F.F Uhr: so wie sie sind, fehlende Farben -> ERROR_COLOR
+    grid_design, placements, palette = core.resolve_profile(data, profile, pad_palette=False)
+    if not placements: return RenderPlan([], 32)
+
+    min_x, max_x, min_y, max_y = core.get_layout_bounds(placements)
+    cols_used = max_x - min_x + 1
+    rows_used = max_y - min_y + 1
+    nibble_px = 4 * geometry.cell + 3 * geometry.gap
+    block_width = cols_used * nibble_px + (cols_used - 1) * geometry.nibble_gap
+    block_height = rows_used * nibble_px + (rows_used - 1) * geometry.nibble_gap
+    stack_gap = geometry.nibble_gap
+    start_x = (canvas_w - block_width) // 2
+    start_y = (canvas_h - (block_height * 2 + stack_gap)) // 2
+
+    offset = (min_x, min_y)
+    rects = compile_block(start_x, start_y, grid_design, placements, palette, geometry,
+                          bit_offset=16, grid_offset=offset, palette_nibble=0)
+    rects += compile_block(start_x, start_y + block_height + stack_gap, grid_design, placements, palette,
+                           geometry, bit_offset=0, grid_offset=offset)
+    return RenderPlan(rects, 32)
+
+
+class PartCompiler:
+    """
+    Baut Pläne aus einem Arbeitsstand (Design, Placements, Palette) und merkt sich die Rechtecke
+    pro Placement. Bei einer Änderung wird nur neu kompiliert, was davon betroffen ist:
+    neue Farben -> die Nibbles, deren vier Farben sich geändert haben; verschobenes Placement ->
+    nur dieses; neues Design -> alle. Unveränderter Stand -> dasselbe Plan-Objekt wie vorher.
+    """
+
+    def __init__(self, geometry=CLOCK_GEOMETRY, max_parts=256):
+        self.geometry = geometry
+        self.max_parts = max_parts
+        self.parts = {}
+        self.plan = None
+        self._key = None
+        self.recompiled = 0     # Placements, die beim letzten compile() neu gebaut wurden
+
+    def compile(self, grid_design, placements, palette, px=0, py=0, grid_offset=(0, 0)):
+        design = tuple(tuple(row) for row in grid_design)
+        step = 4 * self.geometry.cell + 3 * self.geometry.gap + self.geometry.nibble_gap
+        keys = []
+        for p in placements:
+            mirror = p.get("mirror", {})
+            nid = p["nibbleId"]
+            keys.append((design, mirror.get("x", False), mirror.get("y", False), nid,
+                         px + (p["position"]["x"] - grid_offset[0]) * step,
+                         py + (p["position"]["y"] - grid_offset[1]) * step,
+                         tuple(palette[nid * 4:nid * 4 + 4])))
+        key = tuple(keys)
+        self.recompiled = 0
+        if key == self._key: return self.plan
+
+        if len(self.parts) > self.max_parts: self.parts.clear()
+        rects = []
+        for part_key in keys:
+            part = self.parts.get(part_key)
+            if part is None:
+                _, mx, my, nid, x, y, colors = part_key
+                grid = core.transform_grid(grid_design, mx, my) if (mx or my) else grid_design
+                part = self.parts[part_key] = compile_nibble(x, y, grid, 0, colors, self.geometry,
+                                                             bit_offset=nid * 4)
+                self.recompiled += 1
+            rects.extend(part)
+        self.plan = RenderPlan(rects, 16)
+        self._key = key
+        return self.plan
+
+
+def plan_key(data, canvas_w, canvas_h, profile=None):
+    """Cache-Schlüssel: ändert sich, sobald sich Design, Layout, Palette oder Größe ändern."""
+    if profile is None:
+        profile = core.get_active_profile(data)
+    nid = profile.get("nibbleGridId", 0)
+    lid = profile.get("layoutId", 0)
+    pid = profile.get("paletteId", 0)
+    lib = data["library"]
+    placements = lib["layoutGrids"][lid].get("placements", [])
+    return (canvas_w, canvas_h,
+            tuple(lib["nibbleGrids"][nid]["cells"]),
+            tuple((p["nibbleId"], p["position"]["x"], p["position"]["y"],
+                   p.get("mirror", {}).get("x", False), p.get("mirror", {}).get("y", False)) for p in placements),
+            tuple(lib["palettes"][pid].get("colors", ())))
+
+
+# --- RASTER (für Terminal / Bild-Export) ---
+
+def compile_compact_plan(data, geometry, profile=None, bit_offset=0):
+    """16-Bit Plan ohne Rand: das Layout beginnt bei (0, 0), leere Raster-Zeilen/Spalten fallen weg."""
+    grid_design, placements, palette = core.resolve_profile(data, profile)
+    if not placements: return RenderPlan([], 16 + bit_offset)
+    min_x, _, min_y, _ = core.get_layout_bounds(placements)
+    rects = compile_block(0, 0, grid_design, placements, palette, geometry,
+                          bit_offset=bit_offset, grid_offset=(min_x, min_y))
+    return RenderPlan(rects, 16 + bit_offset)
+
+
+class PixelMap:
+    """
+    Rastert einen Plan in ein Pixel-Gitter. Pro Pixel wird gemerkt, welche Rechtecke ihn
+    überdecken (oberstes zuerst) - die Farbe eines Pixels für einen Wert ist dann die Farbe
+    des obersten sichtbaren Rechtecks, sonst Hintergrund.
+    """
+
+    def __init__(self, plan, width=None, height=None, bg=core.BG_COLOR):
+        _, _, max_x, max_y = plan.bounds()
+        self.width = width if width is not None else max_x
+        self.height = height if height is not None else max_y
+        self.bg = bg
+        self.plan = plan
+
+        self.layers = {}                                   # Pixel-Index -> [(bit, color), ...]
+        self.pixels_by_bit = [set() for _ in range(plan.bits)]
+        for rect in plan.rects:
+            for y in range(max(rect.y1, 0), min(rect.y2, self.height)):
+                row = y * self.width
+                for x in range(max(rect.x1, 0), min(rect.x2, self.width)):
+                    self.layers.setdefault(row + x, []).insert(0, (rect.bit, rect.color))
+                    self.pixels_by_bit[rect.bit].add(row + x)
+
+    def color_at(self, index, value):
+        for bit, color in self.layers.get(index, ()):
+            if (value >> bit) & 1: return color
+        return self.bg
+
+    def render(self, value):
+        """Alle Pixel als Liste von Hex-Farben (Zeile für Zeile)."""
+        pixels = [self.bg] * (self.width * self.height)
+        for index in self.layers:
+            pixels[index] = self.color_at(index, value)
+        return pixels
+
+    def changed_pixels(self, old_value, new_value):
+        result = set()
+        for bit in self.plan.changed_bits(old_value, new_value):
+            result |= self.pixels_by_bit[bit]
+        return result
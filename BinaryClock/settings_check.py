@@ -0,0 +1,222 @@
+# Datei: settings_check.py
+"""
+Prüfen und Vorkompilieren vieler Settings-Dateien (ohne Tk), für `cli.py compile`.
+
+validate(data) prüft gegen das Schema, das SettingsManager.get_defaults vorgibt:
+16 Nibble-Grids (16 Zellen, -1..3, höchstens GROUP_LIMITS Zellen pro Gruppe), 16 Layouts
+(Placements mit nibbleId 0..3 und Position im 4x4 Raster, keine Doppelten), 16 Paletten mit
+je 16 Farben (#RRGGBB) und 16 Profile mit gültigen IDs.
+
+compile_file liest eine Datei, prüft sie und schreibt für gültige Dateien die kompakten
+Render-Pläne aller Profile (render_plan.compile_compact_plan, gleiche Profile nur einmal).
+Die Dateien werden in Blöcken auf Worker-Prozesse verteilt, der Bericht ist eine JSON-Zeile
+pro Datei - in Reihenfolge, mit konstantem Speicher (gleitendes Fenster wie cli.stamp_stream).
+"""
+import fnmatch
+import json
+import os
+import re
+import time
+from collections import deque
+
+import core
+import render_plan
+
+SLOTS = 16
+COLOR_PATTERN = re.compile(r"#[0-9A-Fa-f]{6}\Z")
+BATCH_FILES = 32
+PLAN_SUFFIX = ".plans.json"
+
+
+def _is_int(value, lo, hi):
+    return isinstance(value, int) and not isinstance(value, bool) and lo <= value <= hi
+
+
+def _slots(data, path, errors):
+    """Liste mit genau 16 Dicts, sonst Fehler und []."""
+    items = data.get(path[-1]) if isinstance(data, dict) else None
+    name = ".".join(path)
+    if not isinstance(items, list):
+        errors.append(f"{name}: fehlt oder keine Liste")
+        return []
+    if len(items) != SLOTS:
+        errors.append(f"{name}: {len(items)} Einträge statt {SLOTS}")
+    bad = [i for i, item in enumerate(items) if not isinstance(item, dict)]
+    if bad:
+        errors.append(f"{name}{bad}: kein Objekt")
+    return [(i, item) for i, item in enumerate(items) if isinstance(item, dict)]
+
+
+def validate_nibble(cells, name, errors):
+    if not isinstance(cells, list) or len(cells) != 16:
+        errors.append(f"{name}.cells: keine Liste mit 16 Zellen")
+        return
+    counts = {gid: 0 for gid in core.GROUP_LIMITS}
+    for i, cell in enumerate(cells):
+        if not _is_int(cell, -1, 3):
+            errors.append(f"{name}.cells[{i}]: {cell!r} (erlaubt: -1..3)")
+        elif cell != -1:
+            counts[cell] += 1
+    for gid, count in counts.items():
+        if count > core.GROUP_LIMITS[gid]:
+            errors.append(f"{name}.cells: Gruppe {gid} hat {count} Zellen (max {core.GROUP_LIMITS[gid]})")
+
+
+def validate_layout(placements, name, errors):
+    if not isinstance(placements, list):
+        errors.append(f"{name}.placements: keine Liste")
+        return
+    seen_ids, seen_pos = set(), set()
+    for i, p in enumerate(placements):
+        where = f"{name}.placements[{i}]"
+        try:
+            nid, x, y = p["nibbleId"], p["position"]["x"], p["position"]["y"]
+        except (KeyError, TypeError):
+            errors.append(f"{where}: nibbleId / position fehlt")
+            continue
+        mirror = p.get("mirror", {})
+        if not isinstance(mirror, dict) or any(not isinstance(mirror.get(k, False), bool) for k in "xy"):
+            errors.append(f"{where}.mirror: x/y müssen true/false sein")
+        valid = True
+        if not _is_int(nid, 0, 3):
+            errors.append(f"{where}.nibbleId: {nid!r} (erlaubt: 0..3)")
+            valid = False
+        if not (_is_int(x, 0, 3) and _is_int(y, 0, 3)):
+            errors.append(f"{where}.position: ({x!r}, {y!r}) außerhalb 4x4")
+            valid = False
+        # Nur geprüfte Werte in die Sets (eine Liste als nibbleId wäre nicht hashbar)
+        if not valid: continue
+        if nid in seen_ids: errors.append(f"{where}: nibbleId {nid} doppelt")
+        if (x, y) in seen_pos: errors.append(f"{where}: Position ({x}, {y}) doppelt belegt")
+        seen_ids.add(nid)
+        seen_pos.add((x, y))
+
+
+def validate_palette(colors, name, errors):
+    if not isinstance(colors, list) or len(colors) != 16:
+        errors.append(f"{name}.colors: keine Liste mit 16 Farben")
+        return
+    for i, color in enumerate(colors):
+        if not isinstance(color, str) or not COLOR_PATTERN.match(color):
+            errors.append(f"{name}.colors[{i}]: {color!r} (erwartet #RRGGBB)")
+
+
+def validate(data):
+    """Liste von Fehlern ("pfad: meldung"), leer = gültig."""
+    errors = []
+    if not isinstance(data, dict):
+        return ["root: kein Objekt"]
+    if not _is_int(data.get("active_profileId"), 0, SLOTS - 1):
+        errors.append(f"active_profileId: {data.get('active_profileId')!r} (erlaubt: 0..{SLOTS - 1})")
+    library = data.get("library")
+    if not isinstance(library, dict):
+        errors.append("library: fehlt oder kein Objekt")
+        library = {}
+
+    for i, nibble in _slots(library, ("library", "nibbleGrids"), errors):
+        validate_nibble(nibble.get("cells"), f"library.nibbleGrids[{i}]", errors)
+    for i, layout in _slots(library, ("library", "layoutGrids"), errors):
+        validate_layout(layout.get("placements", []), f"library.layoutGrids[{i}]", errors)
+    for i, palette in _slots(library, ("library", "palettes"), errors):
+        validate_palette(palette.get("colors"), f"library.palettes[{i}]", errors)
+    for i, profile in _slots(data, ("profiles",), errors):
+        for key in ("nibbleGridId", "layoutId", "paletteId"):
+            if not _is_int(profile.get(key, 0), 0, SLOTS - 1):
+                errors.append(f"profiles[{i}].{key}: {profile.get(key)!r} (erlaubt: 0..{SLOTS - 1})")
+    return errors
+
+
+# --- KOMPILIEREN ---
+
+def compile_plans(data, geometry=render_plan.CLOCK_GEOMETRY):
+    """Kompakte Pläne aller Profile. Profile mit gleichem (Design, Layout, Palette) teilen einen Plan."""
+    plans, index, profiles = [], {}, []
+    for profile in data["profiles"]:
+        key = (profile.get("nibbleGridId", 0), profile.get("layoutId", 0), profile.get("paletteId", 0))
+        if key not in index:
+            index[key] = len(plans)
+            plans.append(render_plan.compile_compact_plan(data, geometry, profile).to_json())
+        profiles.append(index[key])
+    return {"geometry": list(geometry), "profiles": profiles, "plans": plans}
+
+
+def compile_file(path, root, out_dir=None):
+    """Eine Datei prüfen (und kompilieren) -> Bericht als Dict. Wirft nie: Fehler landen im Bericht."""
+    t0 = time.perf_counter()
+    report = {"file": os.path.relpath(path, root)}
+    try:
+        _check_file(path, out_dir, report)
+    except Exception as e:
+        # Eine kaputte Datei darf den Lauf über den ganzen Baum nicht abbrechen
+        report.pop("plans", None)
+        report.pop("rects", None)
+        report.update(ok=False, errors=report.get("errors", []) + [f"intern: {type(e).__name__}: {e}"])
+    report["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return report
+
+
+def _check_file(path, out_dir, report):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        report.update(ok=False, errors=[f"lesen: {e}"])
+    else:
+        errors = validate(data)
+        report.update(ok=not errors, errors=errors)
+        if not errors:
+            compiled = compile_plans(data)
+            report["plans"] = len(compiled["plans"])
+            report["rects"] = sum(len(plan["rects"]) for plan in compiled["plans"])
+            if out_dir:
+                target = os.path.join(out_dir, os.path.splitext(report["file"])[0] + PLAN_SUFFIX)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "w", encoding="utf-8") as f:
+                    f.write(json.dumps(compiled, separators=(",", ":")))  # dumps nutzt den C-Encoder, dump nicht
+                report["out"] = target
+
+
+def _compile_batch(args):
+    paths, root, out_dir = args
+    return [compile_file(path, root, out_dir) for path in paths]
+
+
+def find_files(root, pattern="*.json", skip_dir=None):
+    """Alle passenden Dateien unter root (sortiert, ohne den Ausgabe-Ordner)."""
+    skip = os.path.abspath(skip_dir) if skip_dir else None
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != skip)
+        for name in sorted(filenames):
+            if fnmatch.fnmatch(name, pattern) and not name.endswith(PLAN_SUFFIX):
+                yield os.path.join(dirpath, name)
+
+
+def _batches(paths, size):
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch: yield batch
+
+
+def compile_tree(root, out_dir=None, jobs=None, pattern="*.json", batch_files=BATCH_FILES):
+    """Generator der Berichte (ein Dict pro Datei, Reihenfolge wie find_files)."""
+    batches = _batches(find_files(root, pattern, out_dir), batch_files)
+    if jobs == 1:
+        for batch in batches:
+            yield from _compile_batch((batch, root, out_dir))
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(_compile_batch, (batch, root, out_dir)))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -3,20 +3,22 @@ import os
 import sys
 
 
+def get_application_path():
+    # --- PFAD LOGIK FÜR FREEZE / STANDALONE ---
+    if getattr(sys, 'frozen', False):
+        # Fall A: Das Programm läuft als compilierte Datei (PyInstaller/Py2App)
+        # Wir nehmen den Ordner, in dem die executable liegt
+        return os.path.dirname(sys.executable)
+    else:
+        # Fall B: Das Programm läuft normal als Skript
+        # Wir nehmen den Ordner, in dem dieses Script liegt
+        return os.path.dirname(os.path.abspath(__file__))
+
+
 class SettingsManager:
     def __init__(self, filename="binClockSettings.json"):
-        # --- PFAD LOGIK FÜR FREEZE / STANDALONE ---
-        if getattr(sys, 'frozen', False):
-            # Fall A: Das Programm läuft als compilierte Datei (PyInstaller/Py2App)
-            # Wir nehmen den Ordner, in dem die executable liegt
-            application_path = os.path.dirname(sys.executable)
-        else:
-            # Fall B: Das Programm läuft normal als Skript
-            # Wir nehmen den Ordner, in dem dieses Script liegt
-            application_path = os.path.dirname(os.path.abspath(__file__))
-
         # Wir bauen den absoluten Pfad zusammen:
-        self.filename = os.path.join(application_path, filename)
+        self.filename = os.path.join(get_application_path(), filename)
 
         # Einstellungen laden
         self.data = self.load_settings()
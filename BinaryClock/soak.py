@@ -0,0 +1,164 @@
+# Datei: soak.py
+"""
+Langzeit-Test (Soak): ClockDisplay und FFClockDisplay über simulierte Wochen.
+
+Die Zeit läuft beschleunigt (ein update_loop pro Tick, ohne zu schlafen). In festen Abständen
+werden gemessen: RSS des Prozesses, höchste Canvas-Item-ID, Anzahl Python-Objekte und der
+tracemalloc-Stand. Nach einer Aufwärmphase darf keine dieser Größen weiter wachsen -
+die Zeitreihe wird als JSON ausgegeben.
+
+    python soak.py [--days 14] [--samples 56] [--tk] [--out soak.json]
+
+Ohne --tk wird in die FakeCanvas aus bench_ui gezeichnet (kein Display nötig). Mit --tk
+werden echte Tk-Canvas benutzt (braucht ein Display, z.B. xvfb-run).
+"""
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import bench_ui
+import core
+
+WARMUP = 0.25           # Anteil der Samples, der nicht bewertet wird
+TOLERANCE = {           # erlaubtes Wachstum (zweite gegen erste Hälfte): (relativ, absolut)
+    "rss_kb": (0.02, 2048),
+    "max_item_id": (0.0, 0),
+    "objects": (0.01, 500),
+    "traced_kb": (0.02, 256),
+}
+
+
+def rss_kb():
+    """Aktuelles RSS in KB (Linux /proc), sonst Peak über resource, sonst None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+    except ImportError:
+        return None
+
+
+def max_item_id(canvas):
+    items = canvas.find_all()
+    return max(items) if items else 0
+
+
+class SoakRun:
+    def __init__(self, days=14, samples=56, use_tk=False):
+        self.days = days
+        self.samples = samples
+        self.use_tk = use_tk
+        self.series = []
+        self.root = None
+
+        settings = bench_ui.fake_settings()
+        self.clock = bench_ui.FakeClock(ff_us=300 * core.US_PER_DAY)
+        canvases = (None, None)
+        if use_tk:
+            import tkinter as tk
+            self.root = tk.Tk()
+            self.root.withdraw()
+            canvases = tuple(tk.Canvas(self.root, width=bench_ui.CANVAS_SIZE[0], height=bench_ui.CANVAS_SIZE[1])
+                             for _ in range(2))
+        self.clock_display = bench_ui.make_clock_display(settings, self.clock, canvases[0])
+        self.ff_display = bench_ui.make_ff_display(settings, self.clock, canvases[1])
+
+    def sample(self, tick, baseline):
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot()
+        top = snapshot.compare_to(baseline, "lineno")[:3]
+        return {
+            "sim_days": round(tick / core.TOTAL_UNITS, 3),
+            "ticks": tick,
+            "rss_kb": rss_kb(),
+            "max_item_id": max(max_item_id(self.clock_display.canvas), max_item_id(self.ff_display.canvas)),
+            "objects": len(gc.get_objects()),
+            "traced_kb": tracemalloc.get_traced_memory()[0] // 1024,
+            "top_growth": [f"{s.traceback[0].filename.rsplit(os.sep, 1)[-1]}:{s.traceback[0].lineno} "
+                           f"{s.size_diff // 1024:+d} KB" for s in top if s.size_diff > 0],
+        }
+
+    def run(self):
+        ticks = self.days * core.TOTAL_UNITS
+        every = max(ticks // self.samples, 1)
+        tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+        t0 = time.perf_counter()
+        # SettingsManager / Fehlermeldungen per print() nicht mitmessen
+        with contextlib.redirect_stdout(io.StringIO()):
+            for tick in range(1, ticks + 1):
+                v16 = tick % core.TOTAL_UNITS
+                self.clock.day_ms = -(-v16 * core.MS_PER_DAY // core.TOTAL_UNITS)
+                self.clock.ff_us += core.US_PER_DAY // core.TOTAL_UNITS
+                self.clock_display.update_loop()
+                self.ff_display.update_loop()
+                if tick % every == 0:
+                    self.series.append(self.sample(tick, baseline))
+                    if self.root: self.root.update_idletasks()
+        elapsed = time.perf_counter() - t0
+        tracemalloc.stop()
+        if self.root: self.root.destroy()
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        growth = {key: check_growth([s[key] for s in self.series], *TOLERANCE[key]) for key in TOLERANCE}
+        return {
+            "days": self.days,
+            "canvas": "tk" if self.use_tk else "fake",
+            "elapsed_s": round(elapsed, 1),
+            "us_per_tick": round(elapsed / max(self.days * core.TOTAL_UNITS, 1) * 1e6, 2),
+            "growth": growth,
+            "ok": all(g["bounded"] for g in growth.values()),
+            "series": self.series,
+        }
+
+
+def check_growth(values, rel_tol, abs_tol):
+    """
+    Nach der Aufwärmphase: Maximum der zweiten Hälfte gegen Maximum der ersten Hälfte.
+    Was ohne Grenze wächst, liegt in der zweiten Hälfte deutlich höher.
+    """
+    values = [v for v in values if v is not None]
+    start = int(len(values) * WARMUP)
+    window = values[start:]
+    if len(window) < 4:
+        return {"bounded": True, "note": "zu wenige Samples"}
+    half = len(window) // 2
+    first, second = max(window[:half]), max(window[half:])
+    limit = first * (1 + rel_tol) + abs_tol
+    return {"bounded": second <= limit, "first_half_max": first, "second_half_max": second,
+            "limit": round(limit, 1)}
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Soak-Test der Uhren über simulierte Tage")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--samples", type=int, default=56)
+    parser.add_argument("--tk", action="store_true", help="echte Tk-Canvas statt FakeCanvas (braucht Display)")
+    parser.add_argument("--out", default=None, help="Zeitreihe als JSON-Datei")
+    args = parser.parse_args(argv)
+
+    result = SoakRun(args.days, args.samples, args.tk).run()
+    text = json.dumps(result, indent=4)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    print(json.dumps({"ok": result["ok"], "growth": result["growth"]}), file=sys.stderr)
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
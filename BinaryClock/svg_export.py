@@ -0,0 +1,147 @@
+# Datei: svg_export.py
+"""
+Vektor-Export eines Profils als SVG (ohne Tk).
+
+Jede Spiegel-Variante des Nibble-Designs wird pro Bit-Gruppe genau einmal als <symbol>
+definiert (ohne Farbe). Darauf aufbauend gibt es pro Variante, Paletten-Nibble und Zustand
+(0-F) ein eingefärbtes Nibble-Symbol. Ein Frame besteht danach nur noch aus einem <use>
+pro Nibble - ein ganzer Tag bleibt klein und wird direkt in die Datei gestreamt.
+
+Ganzer Bereich: alle Frames liegen als <g id="f_XXXX"> in einem Dokument, angezeigt wird
+der per URL-Fragment gewählte (clock.svg#f_8000).
+"""
+import core
+import depth_engine
+import render_plan
+
+SVG_GEOMETRY = render_plan.CLOCK_GEOMETRY
+PADDING = 10
+VARIANTS = {(False, False): "n", (True, False): "x", (False, True): "y", (True, True): "xy"}
+
+
+def _variant(placement):
+    mirror = placement.get("mirror", {})
+    return mirror.get("x", False), mirror.get("y", False)
+
+
+def block_entries(placements, px, py, geometry, shift=0, palette_nibble=None, grid_offset=(0, 0)):
+    """Placements -> [(x, y, variant, bit_shift, palette_nibble), ...] wie render_plan.compile_block."""
+    step = 4 * geometry.cell + 3 * geometry.gap + geometry.nibble_gap
+    entries = []
+    for p in placements:
+        x = px + (p["position"]["x"] - grid_offset[0]) * step
+        y = py + (p["position"]["y"] - grid_offset[1]) * step
+        nibble_id = p["nibbleId"]
+        entries.append((x, y, _variant(p), shift + nibble_id * 4,
+                        nibble_id if palette_nibble is None else palette_nibble))
+    return entries
+
+
+class SvgProfile:
+    """
+    mode "v16": das Layout des Profils (16 Bit, lokale Zeit).
+    mode "ff":  32 Bit wie FFClockDisplay (oben Tage mit Palette von Nibble 0, unten Zeit).
+    mode "ff_coherent": 32 Bit als ein generiertes Layout (siehe depth_engine).
+    """
+
+    def __init__(self, data, profile=None, mode="v16", geometry=SVG_GEOMETRY, padding=PADDING, bg=core.BG_COLOR):
+        # "ff" wie FFClockDisplay (render_plan.compile_ff_plan): kurze Paletten bleiben, wie sie sind
+        self.grid_design, placements, self.palette = core.resolve_profile(data, profile, pad_palette=(mode != "ff"))
+        self.geometry = geometry
+        self.bg = bg
+        self.mode = mode
+
+        nibble_px = 4 * geometry.cell + 3 * geometry.gap
+        if mode == "ff_coherent":
+            placements = depth_engine.generate_layout(8)
+            self.palette = depth_engine.generate_palette(self.palette, 8)
+            self.entries = block_entries(placements, padding, padding, geometry)
+            self.bits = 32
+        else:
+            min_x, max_x, min_y, max_y = core.get_layout_bounds(placements)
+            offset = (min_x, min_y)
+            if mode == "ff":
+                block_h = (max_y - min_y + 1) * nibble_px + (max_y - min_y) * geometry.nibble_gap
+                self.entries = block_entries(placements, padding, padding, geometry, 16, 0, offset)
+                self.entries += block_entries(placements, padding, padding + block_h + geometry.nibble_gap,
+                                              geometry, 0, None, offset)
+                self.bits = 32
+            elif mode == "v16":
+                self.entries = block_entries(placements, padding, padding, geometry, 0, None, offset)
+                self.bits = 16
+            else:
+                raise ValueError(f"Unbekannter Modus: {mode}")
+
+        if self.entries:
+            self.width = max(e[0] for e in self.entries) + nibble_px + padding
+            self.height = max(e[1] for e in self.entries) + nibble_px + padding
+        else:
+            self.width = self.height = 2 * padding
+
+    # --- DEFINITIONEN ---
+
+    def defs(self):
+        g = self.geometry
+        used = sorted({e[2] for e in self.entries})
+        out = ["<defs>"]
+        # 1. Pro Variante und Bit-Gruppe die Form (Zellen, Brücken, Ecken), ohne Farbe
+        for variant in used:
+            grid = core.transform_grid(self.grid_design, *variant) if any(variant) else self.grid_design
+            rects = render_plan.compile_nibble(0, 0, grid, 0, self.palette, g)
+            for gid in range(4):
+                body = "".join(f'<rect x="{r.x1}" y="{r.y1}" width="{r.x2 - r.x1}" height="{r.y2 - r.y1}"/>'
+                               for r in rects if r.bit == gid)
+                out.append(f'<symbol id="{VARIANTS[variant]}g{gid}" overflow="visible">{body}</symbol>')
+        # 2. Eingefärbte Nibble-Zustände (Zustand 0 = leer, braucht kein Symbol)
+        for variant, palette_nibble in sorted({(e[2], e[4]) for e in self.entries}):
+            name = VARIANTS[variant]
+            colors = [self._color(palette_nibble * 4 + gid) for gid in range(4)]
+            for state in range(1, 16):
+                body = "".join(f'<use href="#{name}g{gid}" fill="{colors[gid]}"/>'
+                               for gid in range(4) if (state >> gid) & 1)
+                out.append(f'<symbol id="{name}p{palette_nibble}s{state:X}" overflow="visible">{body}</symbol>')
+        out.append("</defs>")
+        return "".join(out)
+
+    def _color(self, index):
+        try:
+            return self.palette[index]
+        except IndexError:
+            return core.ERROR_COLOR
+
+    # --- FRAMES ---
+
+    def frame_body(self, value):
+        parts = []
+        for x, y, variant, shift, palette_nibble in self.entries:
+            state = (value >> shift) & 0xF
+            if state:
+                parts.append(f'<use href="#{VARIANTS[variant]}p{palette_nibble}s{state:X}" x="{x}" y="{y}"/>')
+        return "".join(parts)
+
+    def header(self, style=""):
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+                f'viewBox="0 0 {self.width} {self.height}" shape-rendering="crispEdges">{style}'
+                f'<rect width="100%" height="100%" fill="{self.bg}"/>')
+
+    def single(self, value):
+        """Ein Wert als eigenständiges SVG."""
+        return self.header() + self.defs() + self.frame_body(value) + "</svg>\n"
+
+    def write_range(self, out, values):
+        """Alle Werte in ein Dokument streamen (out: Text-Datei). Rückgabe: Anzahl Frames."""
+        digits = self.bits // 4
+        style = "<style>.f{display:none}.f:target{display:inline}</style>"
+        out.write(self.header(style))
+        out.write(self.defs())
+        count = 0
+        batch = []
+        for value in values:
+            batch.append(f'<g id="f_{value:0{digits}X}" class="f">{self.frame_body(value)}</g>\n')
+            count += 1
+            if len(batch) >= 1024:
+                out.write("".join(batch))
+                batch.clear()
+        out.write("".join(batch))
+        out.write("</svg>\n")
+        return count
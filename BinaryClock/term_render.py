@@ -0,0 +1,135 @@
+# Datei: term_render.py
+"""
+ANSI Terminal-Renderer (SSH / tmux, ohne Tk).
+
+Zeichnet die Nibble-Designs des Profils (inkl. Spiegelungen aus dem Layout) mit Unicode
+Halbblöcken: ein Zeichen "▀" = zwei Pixel übereinander (Vordergrund oben, Hintergrund unten),
+Farben als 24-Bit ANSI. Pro Tick werden nur die Zeichen neu geschrieben, deren Pixel sich
+geändert haben (Cursor-Adressierung), zwischen den Ticks schläft der Prozess.
+"""
+import sys
+import time
+from datetime import datetime, timezone
+
+import core
+import render_plan
+
+TERM_GEOMETRY = render_plan.Geometry(cell=2, gap=1, nibble_gap=2)
+HALF_BLOCK = "▀".encode("utf-8")
+
+CSI = b"\x1b["
+HIDE_CURSOR = CSI + b"?25l"
+SHOW_CURSOR = CSI + b"?25h"
+CLEAR = CSI + b"2J"
+RESET = CSI + b"0m"
+
+
+def hex_to_rgb(color_hex):
+    color_hex = color_hex.lstrip("#")
+    try:
+        return tuple(int(color_hex[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return 255, 0, 0
+
+
+class TerminalRenderer:
+    def __init__(self, data, profile=None, geometry=TERM_GEOMETRY, origin=(1, 1)):
+        plan = render_plan.compile_compact_plan(data, geometry, profile)
+        self.pixmap = render_plan.PixelMap(plan)
+        self.cols = self.pixmap.width
+        self.rows = (self.pixmap.height + 1) // 2
+        self.origin = origin  # (Zeile, Spalte) im Terminal, 1-basiert
+
+        self.value = None
+        self.screen = [None] * (self.cols * self.rows)    # was gerade im Terminal steht: (oben, unten)
+        self._rgb = {}
+        self._fg = b""
+
+        self.ticks = 0
+        self.bytes_written = 0
+
+    def _color_seq(self, color, layer):
+        key = (color, layer)
+        seq = self._rgb.get(key)
+        if seq is None:
+            r, g, b = hex_to_rgb(color)
+            seq = self._rgb[key] = CSI + b"%d;2;%d;%d;%dm" % (layer, r, g, b)
+        return seq
+
+    def frame(self, value):
+        """Escape-Sequenzen, die das Terminal von self.value auf `value` bringen."""
+        pm = self.pixmap
+        if self.value is None:
+            cells = range(self.cols * self.rows)
+        else:
+            cells = sorted({(i // pm.width // 2) * self.cols + (i % pm.width)
+                            for i in pm.changed_pixels(self.value, value)})
+        self.value = value
+
+        out = []
+        cursor = None
+        last_fg = last_bg = None
+        oy, ox = self.origin
+        for cell in cells:
+            row, col = divmod(cell, self.cols)
+            top_index = row * 2 * pm.width + col
+            top = pm.color_at(top_index, value)
+            bottom = pm.color_at(top_index + pm.width, value) if row * 2 + 1 < pm.height else pm.bg
+            if self.screen[cell] == (top, bottom): continue
+            self.screen[cell] = (top, bottom)
+
+            if cursor != cell:
+                out.append(CSI + b"%d;%dH" % (oy + row, ox + col))
+            if top != last_fg:
+                out.append(self._color_seq(top, 38))
+                last_fg = top
+            if bottom != last_bg:
+                out.append(self._color_seq(bottom, 48))
+                last_bg = bottom
+            out.append(HALF_BLOCK)
+            # Cursor steht jetzt rechts daneben (nur innerhalb derselben Zeile weiterverwenden)
+            cursor = cell + 1 if col + 1 < self.cols else None
+
+        if out: out.append(RESET)
+        data = b"".join(out)
+        self.ticks += 1
+        self.bytes_written += len(data)
+        return data
+
+    def run(self, out=None, use_ff=False):
+        """Live-Schleife: zeichnen, bis zur nächsten Tick-Grenze schlafen."""
+        out = out or sys.stdout.buffer
+        out.write(HIDE_CURSOR + CLEAR)
+        cpu0, wall0 = time.process_time(), time.monotonic()
+        try:
+            while True:
+                if use_ff:
+                    # F.F zählt auf eigenen (UTC) Grenzen - nicht bis zur nächsten v16-Grenze schlafen
+                    now = datetime.now(timezone.utc)
+                    value = core.get_ff_value(now) & 0xFFFF
+                    delay_s = core.us_until_next_ff_tick(now) / 1e6
+                else:
+                    ms_now = core.get_day_ms()
+                    value = core.v16_from_day_ms(ms_now)
+                    delay_s = core.ms_until_next_tick(ms_now, minimum=1) / 1000
+                out.write(self.frame(value))
+                out.flush()
+                time.sleep(delay_s)
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass
+        finally:
+            # Terminal zurücksetzen - andere Fehler laufen danach weiter nach oben
+            try:
+                out.write(RESET + SHOW_CURSOR + CSI + b"%d;1H\n" % (self.origin[0] + self.rows))
+                out.flush()
+            except BrokenPipeError:
+                pass
+        return self.stats(time.process_time() - cpu0, time.monotonic() - wall0)
+
+    def stats(self, cpu_s, wall_s):
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "bytes_per_tick": round(self.bytes_written / ticks, 1),
+            "cpu_s_per_hour": round(cpu_s / wall_s * 3600, 3) if wall_s else 0.0,
+        }
@@ -0,0 +1,121 @@
+# Datei: timezones.py
+"""
+Vorberechnete UTC-Offsets pro Zeitzone (ohne Tk).
+
+Statt pro Tick astimezone() aufzurufen, werden die Offsets inklusive der kommenden
+Sommerzeit-Wechsel einmal vorberechnet. offset_at() schiebt nur einen Index weiter.
+"""
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+HORIZON_DAYS = 400
+SCAN_STEP_S = 3600  # Wechsel liegen (praktisch) nie näher als eine Stunde beieinander
+
+
+def _offset_s(tz, ts):
+    return int(datetime.fromtimestamp(ts, tz).utcoffset().total_seconds())
+
+
+class OffsetSchedule:
+    def __init__(self, tz, start_ts=None, horizon_days=HORIZON_DAYS):
+        """tz: tzinfo (z.B. zoneinfo.ZoneInfo("Europe/Berlin")), None = lokale Zone, oder Offset in Sekunden."""
+        self.tz = tz
+        self.horizon_days = horizon_days
+        self.build(datetime.now(timezone.utc).timestamp() if start_ts is None else start_ts)
+
+    def build(self, start_ts):
+        """Offsets ab start_ts für horizon_days vorberechnen -> Wechselzeitpunkte (UTC Sekunden)."""
+        start_ts = int(start_ts)
+        self.valid_until = start_ts + self.horizon_days * 86400
+
+        if isinstance(self.tz, int):
+            self.starts, self.offsets = [start_ts], [self.tz]
+            self.valid_until = float("inf")
+            self.index = 0
+            return
+
+        tz = self.tz
+        if tz is None:
+            # Lokale Zone: über das System auflösen
+            def offset(ts):
+                return int(datetime.fromtimestamp(ts).astimezone().utcoffset().total_seconds())
+        else:
+            def offset(ts):
+                return _offset_s(tz, ts)
+
+        starts, offsets = [start_ts], [offset(start_ts)]
+        ts = start_ts
+        while ts < self.valid_until:
+            nxt = ts + SCAN_STEP_S
+            if offset(nxt) != offsets[-1]:
+                # Wechsel sekundengenau per Bisektion finden
+                lo, hi = ts, nxt
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if offset(mid) == offsets[-1]: lo = mid
+                    else: hi = mid
+                starts.append(hi)
+                offsets.append(offset(hi))
+            ts = nxt
+
+        self.starts, self.offsets = starts, offsets
+        self.index = 0
+
+    def offset_at(self, ts):
+        """UTC-Offset in Sekunden für den Zeitpunkt ts (UTC Sekunden). Amortisiert O(1)."""
+        if ts >= self.valid_until or ts < self.starts[0]:
+            self.build(ts)
+        i = self.index
+        starts = self.starts
+        if ts < starts[i] or (i + 1 < len(starts) and ts >= starts[i + 1]):
+            i = bisect_right(starts, ts) - 1
+            self.index = i
+        return self.offsets[i]
+
+    def transitions(self):
+        """[(datetime UTC, Offset-Sekunden), ...] - zur Kontrolle / Anzeige."""
+        return [(datetime.fromtimestamp(s, timezone.utc), o) for s, o in zip(self.starts, self.offsets)]
+
+
+MAX_OFFSET_S = 14 * 3600  # UTC-12 .. UTC+14 gibt es, mehr nicht
+
+
+def _parse_offset(text):
+    """'+5', '+5:30', '-03', '+0530' -> Offset-Sekunden. ValueError außerhalb ±14 h."""
+    sign = -1 if text[0] == "-" else 1
+    hours, colon, minutes = text[1:].partition(":")
+    if not colon and len(hours) > 2:
+        hours, minutes = hours[:-2], hours[-2:]  # HHMM / HMM
+    if not hours.isdigit() or (minutes and not minutes.isdigit()) or len(minutes) > 2:
+        raise ValueError(f"Ungültiger Offset: {text!r}")
+    if int(minutes or 0) >= 60:
+        raise ValueError(f"Ungültige Minuten: {text!r}")
+    offset = int(hours) * 3600 + int(minutes or 0) * 60
+    if offset > MAX_OFFSET_S:
+        raise ValueError(f"Offset außerhalb ±14 h: {text!r}")
+    return sign * offset
+
+
+def parse_zone(name):
+    """'UTC+05:30' / '+0100' / 'UTC+5' -> Offset-Sekunden, 'local' -> None, sonst zoneinfo.ZoneInfo."""
+    if name.lower() == "local":
+        return None
+    text = name.upper().replace("UTC", "")
+    if text[:1] in "+-" and text[1:].replace(":", "").isdigit():
+        return _parse_offset(text)
+    if text == "":
+        return 0
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(name)
+
+
+def local_label(offset_s):
+    sign = "+" if offset_s >= 0 else "-"
+    offset_s = abs(offset_s)
+    return f"UTC{sign}{offset_s // 3600:02d}:{offset_s % 3600 // 60:02d}"
+
+
+def utc_ms_now():
+    delta = datetime.now(timezone.utc) - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
@@ -0,0 +1,142 @@
+# Datei: tracing.py
+"""
+Opt-in Tracing der UI-Callbacks im Chrome Trace Event Format (ohne Tk).
+
+install() legt dünne Wrapper um die Methoden in TARGETS. Solange kein Trace läuft, kostet
+ein Aufruf nur eine zusätzliche Funktionsebene und einen Flag-Test. start(path) schreibt
+jeden Aufruf als "X"-Event (Name, Start, Dauer) - formatiert und geschrieben wird in einem
+Hintergrund-Thread, der UI-Thread legt nur ein Tupel in eine Queue.
+
+Aktivieren: Umgebungsvariable BINCLOCK_TRACE=pfad.json oder Hotkey F4 (main.py).
+Öffnen: chrome://tracing, https://ui.perfetto.dev
+"""
+import functools
+import importlib
+import json
+import os
+import queue
+import threading
+import time
+
+TRACE_FILENAME = "binClockTrace.json"
+WRITE_BUFFER = 1 << 16
+
+# (Modul, Klasse, Methode) - Kategorie = Modul
+TARGETS = [
+    ("ui_clock_display", "ClockDisplay", "update_loop"),
+    ("ui_clock_display", "ClockDisplay", "render_clock"),
+    ("ui_clock_display", "ClockDisplay", "force_redraw"),
+    ("ui_ff_clock", "FFClockDisplay", "update_loop"),
+    ("ui_ff_clock", "FFClockDisplay", "render_clock"),
+    ("ui_nibble_editor", "NibbleEditor", "redraw_canvas"),
+    ("ui_layout_editor", "LayoutEditor", "redraw_canvas"),
+    ("ui_mini_grid", "MiniGridSelector", "redraw_all_slots"),
+    ("ui_profile_editor", "ProfileEditor", "refresh_selection"),
+    ("ui_profile_editor", "ProfileEditor", "update_previews"),
+    ("settings_manager", "SettingsManager", "save_settings"),
+    ("settings_manager", "SettingsManager", "load_settings"),
+]
+# MainApp (Tab-Wechsel, Profil-Hotkeys) registriert main.py selbst über install_class,
+# da main beim Start als __main__ läuft und nicht importiert werden soll.
+
+
+class TraceWriter:
+    """Hintergrund-Thread: Events aus der Queue -> gepufferte JSON-Datei."""
+
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.events = 0
+        self.pid = os.getpid()
+        self.file = open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER)
+        self.file.write("[\n")
+        self.thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, event):
+        self.queue.put(event)
+
+    def _run(self):
+        f = self.file
+        first = True
+        while True:
+            event = self.queue.get()
+            if event is None: break
+            name, cat, ts, dur, tid = event
+            record = json.dumps({"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur,
+                                 "pid": self.pid, "tid": tid}, separators=(",", ":"))
+            f.write(record if first else ",\n" + record)
+            first = False
+            self.events += 1
+        f.write("\n]\n")
+        f.close()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+class Tracer:
+    def __init__(self):
+        self.writer = None
+        self.installed = []
+
+    @property
+    def active(self):
+        return self.writer is not None
+
+    def start(self, path):
+        if self.writer is None:
+            self.writer = TraceWriter(path)
+        return self.writer.path
+
+    def stop(self):
+        """Trace beenden, Rückgabe: Anzahl geschriebener Events."""
+        writer, self.writer = self.writer, None
+        if writer is None: return 0
+        writer.close()
+        return writer.events
+
+    def wrap(self, func, name, cat):
+        tracer = self
+        perf_ns = time.perf_counter_ns
+        get_ident = threading.get_ident
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            writer = tracer.writer
+            if writer is None:
+                return func(*args, **kwargs)
+            t0 = perf_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                t1 = perf_ns()
+                writer.put((name, cat, t0 // 1000, (t1 - t0) // 1000, get_ident()))
+
+        traced.__traced__ = func
+        return traced
+
+    def install(self, targets=TARGETS):
+        """Wrapper einsetzen (einmalig, vor dem Erzeugen der Widgets - gebundene Callbacks bleiben sonst alt)."""
+        for module_name, class_name, method_name in targets:
+            try:
+                cls = getattr(importlib.import_module(module_name), class_name)
+            except (ImportError, AttributeError):
+                continue
+            self.install_class(cls, (method_name,), module_name)
+
+    def install_class(self, cls, method_names, cat):
+        for method_name in method_names:
+            func = cls.__dict__.get(method_name)
+            if func is None or hasattr(func, "__traced__"): continue
+            setattr(cls, method_name, self.wrap(func, f"{cls.__name__}.{method_name}", cat))
+            self.installed.append((cls, method_name, func))
+
+    def uninstall(self):
+        for cls, method_name, func in self.installed:
+            setattr(cls, method_name, func)
+        self.installed.clear()
+
+
+TRACER = Tracer()
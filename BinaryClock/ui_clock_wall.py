@@ -0,0 +1,117 @@
+# Datei: ui_clock_wall.py
+import sys
+import tkinter as tk
+
+import core
+import render_plan
+import timezones
+from ui_shared import BG_COLOR
+from ui_plan_view import PlanItems
+
+# --- KONFIGURATION ---
+TILE_GAP = 40
+LABEL_HEIGHT = 36
+
+
+class ClockWall(tk.Frame):
+    """
+    Mehrere v16-Uhren (eine pro Zeitzone) auf EINEM Canvas mit EINEM Timer.
+
+    Alle Uhren teilen sich einen kompilierten Render-Plan; jede Uhr hat nur ihre eigenen
+    Canvas-Items und schaltet pro Tick die Items der geänderten Bits um. Die UTC-Offsets
+    (inkl. Sommerzeit-Wechsel) sind vorberechnet, pro Tick gibt es kein astimezone().
+    """
+
+    def __init__(self, parent, settings_manager, zones, columns=4):
+        super().__init__(parent, bg=BG_COLOR)
+        self.settings_manager = settings_manager
+        self.columns = max(1, columns)
+
+        # zones: [(Name, Zone), ...] - Zone z.B. "Europe/Berlin", "UTC+05:30", "local"
+        self.names = [name for name, _ in zones]
+        self.schedules = [timezones.OffsetSchedule(timezones.parse_zone(spec)) for _, spec in zones]
+
+        self.running = False
+        self.canvas = tk.Canvas(self, bg=BG_COLOR, highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        self.plan = None
+        self.plan_key = None
+        self.clock_items = []
+        self.label_items = []
+        self.values = []
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.update_loop()
+
+    def stop(self):
+        self.running = False
+
+    def rebuild(self):
+        """Plan neu kompilieren und Items anlegen (nur wenn sich Profil-Daten ändern)."""
+        self.canvas.delete("all")
+        self.plan = render_plan.compile_compact_plan(self.settings_manager.data, render_plan.CLOCK_GEOMETRY)
+        _, _, plan_w, plan_h = self.plan.bounds()
+
+        self.clock_items, self.label_items, self.values = [], [], []
+        for i, name in enumerate(self.names):
+            row, col = divmod(i, self.columns)
+            tx = TILE_GAP + col * (plan_w + TILE_GAP)
+            ty = TILE_GAP + row * (plan_h + LABEL_HEIGHT + TILE_GAP)
+            self.clock_items.append(PlanItems(self.canvas, self.plan, tx, ty, tags=(f"wall_{i}",)))
+            self.label_items.append(self.canvas.create_text(tx + plan_w // 2, ty + plan_h + LABEL_HEIGHT // 2,
+                                                            text=name, fill="#555555", font=("Consolas", 10)))
+            self.values.append(None)
+
+        cols = min(self.columns, len(self.names))
+        rows = (len(self.names) + self.columns - 1) // self.columns
+        self.canvas.config(width=TILE_GAP + cols * (plan_w + TILE_GAP),
+                           height=TILE_GAP + rows * (plan_h + LABEL_HEIGHT + TILE_GAP))
+
+    def update_loop(self):
+        if not self.running: return
+
+        key = render_plan.plan_key(self.settings_manager.data, 0, 0)
+        if key != self.plan_key:
+            self.plan_key = key
+            self.rebuild()
+
+        # Eine Zeitabfrage für alle Uhren
+        utc_ms = timezones.utc_ms_now()
+        utc_s = utc_ms // 1000
+        delay = None
+        for i, schedule in enumerate(self.schedules):
+            offset_s = schedule.offset_at(utc_s)
+            ms_local = (utc_ms + offset_s * 1000) % core.MS_PER_DAY
+            v16 = core.v16_from_day_ms(ms_local)
+
+            # Nur Uhren mit neuem Wert anfassen - und dort nur die geänderten Bits
+            if v16 != self.values[i]:
+                self.values[i] = v16
+                self.clock_items[i].show(v16)
+                self.canvas.itemconfigure(self.label_items[i],
+                                          text=f"{self.names[i]}  0x{v16:04X}  {timezones.local_label(offset_s)}")
+
+            wait = core.ms_until_next_tick(ms_local, minimum=1)
+            if delay is None or wait < delay: delay = wait
+
+        self.after(delay if delay is not None else 1000, self.update_loop)
+
+
+if __name__ == "__main__":
+    # python ui_clock_wall.py Berlin=Europe/Berlin NYC=America/New_York Tokyo=Asia/Tokyo ...
+    from settings_manager import SettingsManager
+
+    args = sys.argv[1:] or ["Local=local", "UTC=UTC", "Berlin=Europe/Berlin", "New York=America/New_York",
+                            "Tokyo=Asia/Tokyo", "Mumbai=Asia/Kolkata"]
+    zones = [tuple(a.split("=", 1)) if "=" in a else (a, a) for a in args]
+
+    root = tk.Tk()
+    root.title("Binary Clock Wall")
+    root.configure(bg=BG_COLOR)
+    wall = ClockWall(root, SettingsManager(), zones)
+    wall.pack(fill=tk.BOTH, expand=True)
+    wall.start()
+    root.mainloop()
@@ -1,15 +1,11 @@
 import tkinter as tk
-from datetime import datetime, timezone
 from ui_shared import BG_COLOR
+import core
+import render_plan
+import depth_engine
+from ui_plan_view import PlanItems, SpriteItems, plan_for_mode
+from core import EPOCH_DATE
 
-# --- KONFIGURATION ---
-CELL_SIZE = 20
-GAP_SIZE = 4
-NIBBLE_GAP = 30
-STACK_GAP = NIBBLE_GAP
-
-# Epoch: 27.01.2026 UTC
-EPOCH_DATE = datetime(2026, 1, 27, 0, 0, 0, tzinfo=timezone.utc)
 
 class FFClockDisplay(tk.Frame):
     def __init__(self, parent, settings_manager):
@@ -17,12 +13,29 @@ class FFClockDisplay(tk.Frame):
         self.settings_manager = settings_manager
 
         self.running = False
+        # Optional: AlarmEngine, wird pro Update mitgetickt (siehe main.py)
+        self.alarm_engine = None
+        # Optional: metrics.RenderStats (Hotkey F3, siehe main.py) - None = keine Messung
+        self.stats = None
+        # Optional: frame_budget.FrameBudget (Hotkey F5, siehe main.py und ClockDisplay), None = aus
+        self.budget = None
+        # PNG-Bytes -> Bild für den Sprite-Modus (None = tk.PhotoImage)
+        self.image_factory = None
+
+        # Render-Plan Cache (siehe render_plan.py)
+        self._plan = None
+        self._plan_key = None
+        self._mode_plan = (None, None, None, None)
+        self._items = None
+        # False: zwei gestapelte 16-Bit Blöcke (klassisch), True: EIN generiertes 32-Bit Layout
+        self.coherent = False
         self.canvas = tk.Canvas(self, bg=BG_COLOR, highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
 
         # Info Label (angepasst für mehr Infos)
         self.debug_label = tk.Label(self, text="", bg=BG_COLOR, fg="#666666", font=("Consolas", 10))
         self.debug_label.pack(side=tk.BOTTOM, pady=10)
+        self.debug_label.bind("<Button-1>", self.toggle_coherent)
 
     def start(self):
         if not self.running:
@@ -34,179 +47,87 @@ class FFClockDisplay(tk.Frame):
 
     def get_ff_value(self):
         """
-        Berechnet den F.F Wert rein in UTC.
+        Berechnet den F.F Wert rein in UTC (seit EPOCH_DATE, siehe core.get_ff_value).
         """
-        # 1. Aktuelle Zeit in UTC (für die Berechnung)
-        utc_now = datetime.now(timezone.utc)
-
-        # Berechnung F.F Wert
-        delta = utc_now - EPOCH_DATE
-        total_seconds = delta.total_seconds()
-        raw_val = (total_seconds / 86400.0) * 65536.0
-
-        return int(raw_val)
+        return core.get_ff_value()
 
     def update_loop(self):
         if not self.running: return
+        stats = self.stats
+        budget = self.budget
+        if stats: stats.fired()
+        if budget: budget.fired()
 
-        # Werte holen
+        # Werte holen (immer der aktuelle - verspätete Frames überspringen Zwischenwerte)
         v32 = self.get_ff_value()
 
         # Zeichnen
-        self.render_clock(v32)
+        created = self.render_clock(v32)
+        if stats: stats.rendered(created, len(self.canvas.find_all()))
+        if budget: budget.rendered(v32 & 0xFFFFFFFF, 32)
 
         # Label Update mit Zeitzonen-Info
         # Zeigt: F.F Wert | (Statischer Hinweis auf UTC)
         display_val = v32 & 0xFFFFFFFF
-        self.debug_label.config(text=f"F.F: {display_val:08X} \n (caution: UTC)")
-
+        if stats:
+            self.debug_label.config(text=f"F.F: {display_val:08X} \n {stats.summary()}"
+                                         + (f"\n {budget.summary()}" if budget else ""))
+        elif budget and budget.level:
+            self.debug_label.config(text=f"F.F: {display_val:08X} \n (caution: UTC) [{budget.mode}]")
+        else:
+            self.debug_label.config(text=f"F.F: {display_val:08X} \n (caution: UTC)")
+
+        if self.alarm_engine: self.alarm_engine.poll()
+
+        if stats: stats.scheduled(50)
+        if budget: budget.scheduled(50)
         self.after(50, self.update_loop)
 
-    def get_layout_bounds(self, placements):
-        if not placements: return 0, 0, 0, 0
-        xs = [p["position"]["x"] for p in placements]
-        ys = [p["position"]["y"] for p in placements]
-        return min(xs), max(xs), min(ys), max(ys)
-
     def render_clock(self, v32):
-        self.canvas.delete("all")
-
         try:
-            active_id = self.settings_manager.data.get("active_profileId", 0)
-            if active_id >= len(self.settings_manager.data["profiles"]): active_id = 0
-            current_profile = self.settings_manager.data["profiles"][active_id]
-
-            nid = current_profile.get("nibbleGridId", 0)
-            lid = current_profile.get("layoutId", 0)
-            pid = current_profile.get("paletteId", 0)
-
-            design_cells = self.settings_manager.data["library"]["nibbleGrids"][nid]["cells"]
-            grid_design = self.list_to_grid(design_cells)
-            layout_placements = self.settings_manager.data["library"]["layoutGrids"][lid].get("placements", [])
-
-            palette_data = self.settings_manager.data["library"]["palettes"][pid]
-            palette_colors = palette_data.get("colors", ["#333333"] * 16)
-        except:
-            return
-
-        if not layout_placements: return
-
+            plan = self.get_render_plan()
+        except Exception:
+            return 0
+
+        # Oberer Block (Tage, Bits 16-31) und unterer Block (Zeit, Bits 0-15) stecken beide im Plan.
+        # Items bleiben bestehen (siehe ClockDisplay.render_clock), nur geänderte Bits werden umgeschaltet.
+        # Neuer Plan (Profil, Größe, coherent): Items sofort umstellen statt neu anlegen (ohne Gleiten,
+        # der F.F Loop läuft ohnehin alle 50 ms).
+        # Unter Last: günstigerer Plan bzw. Sprite-Modus (siehe ClockDisplay.render_clock).
+        mode, plan = self.get_mode_plan(plan)
+        sprite = mode == "sprite"
+        changed = 0
+        if self._items is None or isinstance(self._items, SpriteItems) != sprite or (
+                sprite and self._items.plan is not plan):
+            self.canvas.delete("all")
+            if sprite:
+                self._items = SpriteItems(self.canvas, plan, self.image_factory)
+            else:
+                self._items = PlanItems(self.canvas, plan, role_prefix="ff_")
+        elif self._items.plan is not plan:
+            cost = self._items.morph(plan).cost
+            changed = cost["created"] + cost["coords"] + cost["itemconfigure"]
+        return changed + self._items.show(v32 & 0xFFFFFFFF)
+
+    def get_mode_plan(self, plan):
+        mode = self.budget.mode if self.budget else "full"
+        if self._mode_plan[0] is not plan or self._mode_plan[1] != mode:
+            self._mode_plan = (plan, mode) + plan_for_mode(plan, mode)
+        return self._mode_plan[2:]
+
+    def toggle_coherent(self, event=None):
+        """Klick auf das Label: zwischen gestapelter und generierter 32-Bit Ansicht wechseln."""
+        self.coherent = not self.coherent
+        self._plan_key = None
+
+    def get_render_plan(self):
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
-
-        min_x, max_x, min_y, max_y = self.get_layout_bounds(layout_placements)
-        cols_used = max_x - min_x + 1
-        rows_used = max_y - min_y + 1
-
-        nibble_px = (4 * CELL_SIZE) + (3 * GAP_SIZE)
-        block_width = (cols_used * nibble_px) + ((cols_used - 1) * NIBBLE_GAP)
-        block_height = (rows_used * nibble_px) + ((rows_used - 1) * NIBBLE_GAP)
-        total_stack_height = (block_height * 2) + STACK_GAP
-
-        start_x = (w - block_width) // 2
-        start_y = (h - total_stack_height) // 2
-
-        # --- ZEICHNEN ---
-
-        # Oberer Block (Tage) -> Palette von Nibble 0 erzwingen (durch Mapping)
-        high_16 = (v32 >> 16) & 0xFFFF
-        self.draw_layout_block(start_x, start_y, high_16,
-                               layout_placements, grid_design, palette_colors,
-                               offset_grid_x=min_x, offset_grid_y=min_y,
-                               is_day_counter=True)
-
-        # Unterer Block (Zeit)
-        y_bot = start_y + block_height + STACK_GAP
-        low_16 = v32 & 0xFFFF
-        self.draw_layout_block(start_x, y_bot, low_16,
-                               layout_placements, grid_design, palette_colors,
-                               offset_grid_x=min_x, offset_grid_y=min_y,
-                               is_day_counter=False)
-
-    def draw_layout_block(self, px, py, val_16, placements, design, palette, offset_grid_x, offset_grid_y,
-                          is_day_counter=False):
-        nibble_px = (4 * CELL_SIZE) + (3 * GAP_SIZE)
-        step = nibble_px + NIBBLE_GAP
-
-        for p in placements:
-            nibble_id = p["nibbleId"]
-
-            # --- COLOR MAPPING ---
-            palette_nibble_id = nibble_id
-            if is_day_counter:
-                # Tageszähler nutzt immer Palette von Nibble 0 (LSB Time)
-                palette_nibble_id = 0
-
-            rel_grid_x = p["position"]["x"] - offset_grid_x
-            rel_grid_y = p["position"]["y"] - offset_grid_y
-            curr_x = px + rel_grid_x * step
-            curr_y = py + rel_grid_y * step
-
-            mx = p.get("mirror", {}).get("x", False)
-            my = p.get("mirror", {}).get("y", False)
-            curr_design = design
-            if mx or my: curr_design = self.transform_grid(design, mx, my)
-
-            shift = nibble_id * 4
-            nibble_val = (val_16 >> shift) & 0xF
-
-            self.draw_single_nibble(curr_x, curr_y, nibble_val, curr_design, palette_nibble_id, palette)
-
-    def draw_single_nibble(self, ox, oy, val, grid, nibble_id, palette):
-        def is_active(gid):
-            if gid is None or gid == -1: return False
-            return (val >> gid) & 1
-
-        def get_color(gid):
-            abs_bit_index = (nibble_id * 4) + gid
-            try:
-                return palette[abs_bit_index]
-            except:
-                return "#FF0000"
-
-        for r in range(4):
-            for c in range(4):
-                gid = grid[r][c]
-                if is_active(gid):
-                    x1 = ox + c * (CELL_SIZE + GAP_SIZE)
-                    y1 = oy + r * (CELL_SIZE + GAP_SIZE)
-                    self.canvas.create_rectangle(x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE, fill=get_color(gid),
-                                                 outline="")
-        for r in range(4):
-            for c in range(4):
-                gid = grid[r][c]
-                if not is_active(gid): continue
-                x1 = ox + c * (CELL_SIZE + GAP_SIZE)
-                y1 = oy + r * (CELL_SIZE + GAP_SIZE)
-                col = get_color(gid)
-                if c < 3 and grid[r][c + 1] == gid:
-                    self.canvas.create_rectangle(x1 + CELL_SIZE - 1, y1, x1 + CELL_SIZE + GAP_SIZE + 1, y1 + CELL_SIZE,
-                                                 fill=col, outline="")
-                if r < 3 and grid[r + 1][c] == gid:
-                    self.canvas.create_rectangle(x1, y1 + CELL_SIZE - 1, x1 + CELL_SIZE, y1 + CELL_SIZE + GAP_SIZE + 1,
-                                                 fill=col, outline="")
-        for r in range(3):
-            for c in range(3):
-                g1 = grid[r][c]
-                if g1 is not None and g1 == grid[r][c + 1] == grid[r + 1][c] == grid[r + 1][c + 1]:
-                    if is_active(g1):
-                        cx1 = ox + c * (CELL_SIZE + GAP_SIZE) + CELL_SIZE - 1
-                        cy1 = oy + r * (CELL_SIZE + GAP_SIZE) + CELL_SIZE - 1
-                        self.canvas.create_rectangle(cx1, cy1, cx1 + GAP_SIZE + 2, cy1 + GAP_SIZE + 2,
-                                                     fill=get_color(g1), outline="")
-
-    def list_to_grid(self, flat_list):
-        new_grid = [[None for _ in range(4)] for _ in range(4)]
-        for i, val in enumerate(flat_list):
-            r = i // 4
-            c = i % 4
-            if val != -1: new_grid[r][c] = val
-        return new_grid
-
-    def transform_grid(self, original_grid, mx, my):
-        new_grid = [row[:] for row in original_grid]
-        if mx:
-            for r in range(4): new_grid[r] = new_grid[r][::-1]
-        if my:
-            new_grid = new_grid[::-1]
-        return new_grid
\ No newline at end of file
+        key = (self.coherent, render_plan.plan_key(self.settings_manager.data, w, h))
+        if key != self._plan_key:
+            if self.coherent:
+                self._plan = depth_engine.compile_profile_depth_plan(self.settings_manager.data, 32, w, h)
+            else:
+                self._plan = render_plan.compile_ff_plan(self.settings_manager.data, w, h)
+            self._plan_key = key
+        return self._plan
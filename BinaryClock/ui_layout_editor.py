@@ -1,5 +1,7 @@
 import tkinter as tk
 from ui_shared import FlatButton, BG_COLOR, TEXT_COLOR, UI_FONT, UI_FONT_SMALL
+from ui_preview import LivePreview, working_profile
+from history import History
 
 # Layout-Zellen sind größer, damit man sieht, was drin ist
 CELL_SIZE = 60
@@ -30,6 +32,9 @@ class LayoutEditor(tk.Frame):
 
         self.current_token_id = 3
 
+        # Undo/Redo: Raster als gepackter int, ein Eintrag pro Klick / Clear
+        self.history = History(self.pack_grid, self.unpack_grid)
+
         # Mirror Variablen
         self.mirror_x_var = tk.BooleanVar(value=False)
         self.mirror_y_var = tk.BooleanVar(value=False)
@@ -54,6 +59,8 @@ class LayoutEditor(tk.Frame):
 
         FlatButton(top_row, text="Load", command=self.load_current_slot, bg="#444444", width=4).pack(side=tk.LEFT,
                                                                                                      padx=2)
+        FlatButton(top_row, text="Undo", command=self.undo, bg="#444444", width=4).pack(side=tk.LEFT, padx=(10, 2))
+        FlatButton(top_row, text="Redo", command=self.redo, bg="#444444", width=4).pack(side=tk.LEFT, padx=2)
         FlatButton(top_row, text="Save", command=self.save_current_slot, bg="#44AA44", width=4).pack(side=tk.RIGHT,
                                                                                                      padx=2)
         FlatButton(top_row, text="Clear", command=self.clear_grid, bg="#AA4444", width=4).pack(side=tk.RIGHT,
@@ -107,6 +114,11 @@ class LayoutEditor(tk.Frame):
         self.info_label = tk.Label(sidebar, text="Ready.", bg=BG_COLOR, fg="#888888", font=UI_FONT_SMALL)
         self.info_label.pack(pady=20, anchor="w")
 
+        # Live-Vorschau: ungespeicherte Placements mit Design + Palette des aktiven Profils
+        self.preview = LivePreview(sidebar, lambda: working_profile(self.settings_manager.data,
+                                                                    placements=self.get_placements()))
+        self.preview.pack(side=tk.BOTTOM)
+
         self.update_ui_state()
 
     # --- LOGIK ---
@@ -123,9 +135,33 @@ class LayoutEditor(tk.Frame):
                 btn.set_active(False)
 
     def clear_grid(self):
+        self.history.begin()
         self.grid_data = [[None for _ in range(4)] for _ in range(4)]
+        self.history.end()
         self.redraw_canvas()
 
+    # --- UNDO / REDO ---
+
+    def pack_grid(self):
+        """16 Zellen à 5 Bit: belegt, Token-ID (2 Bit), mx, my - Zelle 0 in den untersten Bits."""
+        state = 0
+        for i, item in enumerate(item for row in self.grid_data for item in row):
+            if item is not None:
+                state |= (1 | item['id'] << 1 | item['mx'] << 3 | item['my'] << 4) << (5 * i)
+        return state
+
+    def unpack_grid(self, state):
+        for i in range(16):
+            v = (state >> (5 * i)) & 31
+            self.grid_data[i // 4][i % 4] = {'id': (v >> 1) & 3, 'mx': bool(v & 8), 'my': bool(v & 16)} if v & 1 else None
+        self.redraw_canvas()
+
+    def undo(self):
+        if self.history.undo(): self.info_label.config(text=f"Undo\n{self.history.summary()}")
+
+    def redo(self):
+        if self.history.redo(): self.info_label.config(text=f"Redo\n{self.history.summary()}")
+
     def on_canvas_click(self, event):
         grid_width = 4 * CELL_SIZE + 3 * GAP_SIZE
         offset_x = (CANVAS_SIZE - grid_width) // 2
@@ -136,6 +172,7 @@ class LayoutEditor(tk.Frame):
         row = ry // (CELL_SIZE + GAP_SIZE)
 
         if 0 <= col < 4 and 0 <= row < 4:
+            self.history.begin()
             # 1. Altes Vorkommen dieses Tokens löschen
             old_pos = None
             for r in range(4):
@@ -153,9 +190,11 @@ class LayoutEditor(tk.Frame):
                     'my': self.mirror_y_var.get()
                 }
 
+            self.history.end()
             self.redraw_canvas()
 
     def redraw_canvas(self):
+        self.preview.refresh()
         self.canvas.delete("all")
         grid_pixel_size = 4 * CELL_SIZE + 3 * GAP_SIZE
         off_x = (CANVAS_SIZE - grid_pixel_size) // 2
@@ -221,26 +260,31 @@ class LayoutEditor(tk.Frame):
                         'my': mirror.get("y", False)
                     }
 
+            self.history.clear()  # anderer Slot, andere Historie
             self.redraw_canvas()
             self.info_label.config(text=f"Loaded Slot {slot_id}")
         except Exception as e:
             print(e)
             self.info_label.config(text="Error loading")
 
+    def get_placements(self):
+        placements = []
+        for r in range(4):
+            for c in range(4):
+                item = self.grid_data[r][c]
+                if item is not None:
+                    obj = {
+                        "nibbleId": item['id'],
+                        "position": {"x": c, "y": r},
+                        "mirror": {"x": item['mx'], "y": item['my']}
+                    }
+                    placements.append(obj)
+        return placements
+
     def save_current_slot(self):
         try:
             slot_id = int(self.slot_spinner.get())
-            placements = []
-            for r in range(4):
-                for c in range(4):
-                    item = self.grid_data[r][c]
-                    if item is not None:
-                        obj = {
-                            "nibbleId": item['id'],
-                            "position": {"x": c, "y": r},
-                            "mirror": {"x": item['mx'], "y": item['my']}
-                        }
-                        placements.append(obj)
+            placements = self.get_placements()
 
             self.settings_manager.data["library"]["layoutGrids"][slot_id]["placements"] = placements
             self.settings_manager.save_settings()
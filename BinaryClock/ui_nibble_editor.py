@@ -1,6 +1,9 @@
 # Datei: ui_nibble_editor.py
 import tkinter as tk
 from ui_shared import FlatButton, BG_COLOR, GROUP_COLORS, TEXT_COLOR, UI_FONT, UI_FONT_SMALL
+from core import GROUP_LIMITS
+from ui_preview import LivePreview, working_profile
+from history import History
 
 # --- KONFIGURATION ---
 CELL_SIZE = 40
@@ -10,8 +13,10 @@ GAP_SIZE = 10
 # 4 Zellen + 3 Gaps + etwas Rand (2 * 20px)
 GRID_PIXEL_WIDTH = (4 * CELL_SIZE) + (3 * GAP_SIZE)
 CANVAS_SIZE = GRID_PIXEL_WIDTH + 40
+EMPTY_COLOR = "#2A2A2A"  # Leer (etwas heller als BG)
 
-GROUP_LIMITS = {0: 1, 1: 2, 2: 4, 3: 8}
+# Drag-Malen: Canvas und Buttons höchstens einmal pro Frame aktualisieren (~60 Hz)
+FRAME_MS = 16
 
 class NibbleEditor(tk.Frame):
     def __init__(self, parent, settings_manager):
@@ -22,9 +27,22 @@ class NibbleEditor(tk.Frame):
         self.grid_data = [[None for _ in range(4)] for _ in range(4)]
         self.current_group_id = 3
 
+        # Zellen pro Gruppe, inkrementell gepflegt (siehe set_cell)
+        self.group_counts = {gid: 0 for gid in GROUP_LIMITS}
+
         # Drag Logic
         self.drag_mode = None
         self.last_drag_cell = None
+        self.dirty_cells = set()      # seit dem letzten Frame geänderte Zellen
+        self._frame_pending = None    # after()-ID des nächsten Frames
+
+        # Canvas Items: einmal in redraw_canvas angelegt, danach nur umkonfiguriert
+        self.items = {}               # ("cell"|"h"|"v"|"corner", r, c) -> Item-ID
+        self.item_fill = {}           # Item-ID -> aktuelle Farbe (None = ausgeblendet)
+        self.button_text = {}
+
+        # Undo/Redo: Raster als gepackter int, ein Eintrag pro Drag / Reset
+        self.history = History(self.pack_grid, self.unpack_grid)
 
         # UI Vars
         self.bridge_gaps = tk.BooleanVar(value=True)
@@ -58,6 +76,10 @@ class NibbleEditor(tk.Frame):
 
         FlatButton(top_row, text="Load", command=self.load_current_slot,
                    bg="#444444", width=4).pack(side=tk.LEFT, padx=2)
+        FlatButton(top_row, text="Undo", command=self.undo,
+                   bg="#444444", width=4).pack(side=tk.LEFT, padx=(10, 2))
+        FlatButton(top_row, text="Redo", command=self.redo,
+                   bg="#444444", width=4).pack(side=tk.LEFT, padx=2)
 
         # Save / Reset (Rechtsbündig)
         FlatButton(top_row, text="Save", command=self.save_current_slot,
@@ -114,6 +136,11 @@ class NibbleEditor(tk.Frame):
                                    justify=tk.LEFT)
         self.info_label.pack(pady=10, anchor="w")
 
+        # Live-Vorschau: ungespeichertes Design mit Layout + Palette des aktiven Profils
+        self.preview = LivePreview(sidebar, lambda: working_profile(self.settings_manager.data,
+                                                                    grid_design=self.grid_data))
+        self.preview.pack(side=tk.BOTTOM, pady=10)
+
         self.update_ui_state()
 
     # --- LOGIK (Unverändert gut) ---
@@ -146,6 +173,8 @@ class NibbleEditor(tk.Frame):
             nibble_data = self.settings_manager.data["library"]["nibbleGrids"][slot_id]
             cells = nibble_data.get("cells", [-1] * 16)
             self.grid_data = self.list_to_grid(cells)
+            self.recount_groups()
+            self.history.clear()  # anderer Slot, andere Historie
             self.redraw_canvas()
             self.update_ui_state()
             self.info_label.config(text=f"Loaded {slot_id}")
@@ -166,12 +195,24 @@ class NibbleEditor(tk.Frame):
             print(e)
 
     def get_group_count(self, group_id):
-        count = 0
+        return self.group_counts[group_id]
+
+    def recount_groups(self):
+        """Nach dem Ersetzen von grid_data (Laden, Reset) einmal komplett zählen."""
+        self.group_counts = {gid: 0 for gid in GROUP_LIMITS}
         for row in self.grid_data:
             for cell in row:
-                if cell == group_id:
-                    count += 1
-        return count
+                if cell in self.group_counts: self.group_counts[cell] += 1
+
+    def set_cell(self, row, col, gid):
+        """Eine Zelle setzen, Zähler nachführen, Zelle für den nächsten Frame vormerken."""
+        old = self.grid_data[row][col]
+        if old == gid: return False
+        if old is not None: self.group_counts[old] -= 1
+        if gid is not None: self.group_counts[gid] += 1
+        self.grid_data[row][col] = gid
+        self.dirty_cells.add((row, col))
+        return True
 
     def select_tool(self, group_id):
         self.current_group_id = group_id
@@ -181,6 +222,10 @@ class NibbleEditor(tk.Frame):
         for gid, btn in self.group_buttons.items():
             count = self.get_group_count(gid)
             limit = GROUP_LIMITS[gid]
+            # Nur geänderte Buttons anfassen
+            state = (count, gid == self.current_group_id)
+            if self.button_text.get(gid) == state: continue
+            self.button_text[gid] = state
             btn.config(text=f"{gid} [{count}/{limit}]")
 
             # Button Feedback ohne Springen
@@ -190,10 +235,35 @@ class NibbleEditor(tk.Frame):
                 btn.set_active(False)
 
     def reset_grid(self):
+        self.history.begin()
         self.grid_data = [[None for _ in range(4)] for _ in range(4)]
+        self.recount_groups()
+        self.history.end()
         self.redraw_canvas()
         self.update_ui_state()
 
+    # --- UNDO / REDO ---
+
+    def pack_grid(self):
+        """16 Zellen à 3 Bit (0-3 = Gruppe, 4 = leer), Zelle 0 in den untersten Bits."""
+        state = 0
+        for i, cell in enumerate(cell for row in self.grid_data for cell in row):
+            state |= (4 if cell is None else cell) << (3 * i)
+        return state
+
+    def unpack_grid(self, state):
+        # Über set_cell: Zähler stimmen, nur geänderte Zellen werden im nächsten Frame neu gezeichnet
+        for i in range(16):
+            v = (state >> (3 * i)) & 7
+            self.set_cell(i // 4, i % 4, None if v == 4 else v)
+        self.flush_frame()
+
+    def undo(self):
+        if self.history.undo(): self.info_label.config(text=f"Undo\n{self.history.summary()}")
+
+    def redo(self):
+        if self.history.redo(): self.info_label.config(text=f"Redo\n{self.history.summary()}")
+
     def get_grid_pos(self, event):
         grid_width = 4 * CELL_SIZE + 3 * GAP_SIZE
         offset_x = (CANVAS_SIZE - grid_width) // 2
@@ -209,6 +279,7 @@ class NibbleEditor(tk.Frame):
     def on_mouse_down(self, event):
         row, col = self.get_grid_pos(event)
         if row is None: return
+        self.history.begin()  # ganzer Strich = ein Undo-Schritt (end in on_mouse_up)
         current_val = self.grid_data[row][col]
         if current_val == self.current_group_id:
             self.drag_mode = "erase"
@@ -227,62 +298,110 @@ class NibbleEditor(tk.Frame):
     def on_mouse_up(self, event):
         self.drag_mode = None
         self.last_drag_cell = None
+        # Letzten Stand sofort zeigen, nicht erst im nächsten Frame
+        if self._frame_pending is not None:
+            self.after_cancel(self._frame_pending)
+            self.flush_frame()
+        self.history.end()
 
     def apply_tool(self, row, col):
+        """Nur die Daten ändern - gezeichnet wird gesammelt im nächsten Frame (flush_frame)."""
+        changed = False
         if self.drag_mode == "erase":
             if self.grid_data[row][col] == self.current_group_id:
-                self.grid_data[row][col] = None
+                changed = self.set_cell(row, col, None)
         elif self.drag_mode == "paint":
             count = self.get_group_count(self.current_group_id)
             if count < GROUP_LIMITS[self.current_group_id]:
-                self.grid_data[row][col] = self.current_group_id
+                changed = self.set_cell(row, col, self.current_group_id)
 
-        self.redraw_canvas()
+        if changed and self._frame_pending is None:
+            self._frame_pending = self.after(FRAME_MS, self.flush_frame)
+
+    def flush_frame(self):
+        """Ein Frame: nur geänderte Zellen samt Nachbar-Brücken / -Ecken neu, Buttons einmal."""
+        self._frame_pending = None
+        if not self.dirty_cells: return
+        self.repaint_cells(self.dirty_cells)
+        self.dirty_cells = set()
         self.update_ui_state()
+        if self.preview: self.preview.refresh()
 
     def redraw_canvas(self):
+        """Alle Items neu anlegen (Laden, Reset, Bridge/Corner-Schalter)."""
         self.canvas.delete("all")
+        self.items = {}
+        self.item_fill = {}
+        self.dirty_cells = set()
         grid_pixel_size = 4 * CELL_SIZE + 3 * GAP_SIZE
         off_x = (CANVAS_SIZE - grid_pixel_size) // 2
         off_y = (CANVAS_SIZE - grid_pixel_size) // 2
+        step = CELL_SIZE + GAP_SIZE
+
+        tags = {"cell": "cell", "h": "bridge", "v": "bridge", "corner": "corner"}
+
+        def add(key, x1, y1, x2, y2):
+            item = self.canvas.create_rectangle(x1, y1, x2, y2, fill=EMPTY_COLOR, outline="",
+                                                state=tk.HIDDEN, tags=tags[key[0]])
+            self.items[key] = item
+            self.item_fill[item] = None
 
+        # Reihenfolge = Stapelung: Zellen, Brücken, Ecken
         # 1. Basis-Zellen
         for r in range(4):
             for c in range(4):
-                gid = self.grid_data[r][c]
-                x1 = off_x + c * (CELL_SIZE + GAP_SIZE)
-                y1 = off_y + r * (CELL_SIZE + GAP_SIZE)
+                x1, y1 = off_x + c * step, off_y + r * step
+                add(("cell", r, c), x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE)
 
-                color = "#2A2A2A"  # Leer (etwas heller als BG)
-                if gid is not None: color = GROUP_COLORS[gid]
-
-                self.canvas.create_rectangle(x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE, fill=color, outline="",
-                                             tags="cell")
-
-        if not self.bridge_gaps.get(): return
-
-        # 2. Brücken
+        # 2. Brücken (horizontal: zur rechten Zelle, vertikal: zur unteren Zelle)
         for r in range(4):
             for c in range(4):
-                gid = self.grid_data[r][c]
-                if gid is None: continue
-                x1 = off_x + c * (CELL_SIZE + GAP_SIZE)
-                y1 = off_y + r * (CELL_SIZE + GAP_SIZE)
-                if c < 3 and self.grid_data[r][c + 1] == gid:
-                    self.canvas.create_rectangle(x1 + CELL_SIZE - 1, y1, x1 + CELL_SIZE + GAP_SIZE + 1, y1 + CELL_SIZE,
-                                                 fill=GROUP_COLORS[gid], outline="", tags="bridge")
-                if r < 3 and self.grid_data[r + 1][c] == gid:
-                    self.canvas.create_rectangle(x1, y1 + CELL_SIZE - 1, x1 + CELL_SIZE, y1 + CELL_SIZE + GAP_SIZE + 1,
-                                                 fill=GROUP_COLORS[gid], outline="", tags="bridge")
+                x1, y1 = off_x + c * step, off_y + r * step
+                if c < 3: add(("h", r, c), x1 + CELL_SIZE - 1, y1, x1 + CELL_SIZE + GAP_SIZE + 1, y1 + CELL_SIZE)
+                if r < 3: add(("v", r, c), x1, y1 + CELL_SIZE - 1, x1 + CELL_SIZE, y1 + CELL_SIZE + GAP_SIZE + 1)
 
         # 3. Ecken
-        if self.fill_corners.get():
-            for r in range(3):
-                for c in range(3):
-                    g = self.grid_data[r][c]
-                    if g is not None and g == self.grid_data[r][c + 1] == self.grid_data[r + 1][c] == \
-                            self.grid_data[r + 1][c + 1]:
-                        cx1 = off_x + c * (CELL_SIZE + GAP_SIZE) + CELL_SIZE - 1
-                        cy1 = off_y + r * (CELL_SIZE + GAP_SIZE) + CELL_SIZE - 1
-                        self.canvas.create_rectangle(cx1, cy1, cx1 + GAP_SIZE + 2, cy1 + GAP_SIZE + 2,
-                                                     fill=GROUP_COLORS[g], outline="", tags="corner")
\ No newline at end of file
+        for r in range(3):
+            for c in range(3):
+                cx1 = off_x + c * step + CELL_SIZE - 1
+                cy1 = off_y + r * step + CELL_SIZE - 1
+                add(("corner", r, c), cx1, cy1, cx1 + GAP_SIZE + 2, cy1 + GAP_SIZE + 2)
+
+        for key, item in self.items.items():
+            self._apply_item(item, self._item_color(key))
+        if self.preview: self.preview.refresh()
+
+    def repaint_cells(self, cells):
+        """Zellen + die Brücken und Ecken, die an ihnen hängen."""
+        keys = set()
+        for r, c in cells:
+            keys.add(("cell", r, c))
+            keys.update((("h", r, c - 1), ("h", r, c), ("v", r - 1, c), ("v", r, c)))
+            keys.update(("corner", r + dr, c + dc) for dr in (-1, 0) for dc in (-1, 0))
+        for key in keys:
+            item = self.items.get(key)
+            if item is not None: self._apply_item(item, self._item_color(key))
+
+    def _item_color(self, key):
+        """Soll-Farbe eines Items, None = ausgeblendet (gleiche Regeln wie core / render_plan)."""
+        kind, r, c = key
+        g = self.grid_data
+        gid = g[r][c]
+        if kind == "cell":
+            return EMPTY_COLOR if gid is None else GROUP_COLORS[gid]
+        if gid is None or not self.bridge_gaps.get(): return None
+        if kind == "h":
+            return GROUP_COLORS[gid] if g[r][c + 1] == gid else None
+        if kind == "v":
+            return GROUP_COLORS[gid] if g[r + 1][c] == gid else None
+        if self.fill_corners.get() and gid == g[r][c + 1] == g[r + 1][c] == g[r + 1][c + 1]:
+            return GROUP_COLORS[gid]
+        return None
+
+    def _apply_item(self, item, color):
+        if self.item_fill.get(item, "") == color: return
+        self.item_fill[item] = color
+        if color is None:
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
+        else:
+            self.canvas.itemconfigure(item, state=tk.NORMAL, fill=color)
@@ -0,0 +1,208 @@
+# Datei: ui_overlay.py
+"""
+Overlay-Launcher: beliebig viele randlose, immer-oben Overlays in EINEM Prozess.
+
+Jedes Overlay ist ein tk.Toplevel (statt eigener Python-Prozess mit eigenem Tk-Interpreter).
+Alle teilen sich: eine Settings-Ladung, einen Plan-Cache und einen Tick-Scheduler.
+
+    python ui_overlay.py profile=0,zone=local,x=100,y=100 profile=3,zone=Asia/Tokyo,x=500,y=100
+"""
+import sys
+import tkinter as tk
+
+import core
+import render_plan
+import timezones
+from settings_manager import SettingsManager
+from ui_shared import BG_COLOR
+from ui_plan_view import PlanItems
+
+# --- KONFIGURATION ---
+OVERLAY_GEOMETRY = render_plan.Geometry(cell=10, gap=2, nibble_gap=12)
+PADDING = 12
+TEXT_HEIGHT = 34
+OVERLAY_ALPHA = 0.90
+
+
+class PlanCache:
+    """Kompilierte Pläne, geteilt von allen Overlays (Schlüssel: Profil-Inhalt + Geometrie)."""
+
+    def __init__(self, settings_manager, geometry=OVERLAY_GEOMETRY):
+        self.settings_manager = settings_manager
+        self.geometry = geometry
+        self.plans = {}
+
+    def get(self, profile_id):
+        data = self.settings_manager.data
+        profile = data["profiles"][profile_id]
+        key = render_plan.plan_key(data, 0, 0, profile)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = self.plans[key] = render_plan.compile_compact_plan(data, self.geometry, profile)
+        return key, plan
+
+
+class TickScheduler:
+    """
+    EIN after()-Loop für alle Clients. Jeder Client hat tick(utc_ms) -> ms bis zu seiner
+    nächsten Tick-Grenze; geschlafen wird bis zur frühesten.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.clients = []
+        self.running = False
+        self._after_id = None
+
+    def add(self, client):
+        self.clients.append(client)
+        if self.running: self.reschedule()
+
+    def remove(self, client):
+        if client in self.clients: self.clients.remove(client)
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self._loop()
+
+    def stop(self):
+        self.running = False
+        if self._after_id: self.widget.after_cancel(self._after_id)
+        self._after_id = None
+
+    def reschedule(self):
+        """Sofort ticken (z.B. neuer Client oder Profilwechsel)."""
+        if self._after_id: self.widget.after_cancel(self._after_id)
+        self._loop()
+
+    def _loop(self):
+        self._after_id = None
+        if not self.running: return
+        utc_ms = timezones.utc_ms_now()
+        delay = 1000
+        for client in tuple(self.clients):
+            wait = client.tick(utc_ms)
+            if wait < delay: delay = wait
+        self._after_id = self.widget.after(max(delay, 1), self._loop)
+
+
+class OverlayWindow(tk.Toplevel):
+    def __init__(self, launcher, profile_id=None, zone="local", x=100, y=100):
+        super().__init__(launcher.root, bg=BG_COLOR)
+        self.launcher = launcher
+        data = launcher.settings.data
+        self.profile_id = data.get("active_profileId", 0) if profile_id is None else profile_id
+        self.schedule = timezones.OffsetSchedule(timezones.parse_zone(zone))
+
+        # Fenstereinstellungen (wie das alte main.py Overlay)
+        self.attributes('-topmost', True)
+        self.overrideredirect(True)
+        self.attributes('-alpha', OVERLAY_ALPHA)
+
+        self.canvas = tk.Canvas(self, bg=BG_COLOR, highlightthickness=0)
+        self.canvas.pack(expand=True, fill='both')
+
+        self.plan_key = None
+        self.items = None
+        self.hex_text = None
+        self.value = None
+        self.position = (x, y)
+        self.build()
+
+        # Events
+        self.canvas.bind("<ButtonPress-1>", self.start_move)
+        self.canvas.bind("<B1-Motion>", self.do_move)
+        self.bind("<q>", self.close)
+        self.bind("<Escape>", self.close)
+
+    def build(self):
+        """Items für den (geteilten) Plan anlegen."""
+        self.plan_key, plan = self.launcher.plans.get(self.profile_id)
+        self.canvas.delete("all")
+        self.items = PlanItems(self.canvas, plan, PADDING, PADDING)
+        _, _, plan_w, plan_h = plan.bounds()
+        width = plan_w + 2 * PADDING
+        height = plan_h + 2 * PADDING + TEXT_HEIGHT
+
+        palette = core.resolve_profile(self.launcher.settings.data,
+                                       self.launcher.settings.data["profiles"][self.profile_id])[2]
+        self.hex_text = self.canvas.create_text(width // 2, plan_h + PADDING + TEXT_HEIGHT // 2 + 4,
+                                                text="0x0000", fill=palette[15], font=("Consolas", 18, "bold"))
+        self.geometry(f"{width}x{height}+{self.position[0]}+{self.position[1]}")
+        self.value = None
+
+    def tick(self, utc_ms):
+        offset_s = self.schedule.offset_at(utc_ms // 1000)
+        ms_local = (utc_ms + offset_s * 1000) % core.MS_PER_DAY
+        v16 = core.v16_from_day_ms(ms_local)
+        if v16 != self.value:
+            self.value = v16
+            self.items.show(v16)
+            self.canvas.itemconfigure(self.hex_text, text=f"0x{v16:04X}")
+        return core.ms_until_next_tick(ms_local, minimum=1)
+
+    # --- FENSTER VERSCHIEBEN ---
+
+    def start_move(self, event):
+        self._drag = (event.x, event.y)
+
+    def do_move(self, event):
+        x = self.winfo_x() + event.x - self._drag[0]
+        y = self.winfo_y() + event.y - self._drag[1]
+        self.position = (x, y)
+        self.geometry(f"+{x}+{y}")
+
+    def close(self, event=None):
+        self.launcher.close_overlay(self)
+
+
+class OverlayLauncher:
+    def __init__(self, root, settings_manager=None):
+        self.root = root
+        self.root.withdraw()  # Das Hauptfenster selbst bleibt unsichtbar
+        self.settings = settings_manager or SettingsManager()
+        self.plans = PlanCache(self.settings)
+        self.scheduler = TickScheduler(root)
+        self.overlays = []
+
+    def open_overlay(self, profile_id=None, zone="local", x=100, y=100):
+        overlay = OverlayWindow(self, profile_id, zone, x, y)
+        self.overlays.append(overlay)
+        self.scheduler.add(overlay)
+        return overlay
+
+    def close_overlay(self, overlay):
+        self.scheduler.remove(overlay)
+        self.overlays.remove(overlay)
+        overlay.destroy()
+        if not self.overlays:
+            self.scheduler.stop()
+            self.root.destroy()
+
+    def start(self):
+        self.scheduler.start()
+
+
+def parse_overlay_spec(text):
+    """'profile=3,zone=Asia/Tokyo,x=500,y=100' -> kwargs für open_overlay."""
+    spec = {}
+    for part in text.split(","):
+        if not part: continue
+        key, _, value = part.partition("=")
+        if key == "profile": spec["profile_id"] = int(value)
+        elif key == "zone": spec["zone"] = value
+        elif key in ("x", "y"): spec[key] = int(value)
+        else: raise ValueError(f"Unbekannte Option: {key}")
+    return spec
+
+
+if __name__ == "__main__":
+    specs = sys.argv[1:] or ["zone=local,x=100,y=100"]
+
+    root = tk.Tk()
+    launcher = OverlayLauncher(root)
+    for spec in specs:
+        launcher.open_overlay(**parse_overlay_spec(spec))
+    launcher.start()
+    root.mainloop()
@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import colorchooser
 from ui_shared import FlatButton, BG_COLOR, TEXT_COLOR, UI_FONT, UI_FONT_SMALL
+from ui_preview import LivePreview, working_profile
+from history import History, pairs_diff, pairs_patch
+from palette_engine import Palette
 
 # Konstanten für die Darstellung
 GAP_SIZE = 5
@@ -11,8 +14,9 @@ class PaletteEditor(tk.Frame):
         super().__init__(parent, bg=BG_COLOR)
         self.settings_manager = settings_manager
 
-        # Lokaler Speicher für 16 Farben
+        # Lokaler Speicher für 16 Farben (Hex für Speichern / Vorschau, gepackt für Bulk-Operationen)
         self.current_colors = ["#000000"] * 16
+        self.palette = Palette.from_hex(self.current_colors)
 
         # Pinsel-Modus: "pixel", "nibble", "global"
         self.brush_mode = tk.StringVar(value="pixel")
@@ -20,6 +24,9 @@ class PaletteEditor(tk.Frame):
         # Liste für die Button-Referenzen vorinitialisieren
         self.color_buttons = [None] * 16
 
+        # Undo/Redo: pro Schritt nur (Index, alt, neu) der geänderten Farben
+        self.history = History(lambda: tuple(self.current_colors), self.set_colors, pairs_diff, pairs_patch)
+
         self.setup_ui()
         self.load_current_slot()
 
@@ -41,6 +48,8 @@ class PaletteEditor(tk.Frame):
 
         FlatButton(top_row, text="Load", command=self.load_current_slot, bg="#444444", width=4).pack(side=tk.LEFT,
                                                                                                      padx=2)
+        FlatButton(top_row, text="Undo", command=self.undo, bg="#444444", width=4).pack(side=tk.LEFT, padx=(10, 2))
+        FlatButton(top_row, text="Redo", command=self.redo, bg="#444444", width=4).pack(side=tk.LEFT, padx=2)
         FlatButton(top_row, text="Save", command=self.save_current_slot, bg="#44AA44", width=4).pack(side=tk.RIGHT,
                                                                                                      padx=2)
 
@@ -61,12 +70,28 @@ class PaletteEditor(tk.Frame):
                                 font=UI_FONT_SMALL)
             rb.pack(side=tk.LEFT, padx=5)
 
+        # --- BULK (ganze Palette auf einmal, siehe palette_engine.py) ---
+        bulk_row = tk.Frame(toolbar, bg=BG_COLOR)
+        bulk_row.pack(side=tk.TOP, pady=(0, 5))
+        bulk_ops = [("Gradient", lambda p: p.gradient()),      # Bit 0 -> Bit 15
+                    ("Ramps", lambda p: p.nibble_ramps()),     # pro Nibble aus Gruppe 3
+                    ("Hue +30", lambda p: p.hue_shift(30)),
+                    ("Contrast", lambda p: p.fix_contrast())]  # gegen BG_COLOR
+        for text, op in bulk_ops:
+            FlatButton(bulk_row, text=text, command=lambda o=op, t=text: self.apply_bulk(o, t),
+                       bg="#444444", width=8, font=UI_FONT_SMALL).pack(side=tk.LEFT, padx=3)
+
         # --- MAIN AREA (4x4 Color Grid) ---
         main_frame = tk.Frame(self, bg=BG_COLOR)
         main_frame.pack(expand=True, fill=tk.BOTH)
 
         self.grid_container = tk.Frame(main_frame, bg=BG_COLOR)
-        self.grid_container.pack(expand=True)
+        self.grid_container.pack(side=tk.LEFT, expand=True)
+
+        # Live-Vorschau: ungespeicherte Farben mit Design + Layout des aktiven Profils
+        self.preview = LivePreview(main_frame, lambda: working_profile(self.settings_manager.data,
+                                                                       palette=self.current_colors))
+        self.preview.pack(side=tk.RIGHT, padx=20)
 
         # Grid Aufbau (4 Zeilen à 4 Bits)
         for row in range(4):
@@ -116,34 +141,50 @@ class PaletteEditor(tk.Frame):
 
         mode = self.brush_mode.get()
 
-        # 2. Logik anwenden
+        # 2. Logik anwenden - neue Palette komplett bauen, dann in einem Rutsch anzeigen
+        colors = list(self.current_colors)
         if mode == "pixel":
-            self.apply_color(bit_index, new_color)
-
+            colors[bit_index] = new_color
         elif mode == "nibble":
-            nibble_idx = bit_index // 4
-            start_bit = nibble_idx * 4
-            for i in range(start_bit, start_bit + 4):
-                self.apply_color(i, new_color)
-
+            start_bit = (bit_index // 4) * 4
+            colors[start_bit:start_bit + 4] = [new_color] * 4
         elif mode == "global":
-            for i in range(16):
-                self.apply_color(i, new_color)
-
-    def apply_color(self, index, hex_val):
-        self.current_colors[index] = hex_val
-        self.update_button_display(index, hex_val)
-
-    def update_button_display(self, index, hex_val):
-        btn = self.color_buttons[index]
-
-        # WICHTIG: Wir müssen die internen Werte des FlatButton updaten,
-        # sonst setzt der Hover-Effekt die Farbe zurück!
-        btn.default_bg = hex_val
-        btn.hover_bg = btn.adjust_color_lightness(hex_val, 1.2)
-
-        # Visuell updaten
-        btn.config(bg=hex_val)
+            colors = [new_color] * 16
+        self.apply_palette(colors)
+
+    def apply_bulk(self, op, name):
+        self.apply_palette(op(self.palette).hex())
+        self.info_label.config(text=name)
+
+    def apply_palette(self, colors):
+        """Eine Änderung = ein Undo-Schritt, eine Anzeige-Runde."""
+        self.history.begin()
+        self.show_colors(colors)
+        self.history.end()
+
+    def show_colors(self, colors, force=False):
+        """
+        Gebündeltes UI-Update: Hover-Farben einmal für die ganze Palette (palette_engine), dann
+        pro GEÄNDERTEM Button genau ein config() und am Ende ein Vorschau-Refresh.
+        """
+        colors = list(colors)
+        self.palette = Palette.from_hex(colors)
+        hover = self.palette.hover
+        for i, hex_val in enumerate(colors):
+            if force or hex_val != self.current_colors[i]:
+                # Hover-Farbe mitsetzen, sonst setzt der Hover-Effekt die Farbe zurück
+                self.color_buttons[i].set_colors(hex_val, hover[i])
+        self.current_colors = colors
+        self.preview.refresh()
+
+    def set_colors(self, colors):
+        self.show_colors(colors)
+
+    def undo(self):
+        if self.history.undo(): self.info_label.config(text=f"Undo - {self.history.summary()}")
+
+    def redo(self):
+        if self.history.redo(): self.info_label.config(text=f"Redo - {self.history.summary()}")
 
     # --- JSON HANDLING ---
 
@@ -157,10 +198,8 @@ class PaletteEditor(tk.Frame):
             if len(loaded_colors) < 16:
                 loaded_colors.extend(["#333333"] * (16 - len(loaded_colors)))
 
-            self.current_colors = list(loaded_colors[:16])
-
-            for i in range(16):
-                self.update_button_display(i, self.current_colors[i])
+            self.history.clear()
+            self.show_colors(loaded_colors[:16], force=True)
 
             self.info_label.config(text=f"Loaded Palette {slot_id}")
 
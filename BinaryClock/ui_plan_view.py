@@ -0,0 +1,293 @@
+# Datei: ui_plan_view.py
+import base64
+import tkinter as tk
+from collections import Counter
+
+import exporter
+import render_plan
+from frame_budget import MODE_ROLES
+
+# Profilwechsel: Übergang über ein paar Frames (0 = sofort). Mehr bewegte Items -> sofort.
+MORPH_FRAMES = 6
+MORPH_FRAME_MS = 30
+MORPH_MAX_ITEMS = 256
+
+
+def _rgb(color):
+    try:
+        return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class PlanItems:
+    """
+    Die Rechtecke eines Render-Plans als feste Canvas-Items.
+    Die Items werden EINMAL angelegt; pro Wert werden nur die Items der geänderten Bits
+    ein- bzw. ausgeblendet (state="normal"/"hidden") - kein delete("all") + Neuaufbau.
+    """
+
+    def __init__(self, canvas, plan, dx=0, dy=0, tags=(), role_prefix="clock_"):
+        self.canvas = canvas
+        self.plan = plan
+        self.dx, self.dy = dx, dy
+        self.tags = tags
+        self.role_prefix = role_prefix
+        self.spare = {}  # Rolle -> ausgeblendete Items, die der aktuelle Plan nicht braucht (morph)
+        self.items = [
+            canvas.create_rectangle(r.x1 + dx, r.y1 + dy, r.x2 + dx, r.y2 + dy, fill=r.color, outline="",
+                                    state=tk.HIDDEN, tags=tags + (role_prefix + r.role,))
+            for r in plan.rects
+        ]
+        self.value = 0
+
+    def show(self, value):
+        """Auf `value` umschalten. Gibt die Anzahl geänderter Items zurück."""
+        changed = 0
+        for bit in self.plan.changed_bits(self.value, value):
+            state = tk.NORMAL if (value >> bit) & 1 else tk.HIDDEN
+            for index in self.plan.by_bit[bit]:
+                self.canvas.itemconfigure(self.items[index], state=state)
+                changed += 1
+        self.value = value
+        return changed
+
+    def morph(self, plan, frames=0):
+        """
+        Auf einen anderen Plan umstellen, OHNE die Items neu anzulegen. Alte und neue Rechtecke
+        werden über Rolle und Position gepaart: erst exakt gleiche Rechtecke, dann das nächste
+        freie derselben Rolle. Ein Paar kostet nur die nötigen coords / itemconfigure; übrige
+        alte Items werden ausgeblendet und für spätere Wechsel aufgehoben (self.spare).
+
+        Mit frames > 0 gleiten Position und Farbe der bewegten Items über die zurückgegebene
+        Transition (step() pro Frame); Sichtbarkeit und Bits gelten sofort. Die Arbeit pro Frame
+        ist durch die Anzahl der Rechtecke des Plans begrenzt.
+        Z-Reihenfolge spielt keine Rolle: Rechtecke überlappen nur mit Rechtecken derselben Gruppe.
+        """
+        canvas, dx, dy = self.canvas, self.dx, self.dy
+        old_rects, old_items, value = self.plan.rects, self.items, self.value
+        cost = Counter()
+
+        # 1. Gleiches Rechteck an gleicher Stelle
+        exact = {}
+        for i, r in enumerate(old_rects):
+            exact.setdefault(r[1:6], []).append(i)
+        match = [None] * len(plan.rects)
+        for j, r in enumerate(plan.rects):
+            free = exact.get(r[1:6])
+            if free: match[j] = free.pop()
+        # 2. Rest: nächstes freies Rechteck derselben Rolle
+        taken = set(match)
+        free_by_role = {}
+        for i, r in enumerate(old_rects):
+            if i not in taken: free_by_role.setdefault(r.role, []).append(i)
+        for j, r in enumerate(plan.rects):
+            free = free_by_role.get(r.role)
+            if match[j] is not None or not free: continue
+            k = min(range(len(free)),
+                    key=lambda n: abs(old_rects[free[n]].x1 - r.x1) + abs(old_rects[free[n]].y1 - r.y1))
+            match[j] = free.pop(k)
+
+        items, moves = [], []
+        animate = 0 < frames and len(plan.rects) <= MORPH_MAX_ITEMS
+        for j, r in enumerate(plan.rects):
+            on = (value >> r.bit) & 1
+            i = match[j]
+            options = {}
+            if i is None:
+                spare = self.spare.get(r.role)
+                if spare:
+                    item = spare.pop()
+                    canvas.coords(item, r.x1 + dx, r.y1 + dy, r.x2 + dx, r.y2 + dy)
+                    options["fill"] = r.color
+                    cost["coords"] += 1
+                    cost["recycled"] += 1
+                else:
+                    item = canvas.create_rectangle(r.x1 + dx, r.y1 + dy, r.x2 + dx, r.y2 + dy, fill=r.color,
+                                                   outline="", state=tk.HIDDEN,
+                                                   tags=self.tags + (self.role_prefix + r.role,))
+                    cost["created"] += 1
+                was_on = False
+            else:
+                item, old = old_items[i], old_rects[i]
+                was_on = (self.value >> old.bit) & 1
+                cost["reused"] += 1
+                if old[2:6] != r[2:6] or old.color != r.color:
+                    if animate:
+                        moves.append((item, old, r))
+                    else:
+                        if old[2:6] != r[2:6]:
+                            canvas.coords(item, r.x1 + dx, r.y1 + dy, r.x2 + dx, r.y2 + dy)
+                            cost["coords"] += 1
+                        if old.color != r.color: options["fill"] = r.color
+            if on != was_on: options["state"] = tk.NORMAL if on else tk.HIDDEN
+            if options:
+                canvas.itemconfigure(item, **options)
+                cost["itemconfigure"] += 1
+            items.append(item)
+
+        # 3. Übrige alte Items ausblenden und aufheben
+        used = set(match)
+        for i, r in enumerate(old_rects):
+            if i in used: continue
+            if (value >> r.bit) & 1:
+                canvas.itemconfigure(old_items[i], state=tk.HIDDEN)
+                cost["itemconfigure"] += 1
+            self.spare.setdefault(r.role, []).append(old_items[i])
+            cost["spared"] += 1
+
+        self.items = items
+        self.plan = plan
+        return Transition(canvas, moves, frames if moves else 0, cost, dx, dy)
+
+    def recolor(self, plan):
+        """
+        Neuen Plan übernehmen, wenn sich nur Farben geändert haben (gleiche Rechtecke, gleiche Bits):
+        nur die Füllfarbe der betroffenen Items ändern. False = Plan passt nicht, neu anlegen.
+        """
+        old = self.plan.rects
+        if plan.bits != self.plan.bits or len(plan.rects) != len(old): return False
+        if any(a[:6] != b[:6] for a, b in zip(old, plan.rects)): return False
+        for item, a, b in zip(self.items, old, plan.rects):
+            if a.color != b.color: self.canvas.itemconfigure(item, fill=b.color)
+        self.plan = plan
+        return True
+
+    def delete(self):
+        for item in self.items + [item for spare in self.spare.values() for item in spare]:
+            self.canvas.delete(item)
+        self.items = []
+        self.spare = {}
+
+
+class Transition:
+    """Gleitender Übergang nach PlanItems.morph: step() einmal pro Frame, bis es False liefert."""
+
+    def __init__(self, canvas, moves, frames, cost, dx=0, dy=0):
+        self.canvas = canvas
+        self.frames = frames
+        self.frame = 0
+        self.cost = cost
+        # Pro Item vorab: Start- und Ziel-Koordinaten (mit Versatz), Farben als RGB (None = nicht gleiten)
+        offset = (dx, dy, dx, dy)
+        self.moves = []
+        for item, a, b in moves:
+            start = tuple(p + d for p, d in zip(a[2:6], offset)) if a[2:6] != b[2:6] else None
+            end = tuple(q + d for q, d in zip(b[2:6], offset))
+            colors = (_rgb(a.color), _rgb(b.color), b.color) if a.color != b.color else None
+            self.moves.append((item, start, end, colors))
+        cost["moving"] = len(moves)
+        cost["frames"] = frames
+        # Obergrenze pro Frame: coords + itemconfigure für jedes bewegte Item
+        cost["max_ops_per_frame"] = 2 * len(moves)
+
+    @property
+    def done(self):
+        return self.frame >= self.frames
+
+    def step(self):
+        if self.done: return False
+        self.frame += 1
+        t = self.frame / self.frames
+        last = self.done
+        canvas, cost = self.canvas, self.cost
+        for item, start, end, colors in self.moves:
+            if start is not None:
+                canvas.coords(item, *(end if last else [round(p + (q - p) * t) for p, q in zip(start, end)]))
+                cost["coords"] += 1
+            if colors is not None:
+                ra, rb, final = colors
+                if last:
+                    fill = final
+                elif ra is None or rb is None:
+                    continue  # keine #RRGGBB Farbe: erst im letzten Frame umschalten
+                else:
+                    fill = "#%02X%02X%02X" % (round(ra[0] + (rb[0] - ra[0]) * t), round(ra[1] + (rb[1] - ra[1]) * t),
+                                              round(ra[2] + (rb[2] - ra[2]) * t))
+                canvas.itemconfigure(item, fill=fill)
+                cost["itemconfigure"] += 1
+        return not last
+
+    def finish(self):
+        """Sofort ans Ziel (z.B. wenn schon der nächste Wechsel kommt)."""
+        if not self.done:
+            self.frame = self.frames - 1
+            self.step()
+
+    def summary(self):
+        c = self.cost
+        return (f"reused {c['reused']} created {c['created']} recycled {c['recycled']} spared {c['spared']}, "
+                f"{c['coords']} coords + {c['itemconfigure']} itemconfigure, "
+                f"{c['moving']} moving over {c['frames']} frames (max {c['max_ops_per_frame']} ops/frame)")
+
+
+# --- GÜNSTIGERE DARSTELLUNG UNTER LAST (siehe frame_budget.py) ---
+
+def mode_plan(plan, mode):
+    """Plan für einen Render-Modus: nur die Rechtecke der Rollen aus MODE_ROLES (sonst der Plan selbst)."""
+    roles = MODE_ROLES.get(mode)
+    if roles is None: return plan
+    return render_plan.RenderPlan([r for r in plan.rects if r.role in roles], plan.bits)
+
+
+def plan_for_mode(plan, mode):
+    """(Modus, Plan) für die Anzeige. Sprite geht nur ohne überlappende Nibbles, sonst bleibt es bei "cells"."""
+    if mode == "sprite" and not SpriteItems.fits(plan): mode = "cells"
+    return mode, mode_plan(plan, mode)
+
+
+def _photo_image(png):
+    return tk.PhotoImage(data=base64.b64encode(png))
+
+
+class SpriteItems:
+    """
+    Dieselbe Schnittstelle wie PlanItems (plan, value, show, delete), aber EIN Bild-Item pro
+    Nibble: die 16 Zustände werden einmal gerastert (exporter.FrameComposer), ein Wertwechsel
+    kostet höchstens ein itemconfigure pro geändertem Nibble - egal wie viele Rechtecke.
+    Kein morph: bei neuem Plan neu anlegen.
+    """
+
+    def __init__(self, canvas, plan, image_factory=None):
+        image_factory = image_factory or _photo_image  # PNG-Bytes -> Bild (headless: Fake)
+        self.canvas = canvas
+        self.plan = plan
+        composer = exporter.FrameComposer(plan, padding=0)
+        # Die Bilder müssen referenziert bleiben, sonst räumt Tk sie weg
+        self.tiles = []
+        self.items = []
+        self.shifts = []
+        for index, (n, x, y, _, _) in enumerate(composer.boxes):
+            tiles = [image_factory(composer.tile_png(index, state)) for state in range(16)]
+            self.tiles.append(tiles)
+            self.items.append(canvas.create_image(x, y, anchor="nw", image=tiles[0], tags=("sprite",)))
+            self.shifts.append(n * 4)
+        self.value = 0
+
+    @staticmethod
+    def fits(plan):
+        """Nur sinnvoll, wenn sich die Nibble-Kacheln nicht überdecken (sonst übermalt der Hintergrund)."""
+        boxes = []
+        for n in range(plan.bits // 4):
+            rects = [r for r in plan.rects if r.bit // 4 == n]
+            if rects:
+                boxes.append((min(r.x1 for r in rects), min(r.y1 for r in rects),
+                              max(r.x2 for r in rects), max(r.y2 for r in rects)))
+        return not any(a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+                       for i, a in enumerate(boxes) for b in boxes[i + 1:])
+
+    def show(self, value):
+        changed = 0
+        for item, shift, tiles in zip(self.items, self.shifts, self.tiles):
+            state = (value >> shift) & 0xF
+            if state != (self.value >> shift) & 0xF:
+                self.canvas.itemconfigure(item, image=tiles[state])
+                changed += 1
+        self.value = value
+        return changed
+
+    def delete(self):
+        for item in self.items:
+            self.canvas.delete(item)
+        self.items = []
+        self.tiles = []
@@ -0,0 +1,100 @@
+# Datei: ui_preview.py
+"""
+Live-Vorschau für die Editoren: zeigt den UNGESPEICHERTEN Arbeitsstand als kleine Uhr.
+
+Der Editor übergibt eine Funktion, die (grid_design, placements, palette) liefert - den eigenen
+Arbeitsstand, ergänzt um die übrigen Teile des aktiven Profils (working_profile). Nach jeder
+Änderung ruft der Editor refresh(); kompiliert wird gesammelt im nächsten Idle-Durchlauf über
+render_plan.PartCompiler (nur die betroffenen Placements). Sind nur Farben anders, werden die
+vorhandenen Canvas-Items umgefärbt statt neu angelegt.
+
+Solange die Vorschau sichtbar ist, läuft sie durch SAMPLE_VALUES (jedes Nibble zeigt jeden
+seiner 16 Zustände). Es wird nichts gespeichert.
+"""
+import tkinter as tk
+
+import core
+import render_plan
+from ui_plan_view import PlanItems
+from ui_shared import BG_COLOR, UI_FONT_SMALL
+
+PREVIEW_GEOMETRY = render_plan.Geometry(8, 2, 12)
+ANIM_MS = 600
+# 0x0000, 0x1111, ... 0xFFFF: alle Zustände jedes Nibbles
+SAMPLE_VALUES = [n * 0x1111 for n in range(16)]
+
+
+def working_profile(data, grid_design=None, placements=None, palette=None):
+    """Aktives Profil auflösen und die Teile ersetzen, die der Editor gerade bearbeitet."""
+    active_grid, active_placements, active_palette = core.resolve_profile(data)
+    return (active_grid if grid_design is None else grid_design,
+            active_placements if placements is None else placements,
+            active_palette if palette is None else palette)
+
+
+class LivePreview(tk.Frame):
+    def __init__(self, parent, source, geometry=PREVIEW_GEOMETRY):
+        super().__init__(parent, bg=BG_COLOR)
+        self.source = source
+        self.compiler = render_plan.PartCompiler(geometry)
+
+        nibble_px = 4 * geometry.cell + 3 * geometry.gap
+        self.size = 4 * nibble_px + 3 * geometry.nibble_gap
+        self.canvas = tk.Canvas(self, bg=BG_COLOR, width=self.size, height=self.size, highlightthickness=0)
+        self.canvas.pack(side=tk.TOP)
+        self.label = tk.Label(self, text="Preview", bg=BG_COLOR, fg="#555555", font=UI_FONT_SMALL)
+        self.label.pack(side=tk.TOP)
+
+        self._items = None
+        self._refresh_pending = None
+        self._anim_after = None
+        self.sample = 0
+
+        # Animation nur, solange die Vorschau auf dem Bildschirm ist
+        self.bind("<Map>", lambda e: self.start())
+        self.bind("<Unmap>", lambda e: self.stop())
+
+    def refresh(self):
+        """Arbeitsstand hat sich geändert - im nächsten Idle-Durchlauf neu aufbauen (gesammelt)."""
+        if self._refresh_pending is None:
+            self._refresh_pending = self.after_idle(self.rebuild)
+
+    def rebuild(self):
+        self._refresh_pending = None
+        try:
+            grid_design, placements, palette = self.source()
+        except Exception as e:
+            self.label.config(text=f"Preview: {e}")
+            return
+        if not placements:
+            self.canvas.delete("all")
+            self._items = None
+            return
+        # Festes 4x4 Raster (wie im LayoutEditor): verschiebt man ein Placement, bleiben die anderen gültig
+        plan = self.compiler.compile(grid_design, placements, palette)
+
+        items = self._items
+        if items is not None and items.plan is plan: return
+        if items is None or not items.recolor(plan):
+            self.canvas.delete("all")
+            self._items = PlanItems(self.canvas, plan, role_prefix="preview_")
+            self._items.show(SAMPLE_VALUES[self.sample])
+        self.label.config(text=f"Preview 0x{self._items.value:04X}")
+
+    def start(self):
+        if self._anim_after is None:
+            self.rebuild()
+            self._anim_after = self.after(ANIM_MS, self.step)
+
+    def stop(self):
+        if self._anim_after is not None:
+            self.after_cancel(self._anim_after)
+            self._anim_after = None
+
+    def step(self):
+        self.sample = (self.sample + 1) % len(SAMPLE_VALUES)
+        if self._items is not None:
+            value = SAMPLE_VALUES[self.sample]
+            self._items.show(value)
+            self.label.config(text=f"Preview 0x{value:04X}")
+        self._anim_after = self.after(ANIM_MS, self.step)
@@ -1,7 +1,9 @@
+import functools
 import tkinter as tk
+import core
 
 # --- GLOBALE UI KONSTANTEN ---
-BG_COLOR = "#202020"
+BG_COLOR = core.BG_COLOR  # auch von den Tk-freien Renderern genutzt
 BG_OFF_COLOR = "#303030"
 BG_BUTTON_COLOR = "#505050"
 TEXT_COLOR = "#FFFFFF"
@@ -15,6 +17,20 @@ GROUP_COLORS = {
     3: "#3357FF"   # Blau
 }
 
+@functools.lru_cache(maxsize=1024)
+def adjust_color_lightness(color_hex, factor):
+    """Hex-Farbe heller/dunkler (gecacht - Buttons fragen immer wieder dieselben Farben an)."""
+    try:
+        color_hex = color_hex.lstrip('#')
+        r, g, b = tuple(int(color_hex[i:i + 2], 16) for i in (0, 2, 4))
+        r = min(255, int(r * factor))
+        g = min(255, int(g * factor))
+        b = min(255, int(b * factor))
+        return f"#{r:02x}{g:02x}{b:02x}"
+    except:
+        return color_hex
+
+
 class FlatButton(tk.Label):
     """
     Ein Button ohne Betriebssystem-Style.
@@ -47,6 +63,12 @@ class FlatButton(tk.Label):
     def on_leave(self, event):
         self.config(bg=self.default_bg)
 
+    def set_colors(self, bg, hover_bg=None):
+        """Neue Grundfarbe (Hover-Farbe vorberechnet übergeben oder hier ableiten), ein config()."""
+        self.default_bg = bg
+        self.hover_bg = hover_bg if hover_bg is not None else self.adjust_color_lightness(bg, 1.2)
+        self.config(bg=bg)
+
     def set_active(self, active):
         if active:
             self.config(relief="solid")
@@ -54,12 +76,4 @@ class FlatButton(tk.Label):
             self.config(relief="flat")
 
     def adjust_color_lightness(self, color_hex, factor):
-        try:
-            color_hex = color_hex.lstrip('#')
-            r, g, b = tuple(int(color_hex[i:i + 2], 16) for i in (0, 2, 4))
-            r = min(255, int(r * factor))
-            g = min(255, int(g * factor))
-            b = min(255, int(b * factor))
-            return f"#{r:02x}{g:02x}{b:02x}"
-        except:
-            return color_hex
\ No newline at end of file
+        return adjust_color_lightness(color_hex, factor)
\ No newline at end of file
@@ -0,0 +1,242 @@
+# Datei: web_server.py
+"""
+asyncio Server für Wand-Dashboards im Browser (ohne Tk).
+
+    GET /              -> kleine HTML Seite, zeichnet die Uhr auf ein <canvas>
+    GET /plan          -> kompilierter Render-Plan (JSON, siehe render_plan.py)
+    GET /events        -> Server-Sent Events, ein Event pro Tick
+    GET /events?diff=1 -> zusätzlich die geänderten Bit-Gruppen
+    GET /ws[?diff=1]   -> dasselbe als WebSocket (Text-Frames)
+
+Pro Tick werden die vier Payload-Varianten genau einmal gebaut und dann als fertige
+Bytes an alle Clients geschrieben - keine Serialisierung pro Client.
+
+Ein neuer Client bekommt zuerst den vollen Zustand (alle Bits als "changed", "full": true),
+erst danach die Diffs. /plan liefert den aktuellen Wert mit, damit die Seite nach jedem
+Plan-Wechsel alle Bits zeichnen kann.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+
+import render_plan
+from daemon import compute_tick, MAX_CLIENT_BUFFER
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+PLAN_SIZE = (420, 420)
+
+SSE = "sse"
+SSE_DIFF = "sse_diff"
+WS = "ws"
+WS_DIFF = "ws_diff"
+
+PAGE = b"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Binary Clock</title>
+<style>body{background:#202020;margin:0;display:flex;height:100vh;align-items:center;justify-content:center}
+#v{color:#555;font:14px Consolas,monospace;text-align:center}</style></head>
+<body><div><canvas id="c"></canvas><div id="v"></div></div><script>
+let plan=null, planVersion=-1, value=0, received=false, loading=null;
+const cv=document.getElementById("c"), ctx=cv.getContext("2d");
+function loadPlan(){
+  // Nur ein Abruf gleichzeitig; danach ALLE Bits mit dem neuesten Wert zeichnen
+  if(!loading) loading=fetch("/plan").then(r=>r.json()).then(j=>{
+    plan=j.plan; planVersion=j.version; if(!received && j.v16!==null) value=j.v16;
+    cv.width=j.width; cv.height=j.height; draw(0xFFFF); loading=null;
+  });
+  return loading;
+}
+function draw(bits){
+  for(const [bit,role,x1,y1,x2,y2,color] of plan.rects){
+    if(!((bits>>bit)&1)) continue;
+    ctx.fillStyle=((value>>bit)&1)?color:"#202020"; ctx.fillRect(x1,y1,x2-x1,y2-y1);
+  }
+}
+loadPlan().then(()=>{
+  const es=new EventSource("/events?diff=1");
+  es.onmessage=(e)=>{
+    const m=JSON.parse(e.data); value=m.v16; received=true;
+    if(m.plan!==planVersion || loading){loadPlan(); return;}
+    let mask=0xFFFF; if(!m.full){mask=0; for(const b of m.changed) mask|=(1<<b);} draw(mask);
+    document.getElementById("v").textContent="0x"+m.v16.toString(16).toUpperCase().padStart(4,"0");
+  };
+});
+</script></body></html>
+"""
+
+
+def ws_frame(payload):
+    """Ein unmaskierter WebSocket Text-Frame (Server -> Client)."""
+    n = len(payload)
+    if n < 126:
+        header = bytes((0x81, n))
+    elif n < 65536:
+        header = bytes((0x81, 126)) + n.to_bytes(2, "big")
+    else:
+        header = bytes((0x81, 127)) + n.to_bytes(8, "big")
+    return header + payload
+
+
+def http_response(status, content_type, body):
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+class TickServer:
+    def __init__(self, settings_manager, host="127.0.0.1", port=8765, plan_size=PLAN_SIZE):
+        self.settings_manager = settings_manager
+        self.host = host
+        self.port = port
+        self.plan_size = plan_size
+
+        self.server = None
+        self.clients = {}         # writer -> SSE / SSE_DIFF / WS / WS_DIFF
+        self.payloads = {}        # Variante -> fertige Bytes des letzten Ticks
+        self.full_payloads = {}   # dasselbe mit vollem Zustand (für neue Clients)
+
+        self.plan = None
+        self.plan_key = None
+        self.plan_version = 0
+        self.last_v16 = None
+        self.computations = 0
+        self.dropped = 0
+
+    # --- PLAN ---
+
+    def refresh_plan(self):
+        w, h = self.plan_size
+        key = render_plan.plan_key(self.settings_manager.data, w, h)
+        if key != self.plan_key:
+            self.plan = render_plan.compile_clock_plan(self.settings_manager.data, w, h)
+            self.plan_key = key
+            self.plan_version += 1
+            self.last_v16 = None  # neuer Plan -> alles ist "geändert"
+
+    # --- TICK ---
+
+    def publish(self, v16, v32):
+        """Payloads einmal bauen, dann an alle Clients verteilen."""
+        self.computations += 1
+        self.refresh_plan()
+
+        old = self.last_v16
+        changed = self.plan.changed_bits(old, v16) if old is not None else list(range(self.plan.bits))
+        self.last_v16 = v16
+
+        plain = json.dumps({"v16": v16, "v32": v32 & 0xFFFFFFFF}, separators=(",", ":")).encode()
+        diff = json.dumps({"v16": v16, "v32": v32 & 0xFFFFFFFF, "changed": changed, "plan": self.plan_version},
+                          separators=(",", ":")).encode()
+        full = json.dumps({"v16": v16, "v32": v32 & 0xFFFFFFFF, "changed": list(range(self.plan.bits)),
+                           "plan": self.plan_version, "full": True}, separators=(",", ":")).encode()
+        self.payloads = {
+            SSE: b"data: " + plain + b"\n\n",
+            SSE_DIFF: b"data: " + diff + b"\n\n",
+            WS: ws_frame(plain),
+            WS_DIFF: ws_frame(diff),
+        }
+        self.full_payloads = {
+            SSE: self.payloads[SSE],
+            SSE_DIFF: b"data: " + full + b"\n\n",
+            WS: self.payloads[WS],
+            WS_DIFF: ws_frame(full),
+        }
+
+        payloads = self.payloads
+        for writer, kind in tuple(self.clients.items()):
+            transport = writer.transport
+            if transport.is_closing(): continue
+            if transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self.dropped += 1
+                del self.clients[writer]
+                transport.abort()
+                continue
+            transport.write(payloads[kind])
+
+    # --- HTTP ---
+
+    async def _on_connect(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""): break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode("latin-1").split()
+            target = parts[1] if len(parts) >= 2 else "/"
+            path, _, query = target.partition("?")
+            want_diff = "diff=1" in query.split("&")
+
+            if path == "/":
+                writer.write(http_response("200 OK", "text/html; charset=utf-8", PAGE))
+            elif path == "/plan":
+                self.refresh_plan()
+                body = json.dumps({"version": self.plan_version, "width": self.plan_size[0],
+                                   "height": self.plan_size[1], "v16": self.last_v16,
+                                   "plan": self.plan.to_json()}).encode()
+                writer.write(http_response("200 OK", "application/json", body))
+            elif path == "/events":
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                             b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+                await self._stream(reader, writer, SSE_DIFF if want_diff else SSE)
+                return
+            elif path == "/ws" and "sec-websocket-key" in headers:
+                accept = base64.b64encode(hashlib.sha1(headers["sec-websocket-key"].encode() + WS_GUID).digest())
+                writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                             b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+                await self._stream(reader, writer, WS_DIFF if want_diff else WS)
+                return
+            else:
+                writer.write(http_response("404 Not Found", "text/plain", b"not found"))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    async def _stream(self, reader, writer, kind):
+        self.clients[writer] = kind
+        # Erst der volle Zustand - der Diff des letzten Ticks allein ließe alle anderen Bits falsch
+        if self.full_payloads: writer.write(self.full_payloads[kind])
+        try:
+            # Client-Nachrichten (WS Ping/Close) werden ignoriert - wir warten nur auf EOF
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+
+    # --- LOOP ---
+
+    async def start(self, backlog=1024):
+        self.refresh_plan()
+        self.server = await asyncio.start_server(self._on_connect, self.host, self.port, backlog=backlog)
+        if self.port == 0:
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def run(self):
+        await self.start()
+        last = None
+        try:
+            while True:
+                v16, v32, _, wait_s = compute_tick()
+                if (v16, v32) != last:
+                    last = (v16, v32)
+                    self.publish(v16, v32)
+                await asyncio.sleep(max(wait_s, 0) + 0.001)
+        finally:
+            await self.close()
+
+    async def close(self):
+        for writer in tuple(self.clients):
+            writer.close()
+        self.clients.clear()
+        if self.server:
+            self.server.close()
+            self.server = None